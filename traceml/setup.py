@@ -51,6 +51,7 @@ with open("requirements/dev.txt") as requirements_file:
 
 extra = {
     "polyaxon": ["polyaxon"],
+    "arrow": ["pyarrow"],
     "dev": dev_requirements,
     "all": [
         "scikit-learn",
@@ -61,6 +62,7 @@ extra = {
         "bokeh",
         "pandas",
         "altair",
+        "pyarrow",
     ],
 }
 
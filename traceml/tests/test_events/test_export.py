@@ -0,0 +1,156 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import numpy as np
+import os
+import pytest
+import tempfile
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.events import get_event_path
+from traceml.events.export import export_run, export_series, read_dataset
+from traceml.events.schemas import (
+    LoggedEventSpec,
+    LoggedMetricArraySpec,
+    LoggedMetricSpec,
+    V1Event,
+    V1EventHistogram,
+    V1EventImage,
+    V1EventModel,
+)
+from traceml.serialization.writer import EventWriter
+
+
+@pytest.mark.events_mark
+class TestParquetExport(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.run_path = tempfile.mkdtemp()
+        self.output_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            self.run_path, backend=EventWriter.EVENTS_BACKEND, segment_max_rows=4
+        )
+        ew.write(
+            [
+                LoggedMetricArraySpec.make(
+                    name="loss", values=np.arange(10) / 10, steps=np.arange(10)
+                ),
+                LoggedEventSpec(
+                    name="img",
+                    kind="image",
+                    event=V1Event.make(
+                        step=1, image=V1EventImage(path="a.png", height=2)
+                    ),
+                ),
+                LoggedEventSpec(
+                    name="hist",
+                    kind="histogram",
+                    event=V1Event.make(
+                        step=2,
+                        histogram=V1EventHistogram(values=[1, 2], counts=[3, 4]),
+                    ),
+                ),
+                LoggedEventSpec(
+                    name="model",
+                    kind="model",
+                    event=V1Event.make(
+                        step=3, model=V1EventModel(framework="torch", spec={"a": 1})
+                    ),
+                ),
+                LoggedEventSpec(
+                    name="note", kind="html", event=V1Event.make(step=None, html="a")
+                ),
+            ]
+        )
+        ew.close()
+        rw = EventWriter(self.run_path, backend=EventWriter.RESOURCES_BACKEND)
+        rw.write([LoggedMetricSpec.make(name="cpu", metric=0.5, step=None)])
+        rw.close()
+
+    def test_export_run(self):
+        datasets = export_run(self.run_path, self.output_path, chunk_rows=3)
+        assert datasets == [
+            os.path.join(self.output_path, "events"),
+            os.path.join(self.output_path, "resources"),
+        ]
+        assert os.path.exists(
+            os.path.join(
+                self.output_path, "events", "kind=metric", "name=loss", "part-0.parquet"
+            )
+        )
+
+        table = read_dataset(datasets[0], "metric").to_table()
+        assert table.schema.field("step").type == "int64"
+        assert table.schema.field("name").type.value_type == "string"
+        df = table.to_pandas()
+        assert df.step.tolist() == list(range(10))
+        assert df.metric.tolist() == pytest.approx(list(np.arange(10) / 10))
+        assert set(df.name) == {"loss"}
+        assert str(df.timestamp.dt.tz) == "UTC"
+
+        df = read_dataset(datasets[1], "metric").to_table().to_pandas()
+        assert df.name.tolist() == ["cpu"]
+        assert df.metric.tolist() == [0.5]
+
+    def test_export_payloads(self):
+        datasets = export_run(self.run_path, self.output_path, resources=False)
+        assert datasets == [os.path.join(self.output_path, "events")]
+
+        value = read_dataset(datasets[0], "image").to_table().to_pylist()[0]
+        assert value["step"] == 1
+        assert value["image"] == {
+            "height": 2,
+            "width": None,
+            "colorspace": None,
+            "path": "a.png",
+        }
+        value = read_dataset(datasets[0], "histogram").to_table().to_pylist()[0]
+        assert value["histogram"] == {"values": [1, 2], "counts": [3, 4]}
+        # Free form dicts are kept as JSON strings
+        value = read_dataset(datasets[0], "model").to_table().to_pylist()[0]
+        assert value["model"]["framework"] == "torch"
+        assert json.loads(value["model"]["spec"]) == {"a": 1}
+        value = read_dataset(datasets[0], "html").to_table().to_pylist()[0]
+        assert value["step"] is None
+        assert value["html"] == "a"
+
+    def test_export_filters_and_basename(self):
+        export_run(
+            self.run_path,
+            self.output_path,
+            kinds=["metric"],
+            names=["loss"],
+            basename="run1",
+        )
+        export_run(self.run_path, self.output_path, kinds=["metric"], basename="run2")
+        events_path = os.path.join(self.output_path, "events")
+        assert os.listdir(events_path) == ["kind=metric"]
+        assert sorted(os.listdir(os.path.join(events_path, "kind=metric"))) == [
+            "name=loss"
+        ]
+        assert sorted(
+            os.listdir(os.path.join(events_path, "kind=metric", "name=loss"))
+        ) == ["run1-0.parquet", "run2-0.parquet"]
+        assert read_dataset(events_path, "metric").count_rows() == 20
+
+        export_series(
+            kind="metric",
+            name="loss",
+            path=get_event_path(self.run_path, "metric", "loss"),
+            output_path=events_path,
+            basename="run1",
+        )
+        assert read_dataset(events_path, "metric").count_rows() == 20
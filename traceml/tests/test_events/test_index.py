@@ -0,0 +1,142 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import os
+import pytest
+import tempfile
+
+from datetime import datetime, timedelta, timezone
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.events import segments
+from traceml.events.index import get_index_path, get_index_ranges, read_index
+from traceml.events.schemas import LoggedMetricArraySpec, V1Events
+from traceml.serialization.writer import EventWriter
+
+
+@pytest.mark.events_mark
+class TestSparseIndex(BaseTestCase):
+    @staticmethod
+    def write_steps(run_path, flushes=5, rows=100, **kwargs):
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND, **kwargs)
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        for i in range(flushes):
+            steps = np.arange(i * rows, (i + 1) * rows)
+            ew.write(
+                [
+                    LoggedMetricArraySpec.make(
+                        name="loss",
+                        values=steps / 10,
+                        steps=steps,
+                        timestamps=[start + timedelta(seconds=int(s)) for s in steps],
+                    )
+                ]
+            )
+            ew.flush()
+        ew.close()
+        return ew._get_event_path(kind="metric", name="loss")
+
+    def test_index_blocks(self):
+        for events_format in [EventWriter.CSV_FORMAT, EventWriter.BINARY_FORMAT]:
+            run_path = tempfile.mkdtemp()
+            path = self.write_steps(
+                run_path, index_rows=40, events_format=events_format
+            )
+            assert os.path.exists(get_index_path(path))
+            index = read_index(path)
+            # The last partial block is written on close
+            assert index["rows"].tolist() == [40] * 12 + [20]
+            assert index["row"].tolist() == list(range(0, 500, 40))
+            assert index["step_min"].tolist() == list(range(0, 500, 40))
+            assert index["step_max"][-1] == 499
+            assert index["end"][-1] == os.path.getsize(path)
+            assert (index["start"][1:] == index["end"][:-1]).all()
+
+            files = [
+                os.path.join(os.path.dirname(path), f)
+                for f in os.listdir(os.path.dirname(path))
+            ]
+            assert [(n, p) for n, p, _ in segments.get_events_files(files)] == [
+                ("loss", path)
+            ]
+
+    def test_index_resume(self):
+        run_path = tempfile.mkdtemp()
+        path = self.write_steps(run_path, flushes=2, index_rows=30)
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND, index_rows=30)
+        ew.write(
+            [
+                LoggedMetricArraySpec.make(
+                    name="loss", values=np.zeros(50), steps=np.arange(200, 250)
+                )
+            ]
+        )
+        ew.close()
+        index = read_index(path)
+        assert index["row"].tolist() == [0, 30, 60, 90, 120, 150, 180, 200, 230]
+        assert index["step_min"][-2:].tolist() == [200, 230]
+
+    def test_read_window(self):
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        for events_format in [EventWriter.CSV_FORMAT, EventWriter.BINARY_FORMAT]:
+            for segment_max_rows in [None, 150]:
+                run_path = tempfile.mkdtemp()
+                path = self.write_steps(
+                    run_path,
+                    index_rows=25,
+                    events_format=events_format,
+                    segment_max_rows=segment_max_rows,
+                )
+                df = V1Events.read_window(
+                    kind="metric", name="loss", path=path, min_step=210, max_step=260
+                ).df
+                assert df.step.tolist() == list(range(210, 261))
+                expected = V1Events.read(kind="metric", name="loss", data=path).df
+                expected = expected[expected.step.between(210, 260)]
+                assert df.metric.tolist() == expected.metric.tolist()
+
+                df = V1Events.read_window(
+                    kind="metric",
+                    name="loss",
+                    path=path,
+                    min_timestamp=start + timedelta(seconds=100),
+                    max_timestamp=start + timedelta(seconds=104),
+                ).df
+                assert df.step.tolist() == list(range(100, 105))
+
+                df = V1Events.read_window(
+                    kind="metric", name="loss", path=path, min_step=1000
+                ).df
+                assert df.empty
+
+    def test_index_ranges(self):
+        run_path = tempfile.mkdtemp()
+        path = self.write_steps(run_path, index_rows=50)
+        index = read_index(path)
+        size = os.path.getsize(path)
+        ranges = get_index_ranges(index, size, int(index["start"][0]), (210, 260))
+        assert ranges == [(int(index["start"][4]), int(index["end"][5]))]
+
+        # The bytes after the last block are always read
+        ranges = get_index_ranges(
+            index[:-1], size, int(index["start"][0]), (1000, None)
+        )
+        assert ranges == [(int(index["end"][-2]), size)]
+
+        # Without an index the file is read entirely
+        os.remove(get_index_path(path))
+        df = V1Events.read_window(kind="metric", name="loss", path=path, max_step=9).df
+        assert df.step.tolist() == list(range(10))
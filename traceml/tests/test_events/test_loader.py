@@ -0,0 +1,127 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import pandas as pd
+import pytest
+import tempfile
+
+from unittest.mock import patch
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.events.loader import (
+    get_run_series,
+    get_tidy_df,
+    get_wide_df,
+    read_events_series,
+    read_run_series,
+)
+from traceml.events.schemas import (
+    LoggedEventSpec,
+    LoggedMetricArraySpec,
+    LoggedMetricSpec,
+    V1Event,
+)
+from traceml.serialization.writer import EventWriter
+from traceml.visualization.run_plot import RunPlot
+
+
+@pytest.mark.events_mark
+class TestRunLoader(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.run_path = tempfile.mkdtemp()
+        ew = EventWriter(self.run_path, backend=EventWriter.EVENTS_BACKEND)
+        ew.write(
+            [
+                LoggedMetricArraySpec.make(
+                    name="loss", values=np.arange(100) / 10, steps=np.arange(100)
+                ),
+                LoggedMetricArraySpec.make(
+                    name="accuracy",
+                    values=np.arange(50) / 100,
+                    steps=np.arange(0, 100, 2),
+                ),
+                LoggedEventSpec(
+                    name="text", kind="html", event=V1Event.make(step=1, html="a")
+                ),
+            ]
+        )
+        ew.close()
+        rw = EventWriter(self.run_path, backend=EventWriter.RESOURCES_BACKEND)
+        rw.write([LoggedMetricSpec.make(name="cpu", metric=0.5, step=None)])
+        rw.close()
+
+    def test_read_run_series(self):
+        for use_processes in [False, True]:
+            dfs = read_run_series(self.run_path, use_processes=use_processes)
+            assert sorted(dfs) == ["accuracy", "loss"]
+            assert dfs["loss"].step.tolist() == list(range(100))
+
+        dfs = read_run_series(self.run_path, names=["loss"], resources=True)
+        assert sorted(dfs) == ["loss"]
+        dfs = read_run_series(self.run_path, resources=True, max_points=10)
+        assert sorted(dfs) == ["accuracy", "cpu", "loss"]
+        assert len(dfs["loss"]) == 10
+        assert dfs["loss"].step.iloc[[0, -1]].tolist() == [0, 99]
+
+        with pytest.raises(ValueError):
+            read_run_series(self.run_path, max_points=0)
+
+    def test_tidy_and_wide_dfs(self):
+        dfs = read_run_series(self.run_path)
+        df = get_tidy_df(dfs)
+        assert len(df) == 150
+        assert set(df.name) == {"loss", "accuracy"}
+
+        df = get_wide_df(dfs)
+        assert list(df.columns) == ["step", "accuracy", "loss"] or list(df.columns) == [
+            "step",
+            "loss",
+            "accuracy",
+        ]
+        assert df.step.tolist() == list(range(100))
+        assert df.loss.tolist() == pytest.approx(list(np.arange(100) / 10))
+        assert df.accuracy.iloc[::2].tolist() == pytest.approx(
+            list(np.arange(50) / 100)
+        )
+        assert df.accuracy.iloc[1::2].isna().all()
+
+        # A step logged twice keeps its last value
+        dfs["loss"] = pd.concat([dfs["loss"], dfs["loss"].iloc[[-1]].assign(metric=1)])
+        assert get_wide_df(dfs).loss.iloc[-1] == 1
+        assert get_wide_df({}).empty
+
+    def test_run_plot_dfs(self):
+        events = []
+        for name, event_path in get_run_series(self.run_path):
+            with open(event_path) as f:
+                events.append({"name": name, "kind": "metric", "data": f.read()})
+        plot = RunPlot(owner="owner", project="project", run_uuid="uuid")
+        with patch.object(RunPlot, "get_events") as get_events:
+            get_events.return_value.data = events
+            plot.get_metrics(["loss", "accuracy"])
+
+        df = plot.get_wide_df()
+        assert df.step.tolist() == list(range(100))
+        assert df.accuracy.iloc[1::2].isna().all()
+        assert len(plot.get_tidy_df()) == 150
+        assert len(plot.get_tidy_df(max_points=10)) == 20
+
+        dfs = read_events_series(events, max_points=5)
+        assert sorted(dfs) == ["accuracy", "loss"]
+        assert dfs["loss"].step.iloc[[0, -1]].tolist() == [0, 99]
+        with pytest.raises(ValueError):
+            read_events_series(events, max_points=0)
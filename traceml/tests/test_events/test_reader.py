@@ -0,0 +1,123 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import os
+import pandas as pd
+import pytest
+import tempfile
+
+from unittest.mock import patch
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.events.schemas import LoggedMetricArraySpec, V1Events
+from traceml.serialization.writer import EventWriter
+
+
+@pytest.mark.events_mark
+class TestStreamingReader(BaseTestCase):
+    def _write(self, events_format=EventWriter.CSV_FORMAT, ranks=(None,), **kwargs):
+        run_path = tempfile.mkdtemp()
+        for rank in ranks:
+            writer = EventWriter(
+                run_path,
+                backend=EventWriter.EVENTS_BACKEND,
+                events_format=events_format,
+                rank=rank,
+                **kwargs,
+            )
+            offset = rank or 0
+            step = len(ranks)
+            writer.write(
+                [
+                    LoggedMetricArraySpec.make(
+                        name="loss",
+                        values=np.arange(offset, 1000, step) / 10,
+                        steps=np.arange(offset, 1000, step),
+                    )
+                ]
+            )
+            writer.close()
+        ext = "plxb" if events_format == EventWriter.BINARY_FORMAT else "plx"
+        return os.path.join(run_path, "events", "metric", "loss.{}".format(ext))
+
+    def test_iter_read_chunks(self):
+        for events_format in [EventWriter.CSV_FORMAT, EventWriter.BINARY_FORMAT]:
+            path = self._write(events_format=events_format)
+            chunks = list(
+                V1Events.iter_read(
+                    kind="metric", name="loss", path=path, chunk_rows=300
+                )
+            )
+            assert [len(c) for c in chunks] == [300, 300, 300, 100]
+            df = pd.concat(chunks, ignore_index=True)
+            expected = V1Events.read(kind="metric", name="loss", data=path).df
+            pd.testing.assert_frame_equal(df, expected)
+
+    def test_iter_read_steps_and_columns(self):
+        path = self._write(segment_max_rows=100)
+        with patch.object(
+            V1Events, "_iter_segment", wraps=V1Events._iter_segment
+        ) as iter_segment:
+            chunks = list(
+                V1Events.iter_read(
+                    kind="metric",
+                    name="loss",
+                    path=path,
+                    min_step=250,
+                    max_step=349,
+                    columns=["step", "metric"],
+                )
+            )
+        # Only the segments overlapping the steps range are read
+        assert iter_segment.call_count == 2
+        df = pd.concat(chunks)
+        assert list(df.columns) == ["step", "metric"]
+        assert df.step.tolist() == list(range(250, 350))
+
+        with pytest.raises(ValueError):
+            list(
+                V1Events.iter_read(
+                    kind="metric", name="loss", path=path, columns=["image"]
+                )
+            )
+
+    def test_iter_read_merges_shards(self):
+        path = self._write(ranks=(0, 1, 2))
+        chunks = list(
+            V1Events.iter_read(kind="metric", name="loss", path=path, chunk_rows=64)
+        )
+        assert max(len(c) for c in chunks) <= 64
+        df = pd.concat(chunks, ignore_index=True)
+        assert df.step.tolist() == list(range(1000))
+
+    def test_read_summary(self):
+        path = self._write(segment_max_rows=300)
+        expected = V1Events.read(kind="metric", name="loss", data=path).get_summary()
+        summary = V1Events.read_summary(
+            kind="metric", name="loss", path=path, chunk_rows=128
+        )
+        assert summary.keys() == expected.keys()
+        assert summary["step"] == expected["step"]
+        assert summary["timestamp"] == expected["timestamp"]
+        for k, v in expected["metric"].items():
+            assert summary["metric"][k] == pytest.approx(v)
+
+        # The percentiles are estimated from a sample of large series
+        summary = V1Events.read_summary(
+            kind="metric", name="loss", path=path, max_quantile_rows=200
+        )
+        assert summary["metric"]["count"] == 1000
+        assert summary["metric"]["50%"] == pytest.approx(50, abs=10)
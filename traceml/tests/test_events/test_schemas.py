@@ -30,8 +30,11 @@ from traceml.events import (
     V1EventModel,
     V1Events,
 )
+from traceml.events.binary import from_epoch_ns, to_epoch_ns
+from traceml.events.clock import AnchoredClock, TimestampFormat, TimestampFormatter
 from traceml.events.schemas import (
     LoggedEventListSpec,
+    LoggedMetricSpec,
     V1EventConfusionMatrix,
     V1EventCurve,
     V1EventDataframe,
@@ -75,6 +78,97 @@ class TestBaseEvent(BaseTestCase):
         assert parsed == expected
 
 
+@pytest.mark.events_mark
+class TestLoggedMetricSpec(BaseTestCase):
+    def test_csv_is_identical_to_event_csv(self):
+        timestamp = now(tzinfo=True)
+        values = [
+            dict(step=12, timestamp=timestamp, metric=0.1),
+            dict(step=None, timestamp=timestamp, metric=1e-12),
+            dict(step=3, timestamp=timestamp.replace(microsecond=0), metric=2.0),
+            dict(step=3.0, timestamp="2018-12-11 10:24:57", metric=-1.5),
+            dict(step="4", timestamp="2018-12-11T08:49:07.163495183Z", metric=3.3),
+        ]
+        for value in values:
+            assert (
+                LoggedMetricSpec.make(name="foo", **value).to_csv()
+                == V1Event.make(**value).to_csv()
+            )
+
+    def test_has_no_timestamp(self):
+        event = LoggedMetricSpec.make(name="foo", metric=2.2)
+        assert event.kind == "metric"
+        # The writer's buffers are keyed by the formatted kind
+        assert "{}".format(event.kind) == "metric"
+        assert event.event is event
+        # The default timestamp is in epoch nanoseconds, formatted by the writer
+        assert isinstance(event.timestamp, int)
+        assert event.to_event().timestamp.date() == now().date()
+        assert event.to_csv().split("|")[1].startswith(str(now().date()))
+
+    def test_to_dict(self):
+        timestamp = parse_datetime("2018-12-11 10:24:57")
+        events = LoggedEventListSpec(
+            name="foo",
+            kind="metric",
+            events=[
+                LoggedMetricSpec.make(
+                    name="foo", metric=0.1, step=12, timestamp=timestamp
+                )
+            ],
+        )
+        expected = LoggedEventListSpec(
+            name="foo",
+            kind="metric",
+            events=[V1Event(timestamp=timestamp, metric=0.1, step=12)],
+        )
+        assert events.to_dict() == expected.to_dict()
+
+
+@pytest.mark.events_mark
+class TestTimestamps(BaseTestCase):
+    def test_anchored_clock(self):
+        clock = AnchoredClock()
+        values = [clock.now_ns() for _ in range(100)]
+        assert values == sorted(values)
+        assert abs(clock.now() - now(tzinfo=True)).total_seconds() < 1
+
+    def test_formatter(self):
+        timestamp = parse_datetime("2018-12-11 10:24:57.163495 UTC")
+        value = to_epoch_ns(timestamp)
+        formatter = TimestampFormatter()
+        assert formatter.format(value) == "2018-12-11 10:24:57.163495+00:00"
+        assert formatter.format(value + 1000) == "2018-12-11 10:24:57.163496+00:00"
+        assert formatter.format(value + 10**9) == "2018-12-11 10:24:58.163495+00:00"
+        assert formatter.format(timestamp) == str(timestamp)
+        assert formatter.format(None) == ""
+
+        # The rows match `str(datetime)`, an exact second has no fraction
+        values = [value, value - 163495000, value - 163495000 + 999, value + 1000]
+        expected = [str(from_epoch_ns(v)) for v in values]
+        assert [formatter.format(v) for v in values] == expected
+        assert [
+            v.replace(b"\x00", b"").decode() for v in formatter.format_array(values)
+        ] == expected
+        assert expected[1] == "2018-12-11 10:24:57+00:00"
+
+        formatter = TimestampFormatter(TimestampFormat.EPOCH_NS)
+        assert formatter.format(value) == str(value)
+        assert formatter.format(timestamp) == str(value)
+
+    def test_read_iso_and_compact_timestamps(self):
+        timestamp = parse_datetime("2018-12-11 10:24:57.163495 UTC")
+        value = to_epoch_ns(timestamp)
+        for timestamps in [
+            [str(timestamp), str(timestamp)],
+            [str(value), str(value)],
+            [str(timestamp), str(value)],
+        ]:
+            csv = "step|timestamp|metric\n1|{}|0.1\n2|{}|0.2".format(*timestamps)
+            df = V1Events.read(kind="metric", name="foo", data=csv).df
+            assert df.timestamp.tolist() == [timestamp, timestamp]
+
+
 @pytest.mark.events_mark
 class TestEventsV1(BaseTestCase):
     def test_metrics(self):
@@ -177,6 +271,30 @@ class TestEventsV1(BaseTestCase):
         for i in range(3):
             assert events.get_event_at(i).to_dict() == values[i].to_dict()
 
+    def test_images_get_field(self):
+        events = V1Events.read(
+            name="foo",
+            kind="image",
+            data=os.path.abspath("tests/fixtures/events/image/image_events.plx"),
+        )
+        paths = events.get_field("image.path")
+        assert paths.name == "image.path"
+        assert paths.tolist() == ["test", None, None]
+        assert events.get_field("width").tolist() == [None, 1, 10]
+        assert events.get_field("path.foo").tolist() == [None, None, None]
+
+        # The payloads are decoded once and cached
+        assert events.get_payload_at(2) == {"height": 10, "width": 10, "colorspace": 2}
+        assert events.get_payload_at(2) is events.get_payload_at(2)
+
+        events = V1Events.read(
+            name="foo",
+            kind="metric",
+            data=os.path.abspath("tests/fixtures/events/metric/metric_events.plx"),
+        )
+        with self.assertRaises(ValueError):
+            events.get_field("metric")
+
     def test_histogram(self):
         events = LoggedEventListSpec(
             name="foo",
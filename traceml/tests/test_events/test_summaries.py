@@ -0,0 +1,143 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import os
+import pytest
+import tempfile
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.events import segments
+from traceml.events.schemas import (
+    LoggedEventSpec,
+    LoggedMetricArraySpec,
+    LoggedMetricSpec,
+    V1Event,
+    V1Events,
+)
+from traceml.events.summaries import get_summary_path, load_series_summary
+from traceml.serialization.writer import EventWriter
+
+
+@pytest.mark.events_mark
+class TestRunningSummaries(BaseTestCase):
+    @staticmethod
+    def write_metrics(ew, start=0, stop=300):
+        events = [
+            LoggedMetricSpec.make(name="loss", step=step, metric=step * 0.5)
+            for step in range(start, start + 10)
+        ]
+        events.append(
+            LoggedMetricArraySpec.make(
+                name="loss",
+                values=np.sin(np.arange(start + 10, stop)),
+                steps=np.arange(start + 10, stop),
+            )
+        )
+        ew.write(events)
+        ew.flush()
+
+    def assert_summary(self, path, kind="metric", name="loss"):
+        series_summary = load_series_summary(path)
+        values = None
+        if series_summary.requires_values:
+            values = V1Events.read(kind=kind, name=name, data=path).df[kind]
+        summary = series_summary.get_summary(values)
+        expected = V1Events.read_summary(kind=kind, name=name, path=path)
+        assert summary.keys() == expected.keys()
+        assert summary["step"] == expected["step"]
+        assert summary["timestamp"] == expected["timestamp"]
+        if kind == "metric":
+            assert summary["metric"] == pytest.approx(expected["metric"])
+
+    def test_summary_sidecar(self):
+        for events_format in [EventWriter.CSV_FORMAT, EventWriter.BINARY_FORMAT]:
+            for segment_max_rows in [None, 100]:
+                run_path = tempfile.mkdtemp()
+                ew = EventWriter(
+                    run_path,
+                    backend=EventWriter.EVENTS_BACKEND,
+                    events_format=events_format,
+                    segment_max_rows=segment_max_rows,
+                    summaries=True,
+                )
+                path = ew._get_event_path(kind="metric", name="loss")
+                self.write_metrics(ew)
+                # The sidecar is written on each flush
+                assert os.path.exists(get_summary_path(path))
+                self.assert_summary(path)
+                ew.close()
+                self.assert_summary(path)
+
+                files = [
+                    os.path.join(os.path.dirname(path), f)
+                    for f in os.listdir(os.path.dirname(path))
+                ]
+                assert [n for n, _, _ in segments.get_events_files(files)] == ["loss"]
+
+    def test_summary_non_metric_and_missing_values(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND, summaries=True)
+        ew.write(
+            [
+                LoggedEventSpec(
+                    name="text", kind="html", event=V1Event.make(step=1, html="a")
+                ),
+                LoggedEventSpec(
+                    name="text", kind="html", event=V1Event.make(step=4, html="b")
+                ),
+                LoggedEventSpec(
+                    name="loss", kind="metric", event=V1Event.make(step=1, metric=1)
+                ),
+                LoggedEventSpec(
+                    name="loss", kind="metric", event=V1Event.make(step=2, metric=3)
+                ),
+            ]
+        )
+        ew.close()
+        self.assert_summary(
+            ew._get_event_path(kind="html", name="text"), "html", "text"
+        )
+        path = ew._get_event_path(kind="metric", name="loss")
+        summary = load_series_summary(path).get_summary()
+        assert summary["metric"]["count"] == 2
+        assert summary["metric"]["last"] == 3
+        assert summary["metric"]["std"] == pytest.approx(np.sqrt(2))
+
+    def test_summary_resume_and_stale(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND, summaries=True)
+        path = ew._get_event_path(kind="metric", name="loss")
+        self.write_metrics(ew, 0, 100)
+        ew.close()
+
+        # A new writer resumes the running summary
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND, summaries=True)
+        self.write_metrics(ew, 100, 200)
+        ew.close()
+        assert load_series_summary(path).rows == 200
+        self.assert_summary(path)
+
+        # Rows written without updating the summary invalidate it
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND)
+        self.write_metrics(ew, 200, 300)
+        ew.close()
+        assert load_series_summary(path) is None
+
+        # A series resumed without a valid summary is not summarized
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND, summaries=True)
+        self.write_metrics(ew, 300, 400)
+        ew.close()
+        assert load_series_summary(path) is None
@@ -0,0 +1,150 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import os
+import pytest
+import tempfile
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.events import segments
+from traceml.events.schemas import LoggedMetricArraySpec
+from traceml.events.tail import EventsCursor, read_tail
+from traceml.serialization.writer import EventWriter
+
+
+@pytest.mark.events_mark
+class TestTailReader(BaseTestCase):
+    @staticmethod
+    def write_steps(writer, steps):
+        writer.write(
+            [
+                LoggedMetricArraySpec.make(
+                    name="loss", values=np.array(steps) / 10, steps=np.array(steps)
+                )
+            ]
+        )
+        writer.flush()
+
+    def tail(self, path, cursor=None):
+        events, cursor = read_tail(kind="metric", name="loss", path=path, cursor=cursor)
+        # The cursor is persisted between reads
+        return events.df.step.tolist(), EventsCursor.from_dict(cursor.to_dict())
+
+    def test_tail_new_rows(self):
+        for events_format in [EventWriter.CSV_FORMAT, EventWriter.BINARY_FORMAT]:
+            run_path = tempfile.mkdtemp()
+            ew = EventWriter(
+                run_path,
+                backend=EventWriter.EVENTS_BACKEND,
+                events_format=events_format,
+            )
+            path = ew._get_event_path(kind="metric", name="loss")
+            assert self.tail(path)[0] == []
+
+            self.write_steps(ew, [0, 1, 2])
+            steps, cursor = self.tail(path)
+            if events_format == EventWriter.BINARY_FORMAT:
+                assert steps == [0, 1, 2]
+            else:
+                # The last csv row is returned once it's known to be complete
+                assert steps == [0, 1]
+                steps, cursor = self.tail(path, cursor)
+                assert steps == [2]
+            self.write_steps(ew, [3, 4])
+            is_binary = events_format == EventWriter.BINARY_FORMAT
+            steps, cursor = self.tail(path, cursor)
+            assert steps == ([3, 4] if is_binary else [3])
+            ew.close()
+            steps, cursor = self.tail(path, cursor)
+            assert steps == ([] if is_binary else [4])
+            assert not cursor.reset
+
+    def test_tail_partial_row(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND)
+        path = ew._get_event_path(kind="metric", name="loss")
+        self.write_steps(ew, [0, 1])
+        ew.close()
+        with open(path, "a") as f:
+            f.write("\n2|2023-01-01 00:00:0")
+        steps, cursor = self.tail(path)
+        assert steps == [0, 1]
+        with open(path, "a") as f:
+            f.write("0.000000+00:00|0.2\n3|2023-01-01 00:00:00.000000+00:00|")
+        steps, cursor = self.tail(path, cursor)
+        assert steps == [2]
+        with open(path, "a") as f:
+            f.write("0.3")
+        steps, cursor = self.tail(path, cursor)
+        assert steps == []
+        steps, cursor = self.tail(path, cursor)
+        assert steps == [3]
+
+    def test_tail_rotation(self):
+        for compression in ["none", "gzip"]:
+            run_path = tempfile.mkdtemp()
+            ew = EventWriter(
+                run_path,
+                backend=EventWriter.EVENTS_BACKEND,
+                segment_max_rows=4,
+                segment_compression=compression,
+            )
+            path = ew._get_event_path(kind="metric", name="loss")
+            self.write_steps(ew, [0, 1])
+            steps, cursor = self.tail(path)
+            results = list(steps)
+            for start in range(2, 20, 3):
+                self.write_steps(ew, list(range(start, start + 3)))
+                steps, cursor = self.tail(path, cursor)
+                results += steps
+            ew.close()
+            steps, cursor = self.tail(path, cursor)
+            results += steps
+            assert results == list(range(20))
+            assert cursor.segments == len(segments.get_segments_paths(path))
+
+    def test_tail_rotation_in_progress(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND)
+        path = ew._get_event_path(kind="metric", name="loss")
+        self.write_steps(ew, [0, 1, 2])
+        ew.close()
+        steps, cursor = self.tail(path)
+        assert steps == [0, 1]
+
+        # The active file was moved but the manifest is not written yet
+        os.replace(path, segments.get_segment_path(path, 0))
+        with open(path, "w") as f:
+            f.write("step|timestamp|metric")
+        assert self.tail(path, cursor) == ([], cursor)
+
+    def test_tail_truncation(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND)
+        path = ew._get_event_path(kind="metric", name="loss")
+        self.write_steps(ew, [0, 1, 2])
+        ew.close()
+        steps, cursor = self.tail(path)
+        assert steps == [0, 1]
+
+        with open(path, "w") as f:
+            f.write("step|timestamp|metric\n5|2023-01-01 00:00:00.000000+00:00|0.5\n")
+        steps, cursor = self.tail(path, cursor)
+        assert steps == [5]
+        assert cursor.reset
+        steps, cursor = self.tail(path, cursor)
+        assert steps == []
+        assert not cursor.reset
@@ -0,0 +1,138 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import pytest
+import shutil
+import tempfile
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.processors.cgroup_processor import (
+    CgroupCollector,
+    CgroupVersion,
+    can_log_cgroup_resources,
+    read_proc_cgroup,
+)
+
+FIXTURES_PATH = os.path.abspath("tests/fixtures/cgroup")
+
+
+@pytest.mark.processors_mark
+class TestCgroupCollector(BaseTestCase):
+    def get_collector(self, version: str, **kwargs) -> CgroupCollector:
+        return CgroupCollector(
+            cgroup_path=os.path.join(FIXTURES_PATH, version),
+            proc_cgroup_path=os.path.join(FIXTURES_PATH, "{}.proc".format(version)),
+            **kwargs
+        )
+
+    def test_read_proc_cgroup(self):
+        assert read_proc_cgroup(os.path.join(FIXTURES_PATH, "v1.proc")) == {
+            "memory": "/",
+            "cpu": "/",
+            "cpuacct": "/",
+            "blkio": "/",
+            "": "/",
+        }
+
+    def test_v2(self):
+        collector = self.get_collector("v2")
+        assert collector.version == CgroupVersion.V2
+        results = collector.query()
+        assert results == {
+            "cgroup_memory_usage": 805306368,
+            "cgroup_memory_limit": 1073741824,
+            "cgroup_memory_working_set": 536870912,
+            "cgroup_memory_percent": 50,
+            "cgroup_cpu_quota": 2,
+            "cgroup_cpu_usage_secs": 120,
+            "cgroup_cpu_throttled_periods": 25,
+            "cgroup_cpu_throttled_secs": 3.5,
+            "cgroup_io_read_bytes": 2097152,
+            "cgroup_io_write_bytes": 2097152,
+            "cgroup_io_read_ops": 15,
+            "cgroup_io_write_ops": 20,
+            "cgroup_memory_pressure_some_avg10": 1.5,
+            "cgroup_memory_pressure_some_avg60": 0.75,
+            "cgroup_memory_pressure_some_avg300": 0.25,
+            "cgroup_memory_pressure_some_secs": 2.5,
+            "cgroup_memory_pressure_full_avg10": 0.5,
+            "cgroup_memory_pressure_full_avg60": 0.25,
+            "cgroup_memory_pressure_full_avg300": 0.1,
+            "cgroup_memory_pressure_full_secs": 1,
+            "cgroup_cpu_pressure_some_avg10": 12,
+            "cgroup_cpu_pressure_some_avg60": 8,
+            "cgroup_cpu_pressure_some_avg300": 4,
+            "cgroup_cpu_pressure_some_secs": 90,
+            "cgroup_cpu_pressure_full_avg10": 0,
+            "cgroup_cpu_pressure_full_avg60": 0,
+            "cgroup_cpu_pressure_full_avg300": 0,
+            "cgroup_cpu_pressure_full_secs": 0,
+        }
+
+        events = collector.get_metrics()
+        assert len(events) == len(results)
+        assert {e.kind for e in events} == {"metric"}
+
+    def test_v1(self):
+        collector = self.get_collector("v1", prefix="container")
+        assert collector.version == CgroupVersion.V1
+        assert collector.query() == {
+            # The memory is not limited
+            "container_memory_usage": 536870912,
+            "container_memory_working_set": 469762048,
+            "container_cpu_quota": 0.5,
+            "container_cpu_throttled_periods": 7,
+            "container_cpu_throttled_secs": 2,
+            "container_cpu_usage_secs": 30,
+            "container_io_read_bytes": 4096,
+            "container_io_write_bytes": 8192,
+            "container_io_read_ops": 1,
+            "container_io_write_ops": 2,
+        }
+
+    def test_missing_files_are_skipped(self):
+        cgroup_path = os.path.join(tempfile.mkdtemp(), "v2")
+        shutil.copytree(os.path.join(FIXTURES_PATH, "v2"), cgroup_path)
+        path = os.path.join(cgroup_path, "kubepods", "pod1", "ctr1")
+        os.remove(os.path.join(path, "memory.stat"))
+        os.remove(os.path.join(path, "io.stat"))
+        with open(os.path.join(path, "memory.max"), "w") as f:
+            f.write("max\n")
+        with open(os.path.join(path, "cpu.max"), "w") as f:
+            f.write("max 100000\n")
+
+        # Without the process's cgroup, the root cgroup is read
+        collector = CgroupCollector(cgroup_path=cgroup_path, proc_cgroup_path="foo")
+        assert collector.query() == {}
+        collector = CgroupCollector(
+            cgroup_path=cgroup_path,
+            proc_cgroup_path=os.path.join(FIXTURES_PATH, "v2.proc"),
+        )
+        results = collector.query()
+        assert results["cgroup_memory_usage"] == 805306368
+        assert "cgroup_memory_limit" not in results
+        assert "cgroup_memory_percent" not in results
+        assert "cgroup_cpu_quota" not in results
+        assert results["cgroup_cpu_throttled_periods"] == 25
+        assert not any(k.startswith("cgroup_io_read") for k in results)
+        assert results["cgroup_cpu_pressure_some_avg10"] == 12
+
+    def test_not_available(self):
+        path = tempfile.mkdtemp()
+        assert can_log_cgroup_resources(path) is False
+        collector = CgroupCollector(cgroup_path=path, proc_cgroup_path="foo")
+        assert collector.version is None
+        assert collector.get_metrics() == []
@@ -0,0 +1,139 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import pytest
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.processors.fake_nvml import FakeGPU, FakeNVML
+from traceml.processors.gpu_processor import (
+    GPUCollector,
+    can_log_gpu_resources,
+    get_gpu_metrics,
+    set_nvml_backend,
+)
+from traceml.vendor import pynvml
+
+
+@pytest.mark.processors_mark
+class TestGPUCollector(BaseTestCase):
+    def test_query(self):
+        backend = FakeNVML(
+            gpus=[
+                FakeGPU(
+                    memory_total=1000,
+                    memory_used=400,
+                    utilization=76,
+                    memory_utilization=30,
+                    power_usage=150500,
+                    power_limit=300000,
+                    temperature=65,
+                    sm_clock=1410,
+                    pcie_tx=10,
+                    pcie_rx=20,
+                    processes=[(101, 100), (102, 200), (999, 50)],
+                )
+            ]
+        )
+        collector = GPUCollector(backend=backend, get_pids=lambda: [101, 102])
+        assert collector.query() == {
+            "gpu_0_memory_free": 600,
+            "gpu_0_memory_used": 400,
+            "gpu_0_utilization": 76,
+            "gpu_0_memory_utilization": 30,
+            "gpu_0_power_watts": 150.5,
+            "gpu_0_power_limit_watts": 300,
+            "gpu_0_temperature": 65,
+            "gpu_0_sm_clock_mhz": 1410,
+            "gpu_0_pcie_tx_bytes_per_sec": 10240,
+            "gpu_0_pcie_rx_bytes_per_sec": 20480,
+            "gpu_0_process_count": 3,
+            "gpu_0_process_101_memory_used": 100,
+            "gpu_0_process_102_memory_used": 200,
+            "gpu_0_process_memory_used": 300,
+        }
+
+    def test_process_tree_is_walked_once_per_query(self):
+        backend = FakeNVML(
+            gpus=[FakeGPU(processes=[(101, 100)]), FakeGPU(processes=[(101, 200)])]
+        )
+        calls = []
+
+        def get_pids():
+            calls.append(1)
+            return [101]
+
+        collector = GPUCollector(backend=backend, get_pids=get_pids)
+        for _ in range(3):
+            results = collector.query()
+        assert len(calls) == 3
+        assert results["gpu_0_process_memory_used"] == 100
+        assert results["gpu_1_process_memory_used"] == 200
+
+    def test_handles_are_cached(self):
+        backend = FakeNVML(gpus=[FakeGPU(), FakeGPU()])
+        collector = GPUCollector(backend=backend)
+        assert collector.is_available is True
+        for _ in range(3):
+            results = collector.query()
+        assert "gpu_1_sm_clock_mhz" in results
+        assert backend.calls["nvmlInit"] == 1
+        assert backend.calls["nvmlDeviceGetCount"] == 1
+        assert backend.calls["nvmlDeviceGetHandleByIndex"] == 2
+
+        collector.shutdown()
+        assert backend.initialized == 0
+        collector.query()
+        assert backend.calls["nvmlInit"] == 2
+
+    def test_unsupported_metrics_are_disabled(self):
+        backend = FakeNVML(
+            gpus=[
+                FakeGPU(power_usage=None, power_limit=None),
+                FakeGPU(
+                    temperature=pynvml.NVMLError(pynvml.NVML_ERROR_TIMEOUT),
+                ),
+            ]
+        )
+        collector = GPUCollector(backend=backend)
+        for _ in range(3):
+            results = collector.query()
+        assert "gpu_0_power_watts" not in results
+        assert "gpu_0_power_limit_watts" not in results
+        assert "gpu_1_temperature" not in results
+        assert results["gpu_0_temperature"] == 40
+        assert results["gpu_1_power_watts"] == 70
+        # Only the unsupported metrics are not queried again
+        assert backend.calls["nvmlDeviceGetPowerUsage"] == 1 + 3
+        assert backend.calls["nvmlDeviceGetTemperature"] == 3 + 3
+
+    def test_init_error(self):
+        backend = FakeNVML(init_error=pynvml.NVML_ERROR_DRIVER_NOT_LOADED)
+        collector = GPUCollector(backend=backend)
+        assert collector.is_available is False
+        assert collector.query() == {}
+        assert collector.get_metrics() == []
+
+    def test_process_wide_backend(self):
+        backend = FakeNVML(gpus=[FakeGPU(processes=[(os.getpid(), 1024)])])
+        set_nvml_backend(backend)
+        self.addCleanup(set_nvml_backend)
+        assert can_log_gpu_resources() is True
+        metrics = {m.name: m.event.metric for m in get_gpu_metrics()}
+        assert metrics["gpu_0_process_memory_used"] == 1024
+        assert metrics["gpu_0_temperature"] == 40
+
+        set_nvml_backend(None)
+        assert backend.initialized == 0
@@ -0,0 +1,143 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from collections import namedtuple
+from unittest.mock import patch
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.processors.io_processor import IORatesCollector, get_io_rates_options
+
+DiskCounters = namedtuple(
+    "DiskCounters",
+    ["read_count", "write_count", "read_bytes", "write_bytes", "busy_time"],
+)
+NetCounters = namedtuple("NetCounters", ["bytes_sent", "bytes_recv"])
+
+
+@pytest.mark.processors_mark
+class TestIORatesCollector(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.disks = {}
+        self.net = {}
+        for target, counters in [
+            ("disk_io_counters", lambda perdisk: self.disks),
+            ("net_io_counters", lambda pernic: self.net),
+        ]:
+            patcher = patch(
+                "traceml.processors.io_processor.psutil.{}".format(target), counters
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # The partitions are only filtered with the host's block devices
+        patcher = patch("traceml.processors.io_processor.SYS_BLOCK_PATH", "/not/found")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def set_counters(self, disks=None, net=None):
+        self.disks = {k: DiskCounters(*v) for k, v in (disks or {}).items()}
+        self.net = {k: NetCounters(*v) for k, v in (net or {}).items()}
+
+    def test_rates(self):
+        collector = IORatesCollector()
+        self.set_counters(
+            disks={"sda": (0, 0, 0, 0, 0), "loop0": (0, 0, 0, 0, 0)},
+            net={"eth0": (0, 0), "lo": (0, 0)},
+        )
+        assert collector.query(now=10) == {}
+
+        self.set_counters(
+            disks={"sda": (20, 10, 4096, 2048, 500), "loop0": (5, 5, 5, 5, 5)},
+            net={"eth0": (100, 300), "lo": (50, 50)},
+        )
+        results = collector.query(now=12)
+        assert results == {
+            "disk_sda_read_bytes_per_sec": 2048,
+            "disk_sda_write_bytes_per_sec": 1024,
+            "disk_sda_read_iops": 10,
+            "disk_sda_write_iops": 5,
+            "disk_sda_busy_percent": 25,
+            "disk_read_bytes_per_sec": 2048,
+            "disk_write_bytes_per_sec": 1024,
+            "disk_read_iops": 10,
+            "disk_write_iops": 5,
+            "disk_busy_percent": 25,
+            "net_eth0_rx_bytes_per_sec": 150,
+            "net_eth0_tx_bytes_per_sec": 50,
+            "net_rx_bytes_per_sec": 150,
+            "net_tx_bytes_per_sec": 50,
+        }
+
+    def test_totals_and_busiest_disk(self):
+        collector = IORatesCollector(per_device=False)
+        self.set_counters(disks={"sda": (0,) * 5, "sdb": (0,) * 5})
+        collector.query(now=0)
+        self.set_counters(
+            disks={"sda": (1, 1, 100, 100, 200), "sdb": (3, 3, 300, 300, 900)}
+        )
+        results = collector.query(now=1)
+        assert results == {
+            "disk_read_bytes_per_sec": 400,
+            "disk_write_bytes_per_sec": 400,
+            "disk_read_iops": 4,
+            "disk_write_iops": 4,
+            "disk_busy_percent": 90,
+        }
+
+    def test_selected_devices(self):
+        collector = IORatesCollector(disks=["nvme*"], interfaces=["lo"], max_devices=2)
+        names = ["nvme0n1", "nvme1n1", "nvme2n1", "sda"]
+        self.set_counters(
+            disks={k: (0,) * 5 for k in names}, net={"lo": (0, 0), "eth0": (0, 0)}
+        )
+        collector.query(now=0)
+        self.set_counters(
+            disks={k: (1,) * 5 for k in names}, net={"lo": (1, 1), "eth0": (1, 1)}
+        )
+        results = collector.query(now=1)
+        assert {k for k in results if k.endswith("_read_iops")} == {
+            "disk_nvme0n1_read_iops",
+            "disk_nvme1n1_read_iops",
+            "disk_read_iops",
+        }
+        assert "net_lo_rx_bytes_per_sec" in results
+        assert "net_eth0_rx_bytes_per_sec" not in results
+
+    def test_counter_reset_is_skipped(self):
+        collector = IORatesCollector()
+        self.set_counters(net={"eth0": (100, 100), "eth1": (0, 0)})
+        collector.query(now=0)
+        self.set_counters(net={"eth0": (10, 10), "eth1": (10, 20)})
+        results = collector.query(now=1)
+        assert "net_eth0_rx_bytes_per_sec" not in results
+        assert results["net_rx_bytes_per_sec"] == 20
+
+        # The rates resume from the new counters
+        self.set_counters(net={"eth0": (20, 30), "eth1": (10, 20)})
+        assert collector.query(now=2)["net_eth0_rx_bytes_per_sec"] == 20
+
+    def test_get_io_rates_options(self):
+        assert get_io_rates_options(None) is None
+        assert get_io_rates_options(False) is None
+        assert get_io_rates_options(True) == {}
+        assert get_io_rates_options({"disks": ["sda"]}) == {"disks": ["sda"]}
+        with self.assertRaises(ValueError):
+            get_io_rates_options({"disk": ["sda"]})
+        with self.assertRaises(ValueError):
+            get_io_rates_options("sda")
+        with self.assertRaises(ValueError):
+            IORatesCollector(max_devices=0)
@@ -0,0 +1,138 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import pytest
+import subprocess
+import sys
+import time
+
+from polyaxon.utils.test_utils import BaseTestCase
+from traceml.processors.process_processor import (
+    ProcessTreeCollector,
+    get_process_tree_options,
+    query_process,
+)
+
+
+@pytest.mark.processors_mark
+class TestProcessTreeCollector(BaseTestCase):
+    def start_child(self, secs: float = 30):
+        child = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep({})".format(secs)]
+        )
+        self.addCleanup(child.kill)
+        return child
+
+    def wait_for_children(self, collector, count: int):
+        for _ in range(50):
+            collector.refresh_children()
+            if len(collector.pids) == count + 1:
+                return
+            time.sleep(0.1)
+
+    def test_query_process(self):
+        import psutil
+
+        values = query_process(psutil.Process())
+        assert values["rss"] > 0
+        assert values["cpu_time"] > 0
+        assert values["threads"] >= 1
+        assert {"fds", "read_bytes", "ctx_switches_voluntary"} <= set(values)
+        # The USS and PSS walk the memory maps, they are only read on demand
+        assert "uss" not in values
+        values = query_process(psutil.Process(), full_memory=True)
+        assert {"uss", "pss", "rss"} <= set(values)
+
+    def test_get_process_tree_options(self):
+        assert get_process_tree_options(None) is None
+        assert get_process_tree_options(False) is None
+        assert get_process_tree_options(True) == {}
+        assert get_process_tree_options({"full_memory": True}) == {"full_memory": True}
+        with self.assertRaises(ValueError):
+            get_process_tree_options({"uss": True})
+        with self.assertRaises(ValueError):
+            get_process_tree_options("uss")
+        with self.assertRaises(ValueError):
+            ProcessTreeCollector(max_processes=-1)
+
+    def test_tree_and_per_process_series(self):
+        collector = ProcessTreeCollector()
+        child = self.start_child()
+        self.wait_for_children(collector, 1)
+        assert collector.pids == [os.getpid(), child.pid]
+
+        results = collector.query()
+        assert results["process_count"] == 2
+        for k in ["rss", "cpu_time", "threads"]:
+            assert results["process_{}".format(k)] == pytest.approx(
+                results["process_main_{}".format(k)]
+                + results["process_child_0_{}".format(k)]
+            )
+
+        events = collector.get_metrics()
+        assert {e.kind for e in events} == {"metric"}
+        assert "process_child_0_rss" in {e.name for e in events}
+
+        collector = ProcessTreeCollector(per_process=False, prefix="job")
+        results = collector.query()
+        assert "job_rss" in results
+        assert "job_main_rss" not in results
+
+    def test_children_are_cached_and_released(self):
+        collector = ProcessTreeCollector()
+        child = self.start_child()
+        self.wait_for_children(collector, 1)
+        handle = collector._children[child.pid]
+        collector.query()
+        collector.query()
+        assert collector._children[child.pid] is handle
+
+        collector._last_values[child.pid]["cpu_time"] = 100
+        child.kill()
+        child.wait()
+        results = collector.query()
+        assert collector.pids == [os.getpid()]
+        assert results["process_count"] == 1
+        # The counters of an exited child are kept by the tree's series
+        assert results["process_cpu_time"] >= 100
+        assert "process_child_0_rss" not in results
+
+    def test_children_slots_are_reused_and_capped(self):
+        collector = ProcessTreeCollector(max_processes=1)
+        first = self.start_child()
+        second = self.start_child()
+        self.wait_for_children(collector, 2)
+        results = collector.query()
+        assert results["process_count"] == 3
+        # The child without a slot is only reported by the tree's series
+        assert "process_child_0_rss" in results
+        assert not any(k.startswith("process_child_1_") for k in results)
+        assert results["process_rss"] > (
+            results["process_main_rss"] + results["process_child_0_rss"]
+        )
+
+        # A respawned child takes the released slot instead of a new series
+        slot_child = first if collector._slots.get(first.pid) == 0 else second
+        slot_child.kill()
+        slot_child.wait()
+        respawned = self.start_child()
+        self.wait_for_children(collector, 2)
+        results = collector.query()
+        assert set(collector._slots.values()) == {0}
+        assert "process_child_0_rss" in results
+        assert not any(
+            str(p.pid) in k for p in [first, second, respawned] for k in results
+        )
@@ -13,18 +13,54 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import numpy as np
 import os
+import pandas as pd
 import pytest
 import tempfile
+import threading
+import time
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 
 from polyaxon.utils.test_utils import BaseTestCase
+from traceml.events import get_event_path, get_resource_path, get_shards_paths, segments
+from traceml.events.binary import HEADER_SIZE, RECORD_SIZE
+from traceml.events.clock import AnchoredClock, TimestampFormatter
+from traceml.events.index import read_index
 from traceml.events.schemas import (
     LoggedEventListSpec,
     LoggedEventSpec,
+    LoggedMetricArraySpec,
+    LoggedMetricSpec,
     V1Event,
     V1Events,
 )
-from traceml.serialization.writer import EventAsyncManager, EventFileWriter, EventWriter
+from traceml.events.shards import merge_shards
+from traceml.processors.cgroup_processor import CgroupCollector
+from traceml.processors.events_processors import metrics_dict_to_list
+from traceml.processors.fake_nvml import FakeGPU, FakeNVML
+from traceml.processors.gpu_processor import set_nvml_backend
+from traceml.serialization.downsampling import BaseDownsampler
+from traceml.serialization.executor import (
+    acquire_shared_executor,
+    get_resources_metrics,
+    release_shared_executor,
+)
+from traceml.serialization.sampling import ResourceSampler, RingBuffer
+from traceml.serialization.scheduling import FlushScheduler, parse_flush_policy
+from traceml.serialization.stats import LatencyHistogram
+from traceml.serialization.wal import WriteAheadLog, get_wal_path
+from traceml.serialization.writer import (
+    BackpressurePolicy,
+    BaseAsyncManager,
+    EventAsyncManager,
+    EventFileWriter,
+    EventWriter,
+    ResourceFileWriter,
+    stamp_events,
+)
 
 
 @pytest.mark.serialization_mark
@@ -189,6 +225,113 @@ class TestEventWriter(BaseTestCase):
         assert results.get_event_at(2).to_dict() == new_events[0].event.to_dict()
         assert results.get_event_at(3).to_dict() == new_events[1].event.to_dict()
 
+    def test_handles_pool_keeps_files_open_between_flushes(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(run_path=run_path, backend=EventWriter.EVENTS_BACKEND)
+        for step in range(3):
+            ew.write(
+                [
+                    LoggedEventSpec(
+                        name="test",
+                        kind="metric",
+                        event=V1Event.make(step=step, metric=1.12),
+                    ),
+                    LoggedEventSpec(
+                        name="test2",
+                        kind="metric",
+                        event=V1Event.make(step=step, metric=1.13),
+                    ),
+                ]
+            )
+            ew.flush()
+
+        stats = ew.get_handles_stats()
+        assert stats["open"] == 2
+        assert stats["misses"] == 2
+        assert stats["hits"] == 6
+        assert stats["evictions"] == 0
+        assert stats["hit_rate"] == 0.75
+
+        results = V1Events.read(
+            name="test", kind="metric", data=ew._get_event_path("metric", "test")
+        )
+        assert len(results.df.values) == 3
+
+        ew.close()
+        assert ew.get_handles_stats()["open"] == 0
+
+    def test_handles_pool_evicts_least_recently_used(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path=run_path, backend=EventWriter.EVENTS_BACKEND, max_open_files=2
+        )
+        names = ["test1", "test2", "test3"]
+        for step in range(2):
+            ew.write(
+                [
+                    LoggedEventSpec(
+                        name=name,
+                        kind="metric",
+                        event=V1Event.make(step=step, metric=1.12),
+                    )
+                    for name in names
+                ]
+            )
+            ew.flush()
+            assert ew.get_handles_stats()["open"] == 2
+        assert ew.get_handles_stats()["evictions"] > 0
+        ew.close()
+
+        for name in names:
+            results = V1Events.read(
+                name=name, kind="metric", data=ew._get_event_path("metric", name)
+            )
+            assert len(results.df.values) == 2
+
+    def test_binary_format_for_metric_events(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path=run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            events_format=EventWriter.BINARY_FORMAT,
+        )
+        events = [
+            LoggedEventSpec(
+                name="test", kind="metric", event=V1Event.make(step=1, metric=1.12)
+            ),
+            LoggedEventSpec(
+                name="test", kind="metric", event=V1Event.make(step=12, metric=1.13)
+            ),
+            LoggedEventSpec(
+                name="test", kind="metric", event=V1Event.make(metric=1.14)
+            ),
+            LoggedEventSpec(
+                name="test", kind="html", event=V1Event.make(step=1, html="html")
+            ),
+        ]
+        ew.write(events)
+        ew.close()
+
+        metric_path = ew._get_event_path(kind="metric", name="test")
+        assert metric_path.endswith("test.plxb")
+        assert os.path.getsize(metric_path) == HEADER_SIZE + 3 * RECORD_SIZE
+        assert ew._get_event_path(kind="html", name="test").endswith("test.plx")
+
+        results = V1Events.read(name="test", kind="metric", data=metric_path)
+        assert len(results.df.values) == 3
+        for i in range(3):
+            assert results.get_event_at(i).to_dict() == events[i].event.to_dict()
+
+        # A partially written record is ignored
+        with open(metric_path, "ab") as f:
+            f.write(b"\x00" * (RECORD_SIZE - 1))
+        results = V1Events.read(name="test", kind="metric", data=metric_path)
+        assert len(results.df.values) == 3
+        summary = results.get_summary()
+        assert summary["step"]["count"] == 2
+        assert summary["metric"]["count"] == 3
+        assert summary["metric"]["last"] == 1.14
+
 
 @pytest.mark.serialization_mark
 class TestEventFileWriter(BaseTestCase):
@@ -494,3 +637,1259 @@ class TestEventAsyncManager(BaseTestCase):
 
         # nothing is written to the file after close
         assert len(os.listdir(run_path)) == 0
+
+
+@pytest.mark.serialization_mark
+class TestBackpressurePolicies(BaseTestCase):
+    @staticmethod
+    def get_events(count, name="test"):
+        return [
+            LoggedEventSpec(
+                name=name, kind="metric", event=V1Event.make(step=i, metric=1.12)
+            )
+            for i in range(count)
+        ]
+
+    def test_unknown_policy_raises(self):
+        run_path = tempfile.mkdtemp()
+        with self.assertRaises(ValueError):
+            BaseAsyncManager(
+                event_writer=EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND),
+                backpressure="foo",
+            )
+
+    def test_drop_oldest(self):
+        run_path = tempfile.mkdtemp()
+        # No worker is consuming the queue
+        manager = BaseAsyncManager(
+            event_writer=EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND),
+            max_queue_size=2,
+            backpressure=BackpressurePolicy.DROP_OLDEST,
+        )
+        events = self.get_events(5)
+        for event in events:
+            manager.write(event)
+        assert manager.get_stats()["queue"]["dropped"] == 3
+        assert manager._event_queue.get_nowait() is events[3]
+        assert manager._event_queue.get_nowait() is events[4]
+
+    def test_coalesce(self):
+        run_path = tempfile.mkdtemp()
+        manager = EventAsyncManager(
+            event_writer=EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND),
+            flush_secs=100,
+            backpressure=BackpressurePolicy.COALESCE,
+        )
+        events = self.get_events(5)
+        manager.write(events[:3])
+        manager.write(events[3:] + self.get_events(1, name="test2"))
+        assert manager.get_stats()["queue"]["coalesced"] == 4
+        manager.close()
+
+        results = V1Events.read(
+            name="test", kind="metric", data=run_path + "/events/metric/test.plx"
+        )
+        assert len(results.df.values) == 1
+        assert results.get_event_at(0).to_dict() == events[4].event.to_dict()
+        results = V1Events.read(
+            name="test2", kind="metric", data=run_path + "/events/metric/test2.plx"
+        )
+        assert len(results.df.values) == 1
+
+    def test_coalesce_only_metric_points(self):
+        run_path = tempfile.mkdtemp()
+        manager = EventAsyncManager(
+            event_writer=EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND),
+            flush_secs=100,
+            backpressure=BackpressurePolicy.COALESCE,
+        )
+        for i in range(2):
+            manager.write(self.get_events(2))
+            manager.write(
+                [
+                    LoggedMetricArraySpec.make(
+                        name="test", values=np.arange(10) + 10 * i, steps=np.arange(10)
+                    ),
+                    LoggedEventSpec(
+                        name="text", kind="html", event=V1Event.make(step=i, html="a")
+                    ),
+                ]
+            )
+        manager.write(self.get_events(1))
+        assert manager.get_stats()["queue"]["coalesced"] == 2
+        manager.close()
+
+        results = V1Events.read(
+            name="test", kind="metric", data=run_path + "/events/metric/test.plx"
+        )
+        # The pending points are written before the blocks of their series
+        assert results.df.metric.tolist() == (
+            [1.12] + list(range(10)) + [1.12] + list(range(10, 20)) + [1.12]
+        )
+        results = V1Events.read(
+            name="text", kind="html", data=run_path + "/events/html/text.plx"
+        )
+        assert len(results.df.values) == 2
+
+    def test_spill_and_replay(self):
+        run_path = tempfile.mkdtemp()
+        spill_path = os.path.join(tempfile.mkdtemp(), "spill")
+        manager = BaseAsyncManager(
+            event_writer=EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND),
+            max_queue_size=2,
+            backpressure=BackpressurePolicy.SPILL,
+            spill_path=spill_path,
+        )
+        events = self.get_events(5)
+        manager.write(events[0])
+        manager.write(events[1])
+        manager.write(events[2:])
+        assert manager.get_stats()["queue"]["spilled"] == 3
+        assert os.path.getsize(spill_path) > 0
+
+        # Queued events must be processed before replaying
+        assert manager._get_deferred_events() == []
+        for _ in range(2):
+            manager._event_queue.get_nowait()
+            manager._event_queue.task_done()
+        replayed = manager._get_deferred_events()
+        assert [e.event.step for e in replayed] == [2, 3, 4]
+        assert os.path.getsize(spill_path) == 0
+        assert manager._get_deferred_events() == []
+
+    def test_spill_writes_all_events_in_order(self):
+        run_path = tempfile.mkdtemp()
+        manager = EventAsyncManager(
+            event_writer=EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND),
+            max_queue_size=1,
+            backpressure=BackpressurePolicy.SPILL,
+        )
+        events = self.get_events(50)
+        for event in events:
+            manager.write(event)
+        manager.close()
+        assert os.path.exists(manager._spill_path or "") is False
+
+        results = V1Events.read(
+            name="test", kind="metric", data=run_path + "/events/metric/test.plx"
+        )
+        assert results.df.step.tolist() == list(range(50))
+
+
+@pytest.mark.serialization_mark
+class TestDownsampling(BaseTestCase):
+    @staticmethod
+    def get_events(metrics, name="test", secs=None):
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        return [
+            LoggedEventSpec(
+                name=name,
+                kind="metric",
+                event=V1Event.make(
+                    step=i,
+                    metric=m,
+                    timestamp=start + timedelta(seconds=i * secs) if secs else None,
+                ),
+            )
+            for i, m in enumerate(metrics)
+        ]
+
+    @staticmethod
+    def read(run_path, name="test", backend="events"):
+        return V1Events.read(
+            name=name,
+            kind="metric",
+            data=os.path.join(run_path, backend, "metric", "{}.plx".format(name)),
+        )
+
+    def test_invalid_downsampling_raises(self):
+        run_path = tempfile.mkdtemp()
+        for config in [
+            {"kind": "foo"},
+            {"kind": "every_n", "n": 0},
+            {"kind": "time_bucket", "secs": 1, "agg": "foo"},
+            {"kind": "lttb", "window": 10, "points": 20},
+        ]:
+            with self.assertRaises(ValueError):
+                EventWriter(
+                    run_path,
+                    backend=EventWriter.EVENTS_BACKEND,
+                    downsampling={"test": config},
+                )
+        with self.assertRaises(TypeError):
+            BaseDownsampler(name="test")
+
+    def test_every_n(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            downsampling={"loss*": {"kind": "every_n", "n": 3}},
+        )
+        ew.write(self.get_events(range(10), name="loss_train"))
+        ew.write(self.get_events(range(10), name="accuracy"))
+        ew.close()
+        assert self.read(run_path, "loss_train").df.step.tolist() == [0, 3, 6, 9]
+        assert len(self.read(run_path, "accuracy").df.values) == 10
+
+    def test_time_bucket(self):
+        run_path = tempfile.mkdtemp()
+        metrics = [1, 5, 3, 2, 8, 4, 7]
+        for agg, expected in [
+            ("min", [1, 2, 7]),
+            ("max", [5, 8, 7]),
+            ("mean", [3, 14 / 3, 7]),
+            ("last", [3, 4, 7]),
+        ]:
+            ew = EventWriter(
+                run_path,
+                backend=EventWriter.EVENTS_BACKEND,
+                downsampling={agg: {"kind": "time_bucket", "secs": 3, "agg": agg}},
+            )
+            ew.write(self.get_events(metrics, name=agg, secs=1))
+            ew.close()
+            results = self.read(run_path, agg)
+            assert results.df.metric.tolist() == pytest.approx(expected)
+
+    def test_drained_points_share_the_series_buffer(self):
+        run_path = tempfile.mkdtemp()
+        for config in [
+            {"kind": "time_bucket", "secs": 3, "agg": "last"},
+            {"kind": "lttb", "window": 4, "points": 3},
+        ]:
+            ew = EventWriter(
+                run_path,
+                backend=EventWriter.EVENTS_BACKEND,
+                downsampling={config["kind"]: config},
+                index_rows=3,
+            )
+            name = config["kind"]
+            ew.write(self.get_events([1, 5, 3, 2, 8, 4, 7], name=name, secs=1))
+            ew.flush()
+            # The pending points are drained on close to the same series
+            ew.close()
+            assert list(ew._files) == ["metric.{}".format(name)]
+            event_path = ew._get_event_path("metric", name)
+            assert (
+                os.listdir(os.path.dirname(event_path)).count(
+                    os.path.basename(event_path)
+                )
+                == 1
+            )
+            rows = len(self.read(run_path, name).df)
+            index = read_index(event_path)
+            assert index["rows"].sum() == rows
+            assert index["row"].tolist() == list(range(0, rows, 3))
+
+    def test_lttb_keeps_raw(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            downsampling={
+                "test": {"kind": "lttb", "window": 10, "points": 4, "keep_raw": True}
+            },
+        )
+        metrics = [0, 1, 0, 9, 0, 1, 0, 1, 0, 1, 0, 1, 0]
+        ew.write(self.get_events(metrics))
+        ew.close()
+        results = self.read(run_path)
+        # First window is reduced to 4 points, the remaining 3 points are drained
+        assert len(results.df.values) == 7
+        steps = results.df.step.tolist()
+        # The window's edges and the peak are kept
+        assert steps[0] == 0 and 3 in steps[:4] and steps[3] == 9
+        raw = self.read(run_path, backend=EventWriter.RAW_EVENTS_BACKEND)
+        assert raw.df.metric.tolist() == metrics
+
+
+@pytest.mark.serialization_mark
+class TestSegments(BaseTestCase):
+    @staticmethod
+    def write(ew, start, count, name="test"):
+        for step in range(start, start + count):
+            ew.write(
+                LoggedEventSpec(
+                    name=name, kind="metric", event=V1Event.make(step=step, metric=1.1)
+                )
+            )
+            ew.flush()
+
+    def test_invalid_compression_raises(self):
+        with self.assertRaises(ValueError):
+            EventWriter(
+                tempfile.mkdtemp(),
+                backend=EventWriter.EVENTS_BACKEND,
+                segment_compression="foo",
+            )
+
+    def test_rotation_by_rows(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, segment_max_rows=4
+        )
+        self.write(ew, 0, 10)
+        event_path = ew._get_event_path("metric", "test")
+        manifest = segments.read_manifest(event_path)
+        assert [s["path"] for s in manifest["segments"]] == [
+            "test.plx.0.gz",
+            "test.plx.1.gz",
+        ]
+        assert manifest["segments"][1]["rows"] == 4
+        assert manifest["segments"][1]["step"] == {"min": 4, "max": 7}
+        assert manifest["segments"][1]["timestamp"]["min"] is not None
+
+        # The active segment is read after the sealed segments
+        results = V1Events.read(name="test", kind="metric", data=event_path)
+        assert results.df.step.tolist() == list(range(10))
+
+        # Closing seals the active segment
+        ew.close()
+        assert not os.path.exists(event_path)
+        results = V1Events.read(name="test", kind="metric", data=event_path)
+        assert results.df.step.tolist() == list(range(10))
+        assert results.get_summary()["metric"]["count"] == 10
+
+    def test_rotation_by_bytes_resumes(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND)
+        self.write(ew, 0, 3)
+        ew.close()
+
+        ew = EventWriter(
+            run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            events_format=EventWriter.BINARY_FORMAT,
+            segment_max_bytes=HEADER_SIZE + 2 * RECORD_SIZE,
+            segment_compression="none",
+        )
+        self.write(ew, 0, 3, name="binary")
+        ew.close()
+        event_path = ew._get_event_path("metric", "binary")
+        manifest = segments.read_manifest(event_path)
+        assert [s["path"] for s in manifest["segments"]] == [
+            "binary.plxb.0",
+            "binary.plxb.1",
+        ]
+        results = V1Events.read(name="binary", kind="metric", data=event_path)
+        assert results.df.step.tolist() == [0, 1, 2]
+
+        # An existing csv series is sealed with its previous rows
+        ew = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, segment_max_rows=5
+        )
+        self.write(ew, 3, 2)
+        event_path = ew._get_event_path("metric", "test")
+        manifest = segments.read_manifest(event_path)
+        assert manifest["segments"][0]["rows"] == 5
+        assert manifest["segments"][0]["step"] == {"min": 0, "max": 4}
+        ew.close()
+
+        files = [
+            os.path.join(os.path.dirname(event_path), f)
+            for f in os.listdir(os.path.dirname(event_path))
+        ]
+        series = {
+            name: len(series_files)
+            for name, _, series_files in segments.get_events_files(files)
+        }
+        assert series == {"test": 3, "binary": 3}
+
+    def test_dotted_names_do_not_collide_with_sidecars(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            segment_max_rows=2,
+            segment_compression="none",
+            index_rows=1,
+            summaries=True,
+        )
+        self.write(ew, 0, 5)
+        for name in ["test.0", "test.index", "test.summary"]:
+            self.write(ew, 10, 1, name=name)
+        ew.close()
+
+        dirname = os.path.dirname(ew._get_event_path("metric", "test"))
+        files = [os.path.join(dirname, f) for f in os.listdir(dirname)]
+        series = {
+            name: event_path for name, event_path, _ in segments.get_events_files(files)
+        }
+        assert sorted(series) == ["test", "test.0", "test.index", "test.summary"]
+        results = V1Events.read(name="test", kind="metric", data=series["test"])
+        assert results.df.step.tolist() == list(range(5))
+        for name in ["test.0", "test.index", "test.summary"]:
+            results = V1Events.read(name=name, kind="metric", data=series[name])
+            assert results.df.step.tolist() == [10]
+            # Closing sealed the series with their index
+            segment_path = segments.get_segments_paths(series[name])[0]
+            assert read_index(segment_path) is not None
+
+
+@pytest.mark.serialization_mark
+class TestShards(BaseTestCase):
+    @staticmethod
+    def write_ranks(run_path, **kwargs):
+        # Rank 0 logs even steps and rank 1 logs odd steps, rank 1 also logs last
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        for rank in range(2):
+            ew = EventWriter(
+                run_path, backend=EventWriter.EVENTS_BACKEND, rank=rank, **kwargs
+            )
+            for step in range(rank, 6, 2):
+                ew.write(
+                    LoggedEventSpec(
+                        name="loss",
+                        kind="metric",
+                        event=V1Event.make(
+                            step=step,
+                            metric=step + 0.5,
+                            timestamp=start + timedelta(seconds=step),
+                        ),
+                    )
+                )
+            ew.close()
+        return os.path.join(run_path, "events", "metric", "loss.plx")
+
+    def test_sharded_paths_and_read(self):
+        run_path = tempfile.mkdtemp()
+        event_path = self.write_ranks(run_path)
+        shards = get_shards_paths(event_path)
+        assert [os.path.basename(p) for p in shards] == [
+            "loss.rank0.plx",
+            "loss.rank1.plx",
+        ]
+        assert not os.path.exists(event_path)
+        results = V1Events.read(name="loss", kind="metric", data=event_path)
+        assert results.df.step.tolist() == list(range(6))
+        assert results.get_summary()["metric"]["last"] == 5.5
+
+        files = [
+            os.path.join(os.path.dirname(event_path), f)
+            for f in os.listdir(os.path.dirname(event_path))
+        ]
+        assert [(n, p) for n, p, _ in segments.get_events_files(files)] == [
+            ("loss", event_path)
+        ]
+
+    def test_merge_rotated_shards(self):
+        run_path = tempfile.mkdtemp()
+        event_path = self.write_ranks(run_path, segment_max_rows=1)
+        expected = V1Events.read(name="loss", kind="metric", data=event_path).df
+        assert expected.step.tolist() == list(range(6))
+
+        assert merge_shards(event_path, remove_shards=True) == event_path
+        assert get_shards_paths(event_path) == []
+        results = V1Events.read(name="loss", kind="metric", data=event_path)
+        pd.testing.assert_frame_equal(results.df, expected)
+        assert merge_shards(event_path) is None
+
+    def test_merge_binary_shards(self):
+        run_path = tempfile.mkdtemp()
+        event_path = self.write_ranks(run_path, events_format=EventWriter.BINARY_FORMAT)
+        shards = get_shards_paths(event_path)
+        assert [os.path.basename(p) for p in shards] == [
+            "loss.rank0.plxb",
+            "loss.rank1.plxb",
+        ]
+        assert merge_shards(event_path) == event_path
+        assert os.path.getsize(event_path) == HEADER_SIZE + 6 * RECORD_SIZE
+        results = V1Events.read(name="loss", kind="metric", data=event_path)
+        assert results.df.step.tolist() == list(range(6))
+        # The shards are kept, the merged file is not overwritten
+        with self.assertRaises(ValueError):
+            merge_shards(event_path)
+
+
+@pytest.mark.serialization_mark
+class TestWriteAheadLog(BaseTestCase):
+    @staticmethod
+    def get_events(start, count):
+        return [
+            LoggedEventSpec(
+                name="test", kind="metric", event=V1Event.make(step=i, metric=1.12)
+            )
+            for i in range(start, start + count)
+        ]
+
+    def test_wal_truncated_on_flush_and_removed_on_close(self):
+        run_path = tempfile.mkdtemp()
+        wal_path = get_wal_path(run_path)
+        ew = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, wal_path=wal_path
+        )
+        ew.write(self.get_events(0, 3))
+        ew.write(self.get_events(3, 2))
+        assert ew._wal.get_stats()["commits"] == 2
+        assert len(WriteAheadLog.read(wal_path)) == 5
+        ew.flush()
+        assert os.path.getsize(wal_path) == 0
+        ew.write(self.get_events(5, 1))
+        assert len(WriteAheadLog.read(wal_path)) == 1
+        ew.close()
+        assert not os.path.exists(wal_path)
+
+    def test_wal_replayed_by_next_writer(self):
+        run_path = tempfile.mkdtemp()
+        wal_path = get_wal_path(run_path)
+        ew = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, wal_path=wal_path
+        )
+        ew.write(self.get_events(0, 2))
+        ew.flush()
+        # The process is killed before flushing the next events
+        ew.write(self.get_events(2, 3))
+        ew._wal._file.close()
+        # A partially written record is ignored
+        with open(wal_path, "ab") as f:
+            f.write(b"\x10\x00\x00\x00\x00")
+
+        writer = EventFileWriter(run_path=run_path, wal=True)
+        event_path = writer._async_writer._event_writer._get_event_path(
+            "metric", "test"
+        )
+        assert V1Events.read(
+            name="test", kind="metric", data=event_path
+        ).df.step.tolist() == list(range(5))
+        writer.add_events(self.get_events(5, 1))
+        writer.close()
+        assert not os.path.exists(wal_path)
+        assert V1Events.read(
+            name="test", kind="metric", data=event_path
+        ).df.step.tolist() == list(range(6))
+
+    def test_event_files_synced_before_truncate(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            wal_path=get_wal_path(run_path),
+        )
+        ew.write(self.get_events(0, 3))
+        event_path = ew._get_event_path("metric", "test")
+        calls = []
+        with patch(
+            "traceml.serialization.base.os.fsync",
+            side_effect=lambda fd: calls.append(fd),
+        ), patch(
+            "traceml.serialization.base.segments.fsync_path",
+            side_effect=lambda path: calls.append(path),
+        ), patch.object(
+            WriteAheadLog, "truncate", side_effect=lambda: calls.append("truncate")
+        ):
+            ew.flush()
+        assert calls == [
+            ew._handles[event_path].fileno(),
+            os.path.dirname(event_path),
+            "truncate",
+        ]
+        ew.close()
+
+        # Without a log the event files are not synced
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND)
+        ew.write(self.get_events(3, 1))
+        with patch("traceml.serialization.base.os.fsync") as fsync:
+            ew.flush()
+        assert not fsync.called
+        ew.close()
+
+    def test_wal_keeps_the_downsampled_pending_points(self):
+        run_path = tempfile.mkdtemp()
+        wal_path = get_wal_path(run_path)
+        downsampling = {
+            "test": {"kind": "time_bucket", "secs": 3, "agg": "mean", "keep_raw": True}
+        }
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+        def get_events(metrics, offset):
+            return [
+                LoggedEventSpec(
+                    name="test",
+                    kind="metric",
+                    event=V1Event.make(
+                        step=offset + i,
+                        metric=m,
+                        timestamp=start + timedelta(seconds=offset + i),
+                    ),
+                )
+                for i, m in enumerate(metrics)
+            ]
+
+        ew = EventWriter(
+            run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            wal_path=wal_path,
+            downsampling=downsampling,
+        )
+        ew.write(get_events([1, 5, 3, 2, 8, 4, 7], 0))
+        ew.flush()
+        # The point of the open bucket is not written yet, it's kept in the log
+        assert [e.event.metric for e in WriteAheadLog.read(wal_path)] == [7]
+        ew.write(get_events([1, 4], 7))
+        # The process is killed before the bucket is complete
+        ew._wal._file.close()
+        ew._raw_writer._close_handles()
+
+        ew = EventWriter(
+            run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            wal_path=wal_path,
+            downsampling=downsampling,
+        )
+        assert [e.event.metric for e in WriteAheadLog.read(wal_path)] == [7, 1, 4]
+        ew.close()
+        results = V1Events.read(
+            name="test", kind="metric", data=ew._get_event_path("metric", "test")
+        )
+        assert results.df.metric.tolist() == pytest.approx([3, 14 / 3, 4])
+        raw = V1Events.read(
+            name="test",
+            kind="metric",
+            data=os.path.join(run_path, "events_raw", "metric", "test.plx"),
+        )
+        assert raw.df.metric.tolist() == [1, 5, 3, 2, 8, 4, 7, 1, 4]
+
+    def test_wal_replay_skips_persisted_events(self):
+        run_path = tempfile.mkdtemp()
+        wal_path = get_wal_path(run_path)
+        ew = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, wal_path=wal_path
+        )
+        ew.write(self.get_events(0, 3))
+        ew.write(
+            [
+                LoggedMetricArraySpec.make(
+                    name="block", values=np.arange(10) / 10, steps=np.arange(10)
+                )
+            ]
+        )
+        # The process is killed after the flush but before truncating the log
+        with patch.object(WriteAheadLog, "truncate"):
+            ew.flush()
+        ew.write(self.get_events(3, 2))
+        ew._wal._file.close()
+        # The last rows of the block did not reach the disk
+        block_path = ew._get_event_path("metric", "block")
+        with open(block_path) as f:
+            lines = f.readlines()
+        with open(block_path, "w") as f:
+            f.writelines(lines[:5])
+
+        ew = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, wal_path=wal_path
+        )
+        ew.close()
+        assert V1Events.read(
+            name="test", kind="metric", data=ew._get_event_path("metric", "test")
+        ).df.step.tolist() == list(range(5))
+        df = V1Events.read(name="block", kind="metric", data=block_path).df
+        assert df.step.tolist() == list(range(10))
+        assert df.metric.tolist() == pytest.approx(list(np.arange(10) / 10))
+
+
+@pytest.mark.serialization_mark
+class TestWriterStats(BaseTestCase):
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram(buckets=(0.01, 0.1))
+        for value in [0.001, 0.01, 0.05, 2]:
+            histogram.observe(value)
+        stats = histogram.to_dict()
+        assert stats["count"] == 4
+        assert stats["max"] == 2
+        assert stats["buckets"] == {"0.01": 2, "0.1": 1, "inf": 1}
+
+    def test_async_writer_stats(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND)
+        manager = EventAsyncManager(event_writer=ew, max_queue_size=10, flush_secs=100)
+        for step in range(3):
+            manager.write(
+                LoggedEventSpec(
+                    name="test", kind="metric", event=V1Event.make(step=step, metric=1)
+                )
+            )
+        manager.flush()
+        stats = manager.get_stats()
+        assert stats["queue"]["size"] == 0
+        assert stats["queue"]["max_size"] == 10
+        assert 1 <= stats["queue"]["hwm"] <= 3
+        assert stats["queue"]["put"]["count"] == 3
+        assert stats["flush"]["events"] == 3
+        event_path = ew._get_event_path("metric", "test")
+        with open(event_path) as f:
+            header = f.readline()
+        assert stats["flush"]["bytes"] == os.path.getsize(event_path) - len(header) + 1
+        assert stats["wal"] is None
+        manager.close()
+
+
+@pytest.mark.serialization_mark
+class TestSharedExecutor(BaseTestCase):
+    def test_writers_share_the_executor(self):
+        threads = threading.active_count()
+        writers = [
+            EventFileWriter(run_path=tempfile.mkdtemp(), shared_executor=True)
+            for _ in range(10)
+        ]
+        executor = acquire_shared_executor()
+        release_shared_executor()
+        assert executor.num_writers == 10
+        assert threading.active_count() - threads == executor.num_threads
+
+        for i, writer in enumerate(writers):
+            writer.add_events(
+                [
+                    LoggedEventSpec(
+                        name="test",
+                        kind="metric",
+                        event=V1Event.make(step=step, metric=i),
+                    )
+                    for step in range(3)
+                ]
+            )
+        for writer in writers[:5]:
+            writer.flush()
+        for writer in writers:
+            writer.close()
+        assert executor.num_writers == 0
+        assert acquire_shared_executor() is not executor
+        release_shared_executor()
+
+        for i, writer in enumerate(writers):
+            results = V1Events.read(
+                name="test",
+                kind="metric",
+                data=get_event_path(writer.run_path, "metric", "test"),
+            )
+            assert results.df.step.tolist() == [0, 1, 2]
+            assert results.df.metric.tolist() == [i] * 3
+
+    def test_resources_are_sampled_once(self):
+        executor = acquire_shared_executor()
+        try:
+            samples = executor._resources_samples
+            first = executor.get_resources_metrics(max_age=100)
+            second = executor.get_resources_metrics(max_age=100)
+            assert executor._resources_samples == samples + 1
+            assert [e.event for e in first] == [e.event for e in second]
+        finally:
+            release_shared_executor()
+
+    def test_writer_failures_are_logged_and_counted(self):
+        writer = EventFileWriter(run_path=tempfile.mkdtemp(), shared_executor=True)
+        manager = writer._async_writer
+        with patch.object(
+            manager._event_writer, "write", side_effect=OSError("disk full")
+        ):
+            with self.assertLogs("traceml", level="WARNING") as logs:
+                writer.add_event(
+                    LoggedEventSpec(
+                        name="test", kind="metric", event=V1Event.make(step=1, metric=1)
+                    )
+                )
+                manager._event_queue.join()
+                for _ in range(50):
+                    if manager.get_stats()["errors"]:
+                        break
+                    time.sleep(0.1)
+        writer.close()
+        assert manager.get_stats()["errors"] == 1
+        assert "Failed to write the queued events" in logs.output[0]
+
+        def failing_collector():
+            raise ValueError("collector")
+
+        with self.assertLogs("traceml", level="WARNING") as logs:
+            data = get_resources_metrics(
+                log_psutil=False,
+                log_gpu=False,
+                collectors=[failing_collector, lambda: [1]],
+            )
+        assert data == [1]
+        assert "Failed to collect the resources" in logs.output[0]
+
+    def test_shared_resource_writers(self):
+        writers = [
+            ResourceFileWriter(run_path=tempfile.mkdtemp(), shared_executor=True)
+            for _ in range(3)
+        ]
+        paths = [get_resource_path(w.run_path, "metric", "cpu") for w in writers]
+        # The first resources flush is scheduled when the writers are created
+        for _ in range(50):
+            if all(os.path.exists(p) for p in paths):
+                break
+            time.sleep(0.1)
+        for writer in writers:
+            writer.close()
+        assert all(os.path.exists(p) for p in paths)
+
+
+@pytest.mark.serialization_mark
+class TestResourceSampling(BaseTestCase):
+    def test_ring_buffer(self):
+        buffer = RingBuffer(3)
+        assert len(buffer) == 0
+        buffer.append(1)
+        buffer.append(2)
+        assert buffer.values().tolist() == [1, 2]
+        for value in [3, 4, 5]:
+            buffer.append(value)
+        assert len(buffer) == 3
+        assert buffer.values().tolist() == [3, 4, 5]
+        buffer.clear()
+        assert len(buffer) == 0
+        with self.assertRaises(ValueError):
+            RingBuffer(0)
+
+    def test_window_aggregates(self):
+        readings = iter(range(1, 21))
+        sampler = ResourceSampler(
+            sample_secs=0.1,
+            flush_secs=1,
+            collect=lambda: metrics_dict_to_list({"cpu": next(readings)}),
+        )
+        assert sampler.window_size == 11
+        assert sampler.get_window_metrics() == []
+        for _ in range(10):
+            sampler.sample()
+        metrics = {e.name: e.event.metric for e in sampler.get_window_metrics()}
+        assert metrics == {
+            "cpu": 5.5,
+            "cpu_min": 1,
+            "cpu_max": 10,
+            "cpu_p95": pytest.approx(9.55),
+        }
+        # A spike between two flushes is kept by the window's max
+        for _ in range(10):
+            sampler.sample()
+        metrics = {e.name: e.event.metric for e in sampler.get_window_metrics()}
+        assert metrics["cpu_max"] == 20
+        assert metrics["cpu_min"] == 11
+
+        with self.assertRaises(ValueError):
+            ResourceSampler(sample_secs=0, flush_secs=1, collect=list)
+        with self.assertRaises(ValueError):
+            ResourceSampler(sample_secs=1, flush_secs=1, collect=list, deadband=-1)
+
+    def test_deadband(self):
+        readings = iter([50, 50.5, 80])
+        sampler = ResourceSampler(
+            sample_secs=0.1,
+            flush_secs=1,
+            collect=lambda: metrics_dict_to_list({"memory": next(readings)}),
+            deadband=1,
+        )
+        results = []
+        for _ in range(3):
+            sampler.sample()
+            results.append([e.name for e in sampler.get_window_metrics()])
+        assert results[0] == ["memory", "memory_min", "memory_max", "memory_p95"]
+        assert results[1] == []
+        assert results[2] == results[0]
+
+    def test_resource_writer_sampling(self):
+        run_path = tempfile.mkdtemp()
+        readings = iter(range(1000))
+        with patch(
+            "traceml.serialization.writer.get_resources_metrics",
+            lambda **kwargs: metrics_dict_to_list({"cpu": next(readings)}),
+        ):
+            writer = ResourceFileWriter(
+                run_path=run_path, flush_secs=0.5, sample_secs=0.05
+            )
+            time.sleep(1.2)
+            writer.close()
+        df = V1Events.read(
+            name="cpu", kind="metric", data=get_resource_path(run_path, "metric", "cpu")
+        ).df
+        df_max = V1Events.read(
+            name="cpu_max",
+            kind="metric",
+            data=get_resource_path(run_path, "metric", "cpu_max"),
+        ).df
+        # Several samples are aggregated by each flush
+        assert len(df) >= 2
+        assert df_max.metric.iloc[-1] - df_max.metric.iloc[0] > len(df)
+
+        with self.assertRaises(ValueError):
+            ResourceFileWriter(run_path=run_path, shared_executor=True, sample_secs=0.1)
+
+    def test_resource_writer_cgroup(self):
+        fixtures_path = os.path.abspath("tests/fixtures/cgroup")
+        run_path = tempfile.mkdtemp()
+        with patch(
+            "traceml.serialization.writer.CgroupCollector",
+            lambda: CgroupCollector(
+                cgroup_path=os.path.join(fixtures_path, "v2"),
+                proc_cgroup_path=os.path.join(fixtures_path, "v2.proc"),
+            ),
+        ):
+            writer = ResourceFileWriter(run_path=run_path, cgroup=True)
+        path = get_resource_path(run_path, "metric", "cgroup_memory_percent")
+        for _ in range(50):
+            if os.path.exists(path):
+                break
+            time.sleep(0.1)
+        writer.close()
+        df = V1Events.read(name="cgroup_memory_percent", kind="metric", data=path).df
+        assert df.metric.tolist()[0] == 50
+
+    def test_resource_writer_fake_gpus(self):
+        set_nvml_backend(FakeNVML(gpus=[FakeGPU(power_usage=120000), FakeGPU()]))
+        self.addCleanup(set_nvml_backend)
+        run_path = tempfile.mkdtemp()
+        writer = ResourceFileWriter(run_path=run_path)
+        path = get_resource_path(run_path, "metric", "gpu_1_power_watts")
+        for _ in range(50):
+            if os.path.exists(path):
+                break
+            time.sleep(0.1)
+        writer.close()
+        df = V1Events.read(name="gpu_1_power_watts", kind="metric", data=path).df
+        assert df.metric.tolist()[0] == 70
+        path = get_resource_path(run_path, "metric", "gpu_0_power_watts")
+        df = V1Events.read(name="gpu_0_power_watts", kind="metric", data=path).df
+        assert df.metric.tolist()[0] == 120
+
+    def test_resource_writer_process_tree(self):
+        for shared_executor in [False, True]:
+            run_path = tempfile.mkdtemp()
+            writer = ResourceFileWriter(
+                run_path=run_path, process_tree=True, shared_executor=shared_executor
+            )
+            path = get_resource_path(run_path, "metric", "process_rss")
+            for _ in range(50):
+                if os.path.exists(path):
+                    break
+                time.sleep(0.1)
+            writer.close()
+            df = V1Events.read(name="process_rss", kind="metric", data=path).df
+            assert df.metric.iloc[0] > 0
+            assert os.path.exists(
+                get_resource_path(run_path, "metric", "process_main_rss")
+            )
+
+
+@pytest.mark.serialization_mark
+class TestFlushScheduling(BaseTestCase):
+    @staticmethod
+    def _read_metric(run_path, name):
+        path = get_event_path(run_path, "metric", name)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return V1Events.read(name=name, kind="metric", data=path).df
+
+    @staticmethod
+    def _get_events(name, steps):
+        return [
+            LoggedEventSpec(
+                name=name, kind="metric", event=V1Event.make(step=step, metric=step)
+            )
+            for step in steps
+        ]
+
+    def test_parse_flush_policy(self):
+        live, options = parse_flush_policy(
+            {"max_rows": 10, "live": ["loss"], "live_secs": 1}
+        )
+        assert live == ["loss"]
+        assert options["max_buffered_rows"] == 10
+        assert options["live_flush_secs"] == 1
+        assert options["max_buffered_bytes"] is None
+        with pytest.raises(ValueError):
+            parse_flush_policy({"foo": 1})
+        with pytest.raises(ValueError):
+            parse_flush_policy({"live": ["loss"]})
+
+    def test_scheduler(self):
+        run_path = tempfile.mkdtemp()
+        event_writer = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, live_series=["loss*"]
+        )
+        scheduler = FlushScheduler(
+            10, max_buffered_rows=5, live_flush_secs=1, max_idle_secs=40
+        )
+        assert scheduler.should_flush(1, event_writer)
+        scheduler.on_flush(0, has_data=True)
+        assert scheduler.get_wait(0, event_writer) == 10
+        assert not scheduler.should_flush(9, event_writer)
+        assert scheduler.should_flush(10.1, event_writer)
+
+        # Backs off when idle, and is reset by new data
+        for interval in [20, 40, 40]:
+            scheduler.on_flush(0, has_data=False)
+            assert scheduler.interval == interval
+        scheduler.on_data(5)
+        assert scheduler.interval == 10
+        assert scheduler.get_wait(5, event_writer) == 10
+
+        # Flushes early once the buffered rows reach the threshold
+        event_writer.write(self._get_events("acc", range(4)))
+        assert event_writer.buffered_rows == 4
+        assert event_writer.live_since is None
+        assert not scheduler.should_flush(6, event_writer)
+        event_writer.write(self._get_events("acc", [4]))
+        assert scheduler.should_flush(6, event_writer)
+        event_writer.flush()
+        scheduler.on_flush(time.time(), has_data=True)
+        assert event_writer.buffered_rows == 0
+        assert event_writer.buffered_bytes == 0
+
+        # Live series are flushed at most `live_flush_secs` after they are buffered
+        event_writer.write(self._get_events("loss_train", [5]))
+        live_since = event_writer.live_since
+        assert live_since is not None
+        assert scheduler.get_deadline(event_writer) == live_since + 1
+        event_writer.close()
+
+    def test_buffered_bytes_are_estimated_per_series(self):
+        event_writer = EventWriter(
+            tempfile.mkdtemp(), backend=EventWriter.EVENTS_BACKEND
+        )
+        event_writer.write(self._get_events("acc", range(10)))
+        assert event_writer.buffered_bytes == 10 * EventWriter.DEFAULT_ROW_BYTES
+        event_writer.flush()
+        flushed_bytes = event_writer.get_flush_stats()["last_bytes"]
+        event_writer.write(self._get_events("acc", range(10, 20)))
+        assert 0 < event_writer.buffered_bytes <= 2 * flushed_bytes
+        event_writer.close()
+
+    def test_live_series_and_thresholds(self):
+        writer = EventFileWriter(
+            run_path=tempfile.mkdtemp(),
+            flush_secs=100,
+            flush_policy={"max_rows": 20, "live": ["loss"], "live_secs": 0.2},
+        )
+        # The first data is flushed immediately
+        writer.add_events(self._get_events("acc", [0]))
+        writer.add_events(self._get_events("loss", [0]))
+        for _ in range(50):
+            df = self._read_metric(writer.run_path, "loss")
+            if len(df) == 1:
+                break
+            time.sleep(0.1)
+        assert len(self._read_metric(writer.run_path, "loss")) == 1
+        acc_rows = len(self._read_metric(writer.run_path, "acc"))
+
+        # Buffered rows reaching the threshold are flushed early
+        writer.add_events(self._get_events("acc", range(1, 30)))
+        for _ in range(50):
+            if len(self._read_metric(writer.run_path, "acc")) > acc_rows:
+                break
+            time.sleep(0.1)
+        assert len(self._read_metric(writer.run_path, "acc")) == 30
+        writer.close()
+
+
+@pytest.mark.serialization_mark
+class TestMetricArrays(BaseTestCase):
+    @staticmethod
+    def _make_block(size, offset=0):
+        return LoggedMetricArraySpec.make(
+            name="loss",
+            values=np.arange(offset, offset + size) / 10,
+            steps=np.arange(offset, offset + size),
+            timestamps=np.datetime64("2023-01-01", "ns")
+            + np.arange(offset, offset + size).astype("timedelta64[s]"),
+        )
+
+    def _write_and_read(self, events_format, **kwargs):
+        run_path = tempfile.mkdtemp()
+        writer = EventWriter(
+            run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            events_format=events_format,
+            **kwargs,
+        )
+        writer.write(
+            [
+                self._make_block(5),
+                LoggedEventSpec(
+                    name="loss", kind="metric", event=V1Event.make(step=5, metric=0.5)
+                ),
+                self._make_block(4, offset=6),
+            ]
+        )
+        if not kwargs:
+            assert writer.buffered_rows == 10
+        writer.close()
+        return V1Events.read(
+            name="loss",
+            kind="metric",
+            data=writer._get_event_path(kind="metric", name="loss"),
+        ).df
+
+    def test_block_is_formatted_as_rows(self):
+        block = self._make_block(3)
+        assert block.to_csv().split("\n") == [
+            "0|2023-01-01 00:00:00+00:00|0.0",
+            "1|2023-01-01 00:00:01+00:00|0.1",
+            "2|2023-01-01 00:00:02+00:00|0.2",
+        ]
+        events_spec = LoggedEventListSpec(name="loss", kind="metric", events=[block])
+        assert events_spec.count_events() == 3
+        assert len(events_spec.to_dict()["events"]) == 3
+        assert [m.step for m in block.iter_metrics()] == [0, 1, 2]
+
+    def test_write_csv_and_binary_blocks(self):
+        for events_format in [EventWriter.CSV_FORMAT, EventWriter.BINARY_FORMAT]:
+            df = self._write_and_read(events_format)
+            assert df.step.tolist() == list(range(10))
+            assert np.allclose(df.metric.values, np.arange(10) / 10)
+
+    def test_blocks_with_segments_and_downsampling(self):
+        df = self._write_and_read(
+            EventWriter.CSV_FORMAT, segment_max_rows=4, segment_compression="none"
+        )
+        assert df.step.tolist() == list(range(10))
+        df = self._write_and_read(
+            EventWriter.CSV_FORMAT, downsampling={"loss": {"kind": "every_n", "n": 2}}
+        )
+        assert df.step.tolist() == [0, 2, 4, 6, 8]
+
+    def test_large_block(self):
+        block = LoggedMetricArraySpec.make(
+            name="loss", values=np.random.rand(1_000_000), steps=np.arange(1_000_000)
+        )
+        assert block.size == 1_000_000
+        records = np.frombuffer(block.to_binary(), dtype=np.dtype("<i8,<i8,<f8"))
+        assert len(records) == 1_000_000
+
+    def test_large_block_throughput(self):
+        size = 1_000_000
+        values = np.random.rand(size)
+        timestamps = np.datetime64("2023-01-01", "ns") + np.arange(size).astype(
+            "timedelta64[ms]"
+        )
+        # Logging a block and writing it in the binary format, end to end
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, events_format="binary"
+        )
+        start = time.perf_counter()
+        block = LoggedMetricArraySpec.make(
+            name="loss", values=values, steps=np.arange(size), timestamps=timestamps
+        )
+        ew.write([block])
+        ew.flush()
+        assert time.perf_counter() - start < 1
+        ew.close()
+        assert len(block.to_binary()) == 24 * size
+
+        # The csv rows format each value as its shortest repr, about 1s per 1M values
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND)
+        start = time.perf_counter()
+        ew.write([block])
+        ew.flush()
+        assert time.perf_counter() - start < 3
+        ew.close()
+
+        rows = block.to_csv().split("\n")
+        assert len(rows) == size
+        for i in [0, 1, 999, 123_456, size - 1]:
+            assert (
+                rows[i]
+                == LoggedMetricSpec(
+                    "loss",
+                    int(block.steps[i]),
+                    int(block.timestamps[i]),
+                    float(block.values[i]),
+                ).to_csv()
+            )
+
+    def test_block_csv_special_values(self):
+        block = LoggedMetricArraySpec.make(
+            name="loss",
+            values=[float("nan"), float("inf"), -1e-300, 1.0, -0.0, 1e16],
+            steps=[-3, 0, 7, 10**12, 5, -(2**63)],
+            timestamps=[0] * 6,
+        )
+        assert block.to_csv(TimestampFormatter("epoch_ns")).split("\n") == [
+            "-3|0|nan",
+            "0|0|inf",
+            "7|0|-1e-300",
+            "1000000000000|0|1.0",
+            "5|0|-0.0",
+            "-9223372036854775808|0|1e+16",
+        ]
+        block = LoggedMetricArraySpec.make(name="loss", values=[0.5], timestamps=[-1])
+        assert block.to_csv() == "|1969-12-31 23:59:59+00:00|0.5"
+        assert LoggedMetricArraySpec.make(name="loss", values=[]).to_csv() == ""
+
+
+@pytest.mark.serialization_mark
+class TestTimestampFormat(BaseTestCase):
+    def test_write_compact_timestamps(self):
+        run_path = tempfile.mkdtemp()
+        writer = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, timestamp_format="epoch_ns"
+        )
+        timestamp = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        writer.write(
+            [
+                LoggedMetricSpec.make(name="loss", metric=0.1, step=1),
+                LoggedMetricSpec.make(
+                    name="loss", metric=0.2, step=2, timestamp=timestamp
+                ),
+                LoggedEventSpec(
+                    name="loss",
+                    kind="metric",
+                    event=V1Event.make(step=3, metric=0.3, timestamp=timestamp),
+                ),
+            ]
+        )
+        writer.close()
+        path = get_event_path(run_path, "metric", "loss")
+        with open(path) as f:
+            rows = f.read().split("\n")[1:]
+        assert [r.split("|")[1].isdigit() for r in rows] == [True, True, True]
+        df = V1Events.read(name="loss", kind="metric", data=path).df
+        assert df.timestamp.tolist()[1:] == [timestamp, timestamp]
+
+        with pytest.raises(ValueError):
+            EventWriter(
+                run_path, backend=EventWriter.EVENTS_BACKEND, timestamp_format="foo"
+            )
+
+    def test_clock_reanchoring(self):
+        wall = [1_000_000_000_000]
+        monotonic = [0]
+        with patch(
+            "traceml.events.clock.time.time_ns", side_effect=lambda: wall[0]
+        ), patch(
+            "traceml.events.clock.time.monotonic_ns", side_effect=lambda: monotonic[0]
+        ):
+            anchored = AnchoredClock()
+            reanchored = AnchoredClock(reanchor_secs=1)
+            # The wall clock is corrected forward
+            wall[0] += 5_000_000_000
+            monotonic[0] += 500_000_000
+            assert anchored.now_ns() == reanchored.now_ns() == 1_000_500_000_000
+            monotonic[0] += 1_000_000_000
+            assert anchored.now_ns() == 1_001_500_000_000
+            assert reanchored.now_ns() == 1_005_000_000_000
+            # A wall clock set backward does not move the timestamps backward
+            wall[0] -= 10_000_000_000
+            monotonic[0] += 1_000_000_000
+            assert reanchored.now_ns() == 1_006_000_000_000
+
+        with pytest.raises(ValueError):
+            AnchoredClock(reanchor_secs=0)
+
+    def test_events_use_the_given_clock(self):
+        event_clock = AnchoredClock()
+        with patch.object(
+            event_clock, "now_ns", return_value=1_672_531_200_000_000_000
+        ):
+            event = V1Event.make(step=1, text="a", event_clock=event_clock)
+            metric = LoggedMetricSpec.make(
+                name="loss", metric=0.1, event_clock=event_clock
+            )
+            resources = stamp_events(
+                metrics_dict_to_list({"cpu": 0.5}), event_clock=event_clock
+            )
+        timestamp = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        assert event.timestamp == timestamp
+        assert metric.timestamp == 1_672_531_200_000_000_000
+        assert resources[0].event.timestamp == timestamp
+        assert resources[0].event.metric == 0.5
@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
 import numpy as np
 import os
 import pandas as pd
@@ -46,6 +47,7 @@ from polyaxon.lifecycle import V1ProjectFeature
 from polyaxon.utils.test_utils import TestEnvVarsCase, tensor_np
 from traceml.artifacts import V1ArtifactKind
 from traceml.events import V1Events, get_asset_path, get_event_path
+from traceml.serialization.stats import get_writer_metrics
 from traceml.serialization.writer import EventFileWriter, ResourceFileWriter
 from traceml.tracking.run import Run
 
@@ -281,6 +283,49 @@ class TestRunTracking(TestEnvVarsCase):
             == ctx_paths.CONTEXT_MOUNT_RUN_OUTPUTS_FORMAT.format(uid)
         )
 
+    def test_events_segments_options(self):
+        settings.CLIENT_CONFIG.is_managed = False
+        settings.CLIENT_CONFIG.is_offline = True
+        os.environ[EV_KEYS_COLLECT_ARTIFACTS] = "false"
+        os.environ[EV_KEYS_COLLECT_RESOURCES] = "false"
+        with patch("traceml.tracking.run.Run._set_exit_handler"):
+            run = Run(
+                project="test.test",
+                track_code=False,
+                track_env=False,
+                events_segments={"max_rows": 10, "compression": "gzip"},
+            )
+        assert run._event_logger_options["segment_max_rows"] == 10
+        assert run._event_logger_options["segment_compression"] == "gzip"
+
+        with self.assertRaises(ValueError):
+            Run(project="test.test", events_segments={"max_files": 10})
+
+        run._no_op = True
+        with patch("traceml.tracking.run.EventFileWriter") as mock_call:
+            run.set_run_event_logger()
+        assert mock_call.call_count == 0
+
+    def test_run_clock(self):
+        settings.CLIENT_CONFIG.is_managed = False
+        settings.CLIENT_CONFIG.is_offline = True
+        os.environ[EV_KEYS_COLLECT_ARTIFACTS] = "false"
+        os.environ[EV_KEYS_COLLECT_RESOURCES] = "false"
+        with patch("traceml.tracking.run.Run._set_exit_handler"):
+            run = Run(project="test.test", track_code=False, track_env=False)
+        with patch("traceml.tracking.run.ResourceFileWriter") as mock_call:
+            run.set_run_resource_logger()
+        assert mock_call.call_args[1]["event_clock"] is run._clock
+
+        with patch.object(run, "_add_event") as add_event, patch.object(
+            run._clock, "now_ns", return_value=1_672_531_200_000_000_000
+        ):
+            run.log_text(name="text", text="foo", step=1)
+        event = add_event.call_args[0][0].event
+        assert event.timestamp == datetime.datetime(
+            2023, 1, 1, tzinfo=datetime.timezone.utc
+        )
+
     def test_event_logger_from_a_managed_run(self):
         uid = uuid.uuid4().hex
         # Set managed flag
@@ -454,6 +499,25 @@ class TestRunLogging(TestEnvVarsCase):
         results = V1Events.read(kind="metric", name="metric1", data=events_file)
         assert len(results.df.values) == 1
 
+    def test_get_writer_stats(self):
+        with patch("traceml.tracking.run.Run._log_has_metrics"):
+            self.run.log_metrics(step=1, metric1=1.1, metric2=1.2)
+        self.event_logger.flush()
+        stats = self.run.get_writer_stats()
+        assert stats["events"]["queue"]["hwm"] >= 1
+        assert stats["events"]["flush"]["count"] == 1
+        assert stats["events"]["flush"]["last_events"] == 2
+        assert stats["events"]["flush"]["last_bytes"] > 0
+        assert stats["events"]["flush"]["latency"]["count"] == 1
+        assert stats["events"]["handles"]["open"] == 2
+        assert stats["resources"]["queue"]["max_size"] == 20
+
+        metrics = get_writer_metrics(stats)
+        assert metrics["writer_events_flush_events"] == 2
+        assert metrics["writer_events_open_files"] == 2
+        assert metrics["writer_events_errors"] == 0
+        assert "writer_resources_queue_hwm" in metrics
+
     def test_log_multiple_metrics(self):
         assert (
             os.path.exists(get_event_path(self.run_path, kind=V1ArtifactKind.METRIC))
@@ -520,6 +584,67 @@ class TestRunLogging(TestEnvVarsCase):
         results = V1Events.read(kind="metric", name="metric3", data=events_file)
         assert len(results.df.values) == 1
 
+    def test_log_metric_array(self):
+        values = np.random.rand(1000)
+        timestamps = np.datetime64("2023-01-01T00:00:00", "ns") + np.arange(
+            1000
+        ).astype("timedelta64[s]")
+        with patch("traceml.tracking.run.Run._log_has_metrics") as log_metrics:
+            self.run.log_metric_array(
+                name="loss",
+                values=values,
+                steps=np.arange(1000),
+                timestamps=timestamps,
+            )
+        assert log_metrics.call_count == 1
+        self.event_logger.flush()
+        events_file = get_event_path(
+            self.run_path, kind=V1ArtifactKind.METRIC, name="loss"
+        )
+        results = V1Events.read(kind="metric", name="loss", data=events_file)
+        assert results.df.step.tolist() == list(range(1000))
+        assert np.allclose(results.df.metric.values, values)
+        assert (
+            results.df.timestamp.dt.tz_localize(None).values.astype("datetime64[ns]")
+            == timestamps
+        ).all()
+
+        # Steps and timestamps are optional
+        with patch("traceml.tracking.run.Run._log_has_metrics"):
+            self.run.log_metric_array(name="loss", values=[1.0, 2.0])
+        self.event_logger.flush()
+        results = V1Events.read(kind="metric", name="loss", data=events_file)
+        assert len(results.df) == 1002
+        assert results.df.step.isna().sum() == 2
+
+        with patch("traceml.tracking.run.Run._log_has_metrics"):
+            with self.assertRaises(ValueError):
+                self.run.log_metric_array(name="loss", values=[[1.0, 2.0]])
+            with self.assertRaises(ValueError):
+                self.run.log_metric_array(name="loss", values=[1.0, 2.0], steps=[1])
+            with self.assertRaises(ValueError):
+                self.run.log_metric_array(name="loss", values=[1.0], steps=[1.5])
+
+    def test_log_metric_arrays(self):
+        with patch("traceml.tracking.run.Run._log_has_metrics") as log_metrics:
+            self.run.log_metric_arrays(
+                steps=[1, 2, 3], metric1=[1.1, 1.2, 1.3], metric2=np.arange(3)
+            )
+        assert log_metrics.call_count == 1
+        self.event_logger.flush()
+        for name, values in [("metric1", [1.1, 1.2, 1.3]), ("metric2", [0, 1, 2])]:
+            events_file = get_event_path(
+                self.run_path, kind=V1ArtifactKind.METRIC, name=name
+            )
+            results = V1Events.read(kind="metric", name=name, data=events_file)
+            assert results.df.step.tolist() == [1, 2, 3]
+            assert results.df.metric.tolist() == values
+            assert results.df.timestamp.nunique() == 1
+
+        with patch("traceml.tracking.run.Run._log_has_metrics"):
+            with self.assertRaises(ValueError):
+                self.run.log_metric_arrays(metric1=[1.1, 1.2], metric2=[1.0])
+
     def test_log_image_from_path(self):
         assert (
             os.path.exists(get_event_path(self.run_path, kind=V1ArtifactKind.IMAGE))
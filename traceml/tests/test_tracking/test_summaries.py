@@ -13,8 +13,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import numpy as np
 import os
+import pandas as pd
 import pytest
+import tempfile
 import uuid
 
 from mock import patch
@@ -23,7 +26,9 @@ from polyaxon import settings
 from polyaxon.env_vars.keys import EV_KEYS_COLLECT_ARTIFACTS, EV_KEYS_COLLECT_RESOURCES
 from polyaxon.utils.test_utils import BaseTestCase
 from traceml.artifacts import V1RunArtifact
-from traceml.events import V1Events
+from traceml.events import LoggedEventSpec, LoggedMetricArraySpec, V1Event, V1Events
+from traceml.events.summaries import SUMMARY_SAMPLE_ROWS
+from traceml.serialization.base import EventWriter
 from traceml.tracking.run import Run
 
 
@@ -335,3 +340,97 @@ class TestEventsSummaries(BaseTestCase):
             )
         ]
         assert last_values == {}
+
+    def test_rotated_metrics_summaries(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path, backend=EventWriter.EVENTS_BACKEND, segment_max_rows=2
+        )
+        for step in range(5):
+            ew.write(
+                LoggedEventSpec(
+                    name="loss",
+                    kind="metric",
+                    event=V1Event.make(step=step, metric=step / 10),
+                )
+            )
+            ew.flush()
+
+        summaries, last_values = self.run._collect_events_summaries(
+            events_path=os.path.join(run_path, "events"),
+            events_kind="metric",
+            last_check=None,
+        )
+        assert len(summaries) == 1
+        assert summaries[0].name == "loss"
+        assert summaries[0].summary["metric"]["count"] == 5
+        assert last_values == {"loss": 0.4}
+
+    def test_running_metrics_summaries(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(
+            run_path,
+            backend=EventWriter.EVENTS_BACKEND,
+            segment_max_rows=2,
+            summaries=True,
+        )
+        for step in range(5):
+            ew.write(
+                LoggedEventSpec(
+                    name="loss",
+                    kind="metric",
+                    event=V1Event.make(step=step, metric=step / 10),
+                )
+            )
+            ew.flush()
+        ew.close()
+
+        event_path = os.path.join(run_path, "events", "metric", "loss.plx")
+        expected = V1Events.read(name="loss", kind="metric", data=event_path)
+        # The series are not read when the writer kept their summaries
+        with patch("traceml.events.schemas.V1Events.read_summary") as read_mock:
+            summaries, last_values = self.run._collect_events_summaries(
+                events_path=os.path.join(run_path, "events"),
+                events_kind="metric",
+                last_check=None,
+            )
+        assert read_mock.call_count == 0
+        assert len(summaries) == 1
+        assert summaries[0].summary["step"] == expected.get_summary()["step"]
+        assert summaries[0].summary["metric"] == pytest.approx(
+            expected.get_summary()["metric"]
+        )
+        assert last_values == {"loss": 0.4}
+
+    def test_running_metrics_summaries_percentiles(self):
+        run_path = tempfile.mkdtemp()
+        ew = EventWriter(run_path, backend=EventWriter.EVENTS_BACKEND, summaries=True)
+        values = np.random.default_rng(0).exponential(size=10 * SUMMARY_SAMPLE_ROWS)
+        ew.write(
+            [
+                LoggedMetricArraySpec.make(
+                    name="loss", values=values, steps=np.arange(len(values))
+                ),
+                LoggedMetricArraySpec.make(
+                    name="accuracy", values=values[:10], steps=np.arange(10)
+                ),
+            ]
+        )
+        ew.close()
+
+        # Only the series larger than the sidecar's sample are read
+        with patch(
+            "traceml.tracking.run.V1Events.read", wraps=V1Events.read
+        ) as read_mock:
+            summaries, _ = self.run._collect_events_summaries(
+                events_path=os.path.join(run_path, "events"),
+                events_kind="metric",
+                last_check=None,
+            )
+        assert read_mock.call_count == 1
+        assert read_mock.call_args[1]["name"] == "loss"
+        summaries = {s.name: s.summary["metric"] for s in summaries}
+        for name, expected in [("loss", values), ("accuracy", values[:10])]:
+            expected = pd.Series(expected).describe().to_dict()
+            for k, v in expected.items():
+                assert summaries[name][k] == pytest.approx(v), k
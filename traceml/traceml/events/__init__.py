@@ -19,10 +19,14 @@ from traceml.events.paths import (
     get_event_assets_path,
     get_event_path,
     get_resource_path,
+    get_shard_name,
+    get_shards_paths,
 )
 from traceml.events.schemas import (
     LoggedEventListSpec,
     LoggedEventSpec,
+    LoggedMetricArraySpec,
+    LoggedMetricSpec,
     V1Event,
     V1EventArtifact,
     V1EventAudio,
@@ -0,0 +1,129 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import datetime
+import os
+import struct
+
+from typing import Iterable, Optional, Union
+
+# A binary metric file is a 16 bytes header followed by fixed-width records:
+#   header: magic (4s), version (uint16), reserved (uint16),
+#           record size (uint32), reserved (uint32)
+#   record: step (int64), timestamp in epoch nanoseconds (int64), value (float64)
+# Missing steps and timestamps are stored as the smallest int64,
+# which is also the value pandas uses to represent `NaT`.
+BINARY_MAGIC = b"PLXB"
+BINARY_VERSION = 1
+BINARY_EXTENSION = "plxb"
+BINARY_NULL = -(2**63)
+
+_HEADER = struct.Struct("<4sHHII")
+_RECORD = struct.Struct("<qqd")
+HEADER_SIZE = _HEADER.size
+RECORD_SIZE = _RECORD.size
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def get_binary_header() -> bytes:
+    return _HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, RECORD_SIZE, 0)
+
+
+def is_binary_file(path: str) -> bool:
+    if not path or not os.path.isfile(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def to_epoch_ns(value: Union[datetime.datetime, int, None]) -> int:
+    if value is None:
+        return BINARY_NULL
+    if isinstance(value, int):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    delta = value - _EPOCH
+    return (
+        delta.days * 86400 + delta.seconds
+    ) * 1_000_000_000 + delta.microseconds * 1000
+
+
+def from_epoch_ns(value: int) -> Optional[datetime.datetime]:
+    if value == BINARY_NULL:
+        return None
+    return _EPOCH + datetime.timedelta(microseconds=value // 1000)
+
+
+def encode_record(step: Optional[int], timestamp: int, value: float) -> bytes:
+    return _RECORD.pack(
+        BINARY_NULL if step is None else step,
+        timestamp,
+        value,
+    )
+
+
+def encode_events(events: Iterable) -> bytes:
+    return b"".join(
+        encode_record(e.step, to_epoch_ns(e.timestamp), e.metric) for e in events
+    )
+
+
+def get_records_dtype():
+    import numpy as np
+
+    return np.dtype([("step", "<i8"), ("timestamp", "<i8"), ("metric", "<f8")])
+
+
+def _validate_header(header: bytes, path: str):
+    magic, version, _, record_size, _ = _HEADER.unpack(header[:HEADER_SIZE])
+    if magic != BINARY_MAGIC or record_size != RECORD_SIZE:
+        raise ValueError("Received an invalid binary events file: {}".format(path))
+    if version > BINARY_VERSION:
+        raise ValueError(
+            "Received a binary events file with an unsupported version {}".format(
+                version
+            )
+        )
+
+
+def read_records(path: str):
+    """Maps the records of a binary metric file without parsing.
+
+    A trailing partial record, e.g. one that is still being written, is ignored.
+    """
+    import numpy as np
+
+    with open(path, "rb") as f:
+        _validate_header(f.read(HEADER_SIZE), path)
+
+    dtype = get_records_dtype()
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+    if count <= 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def decode_records(data: bytes, path: str = ""):
+    """Decodes the records of an in-memory binary metric file, e.g. a decompressed segment."""
+    import numpy as np
+
+    _validate_header(data, path)
+    dtype = get_records_dtype()
+    count = (len(data) - HEADER_SIZE) // RECORD_SIZE
+    if count <= 0:
+        return np.empty(0, dtype=dtype)
+    return np.frombuffer(data, dtype=dtype, count=count, offset=HEADER_SIZE)
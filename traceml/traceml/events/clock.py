@@ -0,0 +1,198 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import datetime
+import time
+
+from typing import Optional, Tuple, Union
+
+from clipped.utils.enums import PEnum
+
+from traceml.events.binary import from_epoch_ns, to_epoch_ns
+
+
+class TimestampFormat(str, PEnum):
+    """Format of the timestamps in the csv event files.
+
+    * iso: `2023-01-01 00:00:00.000000+00:00` (default), the format of the datetimes' str.
+    * epoch_ns: compact integer epoch nanoseconds, e.g. `1672531200000000000`.
+    """
+
+    ISO = "iso"
+    EPOCH_NS = "epoch_ns"
+
+
+class AnchoredClock:
+    """Wall clock in epoch nanoseconds derived from a monotonic clock.
+
+    The wall time is read once when the clock is created, the timestamps are then
+    the anchor plus the monotonic time elapsed, which is cheaper than building
+    a timezone aware datetime per event and never goes backward.
+
+    With `reanchor_secs` the wall time is read again once the anchor is older,
+    e.g. to follow the system clock's corrections in a long lived process,
+    a wall time behind the clock's last timestamps is ignored.
+    """
+
+    def __init__(self, reanchor_secs: Optional[float] = None):
+        if reanchor_secs is not None and reanchor_secs <= 0:
+            raise ValueError("`reanchor_secs` should be a positive number")
+        self._reanchor_ns = (
+            int(reanchor_secs * 1_000_000_000) if reanchor_secs else None
+        )
+        # The anchor is replaced as a whole for the threads reading it
+        self._anchor = (time.time_ns(), time.monotonic_ns())
+
+    def anchor(self):
+        wall_ns, monotonic_ns = self._anchor
+        now_monotonic_ns = time.monotonic_ns()
+        self._anchor = (
+            max(time.time_ns(), wall_ns + (now_monotonic_ns - monotonic_ns)),
+            now_monotonic_ns,
+        )
+
+    def now_ns(self) -> int:
+        wall_ns, monotonic_ns = self._anchor
+        elapsed_ns = time.monotonic_ns() - monotonic_ns
+        if self._reanchor_ns is not None and elapsed_ns >= self._reanchor_ns:
+            self.anchor()
+            wall_ns, monotonic_ns = self._anchor
+            elapsed_ns = time.monotonic_ns() - monotonic_ns
+        return wall_ns + elapsed_ns
+
+    def now(self) -> datetime.datetime:
+        return from_epoch_ns(self.now_ns())
+
+
+# The clock of the events logged outside of a run, a run anchors its own clock.
+DEFAULT_REANCHOR_SECS = 60
+DEFAULT_CLOCK = AnchoredClock(reanchor_secs=DEFAULT_REANCHOR_SECS)
+
+
+def format_int_array(values, width: Optional[int] = None):
+    """Formats an int64 array as ascii digits in one vectorized pass.
+
+    With a `width` the numbers are zero padded, e.g. the microseconds,
+    otherwise the array is padded with NUL bytes to be stripped when the rows are joined.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.int64)
+    negative = values < 0
+    if negative.any() and (values == np.iinfo(np.int64).min).any():
+        # Its absolute value overflows
+        return values.astype("S20")
+    absolute = np.abs(values)
+    remaining = absolute
+    padded = width is not None
+    if not padded:
+        largest = int(absolute.max()) if len(values) else 0
+        width = len(str(largest)) + int(negative.any())
+    # The digits of each position are contiguous while they are computed
+    digits = np.zeros((width, len(values)), dtype=np.uint8)
+    for i in range(width - 1, -1, -1):
+        remaining, digits[i] = np.divmod(remaining, 10)
+        if not remaining.any():
+            break
+    digits += ord("0")
+    digits = np.ascontiguousarray(digits.T)
+    if not padded:
+        lengths = np.ones(len(values), dtype=np.int64)
+        for k in range(1, min(width, 19)):
+            lengths += absolute >= 10**k
+        starts = width - lengths
+        digits[np.arange(width) < starts[:, None]] = 0
+        digits[negative, starts[negative] - 1] = ord("-")
+    return digits.view("S{}".format(width)).ravel()
+
+
+class TimestampFormatter:
+    """Formats the timestamps of the csv rows in the writer thread.
+
+    Epoch nanoseconds are formatted with a cached prefix per second,
+    i.e. only the microseconds are formatted for most of the rows,
+    datetimes are formatted with `str` as in the `V1Event` rows.
+    Both match `str(datetime)`, e.g. the microseconds of an exact second are omitted.
+    """
+
+    def __init__(self, timestamp_format: str = TimestampFormat.ISO):
+        self.timestamp_format = TimestampFormat(timestamp_format)
+        # The second and its prefix are swapped together
+        self._cache = (None, "")  # type: Tuple[Optional[int], str]
+
+    def _get_prefix(self, second: int) -> str:
+        cached_second, prefix = self._cache
+        if cached_second == second:
+            return prefix
+        prefix = from_epoch_ns(second * 1_000_000_000).strftime("%Y-%m-%d %H:%M:%S")
+        self._cache = (second, prefix)
+        return prefix
+
+    def format_array(self, values):
+        """Formats an array of epoch nanoseconds as a fixed width bytes array.
+
+        Each distinct second's prefix is formatted once,
+        the microseconds are formatted as digits. The fraction of an exact second
+        is left as NUL bytes, to be stripped when the rows are joined.
+        """
+        import numpy as np
+
+        if self.timestamp_format == TimestampFormat.EPOCH_NS:
+            return format_int_array(values)
+        seconds, ns = np.divmod(np.asarray(values, dtype=np.int64), 1_000_000_000)
+        changes = np.diff(seconds)
+        if (changes >= 0).all():
+            # The timestamps are usually sorted, the seconds are then grouped
+            changed = np.concatenate([[True], changes > 0])
+            unique_seconds = seconds[changed]
+            indices = np.cumsum(changed) - 1
+        else:
+            unique_seconds, indices = np.unique(seconds, return_inverse=True)
+        prefixes = np.datetime_as_string(
+            unique_seconds.astype("datetime64[s]"), unit="s"
+        ).astype("S19")
+        # `2023-01-01T00:00:00` -> `2023-01-01 00:00:00`
+        prefixes.view(np.uint8).reshape(-1, 19)[:, 10] = ord(" ")
+        fields = np.empty(
+            len(seconds),
+            dtype=[("prefix", "S19"), ("dot", "S1"), ("us", "S6"), ("tz", "S6")],
+        )
+        fields["prefix"] = prefixes[indices]
+        fields["dot"] = b"."
+        us = ns // 1000
+        fields["us"] = format_int_array(us, width=6)
+        fields["tz"] = b"+00:00"
+        exact = us == 0
+        fields["dot"][exact] = b""
+        fields["us"][exact] = b""
+        return fields.view("S32")
+
+    def format(self, value: Union[int, datetime.datetime, None]) -> str:
+        if value is None:
+            return ""
+        if self.timestamp_format == TimestampFormat.EPOCH_NS:
+            if not isinstance(value, int):
+                value = to_epoch_ns(value)
+            return str(value)
+        if not isinstance(value, int):
+            return str(value)
+        second, ns = divmod(value, 1_000_000_000)
+        us = ns // 1000
+        if not us:
+            return "{}+00:00".format(self._get_prefix(second))
+        return "{}.{:06d}+00:00".format(self._get_prefix(second), us)
+
+
+DEFAULT_FORMATTER = TimestampFormatter()
@@ -0,0 +1,301 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+from typing import Iterator, List, Optional, Set, Union
+
+from clipped.utils.enums import get_enum_value
+from clipped.utils.json import orjson_dumps, orjson_loads
+
+from traceml.artifacts.kinds import V1ArtifactKind
+from traceml.events import segments
+from traceml.events.paths import get_event_path, get_resource_path
+from traceml.events.schemas import V1Events
+
+# A run is exported as a hive partitioned Parquet dataset per tree:
+#   {output_path}/events/kind={kind}/name={name}/{basename}-{i}.parquet
+#   {output_path}/resources/kind={kind}/name={name}/{basename}-{i}.parquet
+# The files of a kind share the schema `step`, `timestamp`, `{kind}`,
+# the JSON payloads are converted to struct columns, the free form dicts,
+# e.g. a chart's figure or a model's spec, are kept as JSON strings.
+EVENTS_TREE = "events"
+RESOURCES_TREE = "resources"
+PARTITION_COLUMNS = ["kind", "name"]
+
+# The payload fields with free form values stored as JSON strings
+_JSON_FIELDS = {
+    V1ArtifactKind.CHART: ["figure"],
+    V1ArtifactKind.CONFUSION: ["x", "y", "z"],
+    V1ArtifactKind.MODEL: ["spec"],
+}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+    except ImportError:
+        raise ImportError(
+            "Exporting events to Parquet requires `pyarrow`, "
+            "please run `pip install pyarrow`."
+        )
+    return pa, ds
+
+
+def get_payload_type(kind: str):
+    """Returns the Arrow type of the events' values of a kind."""
+    pa, _ = _import_pyarrow()
+
+    floats = pa.list_(pa.float64())
+    types = {
+        V1ArtifactKind.METRIC: pa.float64(),
+        V1ArtifactKind.IMAGE: pa.struct(
+            [
+                ("height", pa.int64()),
+                ("width", pa.int64()),
+                ("colorspace", pa.int64()),
+                ("path", pa.string()),
+            ]
+        ),
+        V1ArtifactKind.VIDEO: pa.struct(
+            [
+                ("height", pa.int64()),
+                ("width", pa.int64()),
+                ("colorspace", pa.int64()),
+                ("path", pa.string()),
+                ("content_type", pa.string()),
+            ]
+        ),
+        V1ArtifactKind.AUDIO: pa.struct(
+            [
+                ("sample_rate", pa.float64()),
+                ("num_channels", pa.int64()),
+                ("length_frames", pa.int64()),
+                ("path", pa.string()),
+                ("content_type", pa.string()),
+            ]
+        ),
+        V1ArtifactKind.DATAFRAME: pa.struct(
+            [("path", pa.string()), ("content_type", pa.string())]
+        ),
+        V1ArtifactKind.HISTOGRAM: pa.struct([("values", floats), ("counts", floats)]),
+        V1ArtifactKind.CURVE: pa.struct(
+            [
+                ("kind", pa.string()),
+                ("x", floats),
+                ("y", floats),
+                ("annotation", pa.string()),
+            ]
+        ),
+        V1ArtifactKind.CHART: pa.struct(
+            [("kind", pa.string()), ("figure", pa.string())]
+        ),
+        V1ArtifactKind.CONFUSION: pa.struct(
+            [("x", pa.string()), ("y", pa.string()), ("z", pa.string())]
+        ),
+        V1ArtifactKind.ARTIFACT: pa.struct(
+            [("kind", pa.string()), ("path", pa.string())]
+        ),
+        V1ArtifactKind.MODEL: pa.struct(
+            [("framework", pa.string()), ("path", pa.string()), ("spec", pa.string())]
+        ),
+    }
+    # html, text and the unknown kinds are kept as strings
+    return types.get(get_enum_value(kind), pa.string())
+
+
+def get_events_schema(kind: str):
+    """Returns the Arrow schema of the exported events of a kind."""
+    pa, _ = _import_pyarrow()
+
+    kind = get_enum_value(kind)
+    return pa.schema(
+        [
+            ("step", pa.int64()),
+            ("timestamp", pa.timestamp("ns", tz="UTC")),
+            (kind, get_payload_type(kind)),
+            ("kind", pa.dictionary(pa.int32(), pa.string())),
+            ("name", pa.dictionary(pa.int32(), pa.string())),
+        ]
+    )
+
+
+def _decode_payload(value, json_fields: List[str]):
+    if not isinstance(value, str):
+        return None
+    payload = orjson_loads(value)
+    for field in json_fields:
+        if payload.get(field) is not None:
+            payload[field] = orjson_dumps(payload[field])
+    return payload
+
+
+def events_to_batch(kind: str, name: str, df):
+    """Converts a DataFrame of events to an Arrow record batch."""
+    import pandas as pd
+
+    pa, _ = _import_pyarrow()
+
+    kind = get_enum_value(kind)
+    schema = get_events_schema(kind)
+    value_type = schema.field(kind).type
+    values = df[kind]
+    if pa.types.is_struct(value_type):
+        json_fields = _JSON_FIELDS.get(kind, [])
+        values = [_decode_payload(v, json_fields) for v in values]
+    elif pa.types.is_string(value_type):
+        values = values.where(values.notna(), None).astype(object)
+    timestamps = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    size = len(df)
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(df["step"], type=pa.int64(), from_pandas=True),
+            pa.array(timestamps, type=schema.field("timestamp").type, from_pandas=True),
+            pa.array(values, type=value_type, from_pandas=True),
+            pa.DictionaryArray.from_arrays(
+                pa.array([0] * size, type=pa.int32()), pa.array([kind])
+            ),
+            pa.DictionaryArray.from_arrays(
+                pa.array([0] * size, type=pa.int32()), pa.array([name])
+            ),
+        ],
+        schema=schema,
+    )
+
+
+def iter_batches(
+    kind: str, name: str, path: str, chunk_rows: Optional[int] = None
+) -> Iterator:
+    """Streams an event series, rotated or sharded, as Arrow record batches."""
+    for df in V1Events.iter_read(
+        kind=kind, name=name, path=path, chunk_rows=chunk_rows
+    ):
+        yield events_to_batch(kind, name, df)
+
+
+def export_series(
+    kind: str,
+    name: str,
+    path: str,
+    output_path: str,
+    basename: str = "part",
+    chunk_rows: Optional[int] = None,
+    compression: str = "zstd",
+):
+    """Exports an event series to a hive partitioned Parquet dataset.
+
+    The series is streamed chunk by chunk, it's never loaded entirely in memory.
+
+    Args:
+        kind: str, the events kind.
+        name: str, the series name.
+        path: str, the event file path.
+        output_path: str, the dataset's root path.
+        basename: str, optional, the files' prefix in the series' partition,
+            e.g. a run's uuid to export several runs to the same dataset.
+        chunk_rows: int, optional, number of rows read per chunk.
+        compression: str, optional, the Parquet compression codec.
+    """
+    pa, ds = _import_pyarrow()
+
+    kind = get_enum_value(kind)
+    schema = get_events_schema(kind)
+    ds.write_dataset(
+        iter_batches(kind, name, path, chunk_rows=chunk_rows),
+        output_path,
+        schema=schema,
+        format="parquet",
+        partitioning=ds.partitioning(
+            pa.schema([schema.field(c) for c in PARTITION_COLUMNS]), flavor="hive"
+        ),
+        basename_template="{}-{{i}}.parquet".format(basename),
+        existing_data_behavior="overwrite_or_ignore",
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+    )
+
+
+def export_run(
+    run_path: str,
+    output_path: str,
+    kinds: Optional[Union[Set[str], List[str]]] = None,
+    names: Optional[Union[Set[str], List[str]]] = None,
+    resources: bool = True,
+    basename: str = "part",
+    chunk_rows: Optional[int] = None,
+    compression: str = "zstd",
+) -> List[str]:
+    """Exports the events and resources of a run to Parquet datasets.
+
+    Args:
+        run_path: str, the run's artifacts path.
+        output_path: str, the export's root path,
+            the `events` and `resources` datasets are created under this path.
+        kinds: List[str], optional, to only export the events of these kinds.
+        names: List[str], optional, to only export the series with these names.
+        resources: bool, optional, to also export the resources series.
+        basename: str, optional, the files' prefix, e.g. the run's uuid.
+        chunk_rows: int, optional, number of rows read per chunk.
+        compression: str, optional, the Parquet compression codec.
+
+    Returns:
+        The paths of the datasets created.
+    """
+    kinds = {get_enum_value(k) for k in kinds} if kinds is not None else None
+    trees = [(EVENTS_TREE, get_event_path(run_path))]
+    if resources:
+        trees.append((RESOURCES_TREE, get_resource_path(run_path)))
+    datasets = []
+    for tree, tree_path in trees:
+        if not os.path.isdir(tree_path):
+            continue
+        dataset_path = os.path.join(output_path, tree)
+        for kind in sorted(os.listdir(tree_path)):
+            kind_path = os.path.join(tree_path, kind)
+            if not os.path.isdir(kind_path) or (
+                kinds is not None and kind not in kinds
+            ):
+                continue
+            files = sorted(os.path.join(kind_path, f) for f in os.listdir(kind_path))
+            for name, event_path, _ in segments.get_events_files(files):
+                if names is not None and name not in names:
+                    continue
+                export_series(
+                    kind=kind,
+                    name=name,
+                    path=event_path,
+                    output_path=dataset_path,
+                    basename=basename,
+                    chunk_rows=chunk_rows,
+                    compression=compression,
+                )
+                if dataset_path not in datasets:
+                    datasets.append(dataset_path)
+    return datasets
+
+
+def read_dataset(dataset_path: str, kind: str):
+    """Opens the exported events of a kind as an Arrow dataset.
+
+    The `name` partition column is dictionary encoded.
+    """
+    _, ds = _import_pyarrow()
+
+    kind = get_enum_value(kind)
+    return ds.dataset(
+        os.path.join(dataset_path, "kind={}".format(kind)),
+        format="parquet",
+        partitioning=ds.HivePartitioning.discover(infer_dictionary=True),
+    )
@@ -0,0 +1,258 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import struct
+
+from typing import List, Optional, Tuple
+
+from traceml.events import binary, segments
+
+# A sparse index sidecar `{name}.plx.index` is written next to an event file,
+# e.g. `loss.plx` or the sealed segment `loss.plx.3.gz` has `loss.plx.3.index`:
+#   header: magic (4s), version (uint16), reserved (uint16),
+#           entry size (uint32), reserved (uint32)
+#   entry: first row, rows, start offset, end offset,
+#          min step, max step, min timestamp, max timestamp (int64)
+# Each entry covers a block of rows, the offsets are the block's byte range
+# in the uncompressed event file, the csv rows of a block start with their `\n`.
+# Missing steps and timestamps are ignored by the ranges, a block without
+# steps or timestamps stores `BINARY_NULL` as its range.
+INDEX_MAGIC = b"PLXI"
+INDEX_VERSION = 1
+INDEX_EXTENSION = "index"
+
+_HEADER = struct.Struct("<4sHHII")
+_ENTRY = struct.Struct("<qqqqqqqq")
+HEADER_SIZE = _HEADER.size
+ENTRY_SIZE = _ENTRY.size
+
+
+def get_index_path(event_path: str) -> str:
+    # The index of a sealed segment is shared by its compressed file
+    compression = segments.get_path_compression(event_path)
+    if compression in segments.COMPRESSION_EXTENSIONS:
+        ext = segments.COMPRESSION_EXTENSIONS[compression]
+        event_path = event_path[: -len(ext) - 1]
+    return "{}.{}".format(event_path, INDEX_EXTENSION)
+
+
+def get_index_dtype():
+    import numpy as np
+
+    return np.dtype(
+        [
+            ("row", "<i8"),
+            ("rows", "<i8"),
+            ("start", "<i8"),
+            ("end", "<i8"),
+            ("step_min", "<i8"),
+            ("step_max", "<i8"),
+            ("timestamp_min", "<i8"),
+            ("timestamp_max", "<i8"),
+        ]
+    )
+
+
+def read_index(event_path: str):
+    """Returns the index entries of an event file, or None if it has no index."""
+    import numpy as np
+
+    index_path = get_index_path(event_path)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, "rb") as f:
+        data = f.read()
+    magic, version, _, entry_size, _ = _HEADER.unpack(data[:HEADER_SIZE])
+    if magic != INDEX_MAGIC or entry_size != ENTRY_SIZE or version > INDEX_VERSION:
+        return None
+    count = (len(data) - HEADER_SIZE) // ENTRY_SIZE
+    return np.frombuffer(data, dtype=get_index_dtype(), count=count, offset=HEADER_SIZE)
+
+
+def _overlaps(
+    entry, field: str, value_range: Tuple[Optional[int], Optional[int]]
+) -> bool:
+    min_value, max_value = value_range
+    if min_value is None and max_value is None:
+        return True
+    if entry["{}_min".format(field)] == binary.BINARY_NULL:
+        return False
+    if min_value is not None and entry["{}_max".format(field)] < min_value:
+        return False
+    if max_value is not None and entry["{}_min".format(field)] > max_value:
+        return False
+    return True
+
+
+def get_index_ranges(
+    index,
+    size: int,
+    first_offset: int,
+    steps_range: Tuple[Optional[int], Optional[int]] = (None, None),
+    timestamps_range: Tuple[Optional[int], Optional[int]] = (None, None),
+) -> List[Tuple[int, int]]:
+    """Returns the merged byte ranges of the event file to read for a window.
+
+    The blocks of the index are selected by their steps and timestamps ranges,
+    the bytes not covered by the index, e.g. the rows written after the last block,
+    are always read.
+
+    Args:
+        index: the index entries.
+        size: int, the event file size.
+        first_offset: int, offset of the first row, i.e. the header size.
+        steps_range: the min and max steps, in the events' order.
+        timestamps_range: the min and max timestamps in epoch nanoseconds.
+    """
+    ranges = []
+    position = first_offset
+    for entry in index:
+        start, end = int(entry["start"]), int(entry["end"])
+        if start < position or end > size:
+            # The index does not match the file, the remaining bytes are read
+            break
+        if start > position:
+            ranges.append((position, start))
+        if _overlaps(entry, "step", steps_range) and _overlaps(
+            entry, "timestamp", timestamps_range
+        ):
+            ranges.append((start, end))
+        position = end
+    if position < size:
+        ranges.append((position, size))
+
+    merged = []
+    for start, end in ranges:
+        if merged and merged[-1][1] == start:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class IndexBuilder:
+    """Builds the sparse index of an event file as rows are appended.
+
+    A block entry is appended to the sidecar every `index_rows` rows,
+    the last partial block is written when the builder is closed.
+
+    Args:
+        event_path: str, the indexed event file.
+        index_rows: int, number of rows per block.
+        rows: int, number of rows already in the file.
+        offset: int, the file size.
+    """
+
+    def __init__(self, event_path: str, index_rows: int, rows: int, offset: int):
+        self.index_path = get_index_path(event_path)
+        self.index_rows = index_rows
+        self.rows = rows
+        self.offset = offset
+        # row, start, min step, max step, min timestamp, max timestamp
+        self._block = None  # type: Optional[List[int]]
+
+    @classmethod
+    def resume(
+        cls, event_path: str, index_rows: int, first_offset: int
+    ) -> "IndexBuilder":
+        """Creates a builder for an existing event file.
+
+        The rows after the last block of the index, if any, are counted,
+        the new rows start a new block.
+        """
+        size = os.path.getsize(event_path)
+        index = read_index(event_path)
+        row, offset = 0, first_offset
+        if index is not None and len(index) and index[-1]["end"] <= size:
+            row = int(index[-1]["row"] + index[-1]["rows"])
+            offset = int(index[-1]["end"])
+        elif index is not None:
+            os.remove(get_index_path(event_path))
+        if binary.is_binary_file(event_path):
+            row += (size - offset) // binary.RECORD_SIZE
+        else:
+            with open(event_path, "rb") as f:
+                f.seek(offset)
+                while True:
+                    data = f.read(1 << 20)
+                    if not data:
+                        break
+                    row += data.count(b"\n")
+        return cls(event_path, index_rows=index_rows, rows=row, offset=size)
+
+    @staticmethod
+    def _update_range(min_value: int, max_value: int, values) -> Tuple[int, int]:
+        values = values[values != binary.BINARY_NULL]
+        if not len(values):
+            return min_value, max_value
+        if min_value == binary.BINARY_NULL:
+            return int(values.min()), int(values.max())
+        return min(min_value, int(values.min())), max(max_value, int(values.max()))
+
+    def add(self, steps, timestamps, offsets, end: int) -> None:
+        """Adds appended rows to the index.
+
+        Args:
+            steps: the rows' steps as int64, `BINARY_NULL` if missing.
+            timestamps: the rows' timestamps in epoch nanoseconds.
+            offsets: the rows' start offsets in the file.
+            end: int, the file size after the rows.
+        """
+        null = binary.BINARY_NULL
+        entries = []
+        count = len(steps)
+        i = 0
+        while i < count:
+            if self._block is None:
+                self._block = [self.rows + i, int(offsets[i]), null, null, null, null]
+            block_rows = self.rows + i - self._block[0]
+            take = min(count - i, self.index_rows - block_rows)
+            block = self._block
+            block[2], block[3] = self._update_range(
+                block[2], block[3], steps[i : i + take]
+            )
+            block[4], block[5] = self._update_range(
+                block[4], block[5], timestamps[i : i + take]
+            )
+            i += take
+            if block_rows + take >= self.index_rows:
+                block_end = int(offsets[i]) if i < count else end
+                entries.append(self._get_entry(block_end, self.rows + i))
+                self._block = None
+        self.rows += count
+        self.offset = end
+        self._write(entries)
+
+    def _get_entry(self, end: int, next_row: int) -> bytes:
+        row, start, step_min, step_max, ts_min, ts_max = self._block
+        return _ENTRY.pack(
+            row, next_row - row, start, end, step_min, step_max, ts_min, ts_max
+        )
+
+    def _write(self, entries: List[bytes]):
+        if not entries:
+            return
+        is_new = not os.path.exists(self.index_path)
+        with open(self.index_path, "ab") as f:
+            if is_new:
+                f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, 0, ENTRY_SIZE, 0))
+            f.write(b"".join(entries))
+
+    def close(self):
+        """Writes the last partial block."""
+        if self._block is not None:
+            self._write([self._get_entry(self.offset, self.rows)])
+            self._block = None
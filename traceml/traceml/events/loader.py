@@ -0,0 +1,185 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Mapping, Optional, Set, Tuple, Union
+
+from clipped.utils.enums import get_enum_value
+
+from traceml.artifacts.kinds import V1ArtifactKind
+from traceml.events import segments
+from traceml.events.paths import get_event_path, get_resource_path
+from traceml.events.schemas import V1Events
+
+
+def get_run_series(
+    run_path: str,
+    kind: str = V1ArtifactKind.METRIC,
+    names: Optional[Union[Set[str], List[str]]] = None,
+    resources: bool = False,
+) -> List[Tuple[str, str]]:
+    """Lists the event series of a run's artifacts path.
+
+    Returns a list of `(name, event_path)`, rotated and sharded series
+    are listed once with the path to pass to `V1Events.read`.
+
+    Args:
+        run_path: str, the run's artifacts path.
+        kind: str, the events kind.
+        names: List[str], optional, to only list the series with these names.
+        resources: bool, optional, to also list the resources series,
+            e.g. `cpu_percent_avg`, from the run's `resources` directory.
+    """
+    kind = get_enum_value(kind)
+    dirs = [get_event_path(run_path, kind)]
+    if resources:
+        dirs.append(get_resource_path(run_path, kind))
+    series = []
+    for dirname in dirs:
+        if not os.path.isdir(dirname):
+            continue
+        files = sorted(os.path.join(dirname, f) for f in os.listdir(dirname))
+        for name, event_path, _ in segments.get_events_files(files):
+            if names is None or name in names:
+                series.append((name, event_path))
+    return series
+
+
+def downsample_df(df, max_points: Optional[int] = None):
+    """Keeps at most `max_points` evenly spaced rows, including the first and last rows."""
+    import numpy as np
+
+    if not max_points or len(df) <= max_points:
+        return df
+    if max_points == 1:
+        return df.iloc[[-1]]
+    positions = np.unique(np.linspace(0, len(df) - 1, max_points).round().astype(int))
+    return df.iloc[positions]
+
+
+def _read_series(args: Tuple[str, str, str, Optional[int]]):
+    name, kind, data, max_points = args
+    df = V1Events.read(kind=kind, name=name, data=data).df
+    return name, downsample_df(df, max_points)
+
+
+def _read_tasks(
+    tasks: List[Tuple[str, str, str, Optional[int]]],
+    max_workers: Optional[int] = None,
+    use_processes: bool = False,
+) -> Dict:
+    if len(tasks) <= 1:
+        return dict(_read_series(t) for t in tasks)
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=max_workers) as executor:
+        return dict(executor.map(_read_series, tasks))
+
+
+def read_run_series(
+    run_path: str,
+    kind: str = V1ArtifactKind.METRIC,
+    names: Optional[Union[Set[str], List[str]]] = None,
+    resources: bool = False,
+    max_points: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    use_processes: bool = False,
+) -> Dict:
+    """Reads the event series of a run in parallel.
+
+    Args:
+        run_path: str, the run's artifacts path.
+        kind: str, the events kind.
+        names: List[str], optional, to only read the series with these names.
+        resources: bool, optional, to also read the resources series.
+        max_points: int, optional, to downsample each series to at most
+            `max_points` evenly spaced rows.
+        max_workers: int, optional, number of workers of the pool.
+        use_processes: bool, optional, to read the series in a process pool
+            instead of a thread pool, e.g. for many large csv series.
+
+    Returns:
+        The series' DataFrames by name.
+    """
+    if max_points is not None and max_points <= 0:
+        raise ValueError("`max_points` should be a positive integer")
+    kind = get_enum_value(kind)
+    tasks = [
+        (name, kind, event_path, max_points)
+        for name, event_path in get_run_series(
+            run_path, kind=kind, names=names, resources=resources
+        )
+    ]
+    return _read_tasks(tasks, max_workers=max_workers, use_processes=use_processes)
+
+
+def read_events_series(
+    events: List[Dict],
+    max_points: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    use_processes: bool = False,
+) -> Dict:
+    """Parses the event series returned by the API, e.g. `get_events`, in parallel.
+
+    Args:
+        events: List[Dict], the series with their `name`, `kind` and `data`.
+        max_points: int, optional, to downsample each series to at most
+            `max_points` evenly spaced rows.
+        max_workers: int, optional, number of workers of the pool.
+        use_processes: bool, optional, to parse the series in a process pool
+            instead of a thread pool.
+
+    Returns:
+        The series' DataFrames by name.
+    """
+    if max_points is not None and max_points <= 0:
+        raise ValueError("`max_points` should be a positive integer")
+    tasks = [
+        (e["name"], get_enum_value(e["kind"]), e["data"], max_points) for e in events
+    ]
+    return _read_tasks(tasks, max_workers=max_workers, use_processes=use_processes)
+
+
+def get_tidy_df(dfs: Mapping, kind: str = V1ArtifactKind.METRIC):
+    """Concatenates the series in a long DataFrame with a `name` column."""
+    import pandas as pd
+
+    frames = [df.assign(name=name) for name, df in dfs.items() if not df.empty]
+    if not frames:
+        return pd.DataFrame(columns=["step", "timestamp", get_enum_value(kind), "name"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def get_wide_df(dfs: Mapping, kind: str = V1ArtifactKind.METRIC):
+    """Joins the series on their steps in a DataFrame with a column per series.
+
+    The rows without a step are dropped, and a step logged several times
+    in a series keeps its last value.
+    """
+    import pandas as pd
+
+    kind = get_enum_value(kind)
+    columns = []
+    for name, df in dfs.items():
+        df = df[df.step.notna()]
+        column = df.groupby("step", sort=False)[kind].last()
+        column.name = name
+        columns.append(column)
+    if not columns:
+        return pd.DataFrame(columns=["step"])
+    df = pd.concat(columns, axis=1, join="outer").sort_index()
+    df.index.name = "step"
+    return df.reset_index()
@@ -13,8 +13,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
+import re
+
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 from clipped.utils.enums import get_enum_value
 
@@ -68,3 +71,39 @@ def get_asset_path(
         _path = "{}.{}".format(_path, ext)
 
     return _path
+
+
+def get_shard_name(name: str, rank: Optional[int] = None) -> str:
+    if rank is None:
+        return name
+    return "{}.rank{}".format(name, rank)
+
+
+def get_shards_paths(event_path: str) -> List[str]:
+    """Returns the per-rank shards of an event file ordered by rank.
+
+    A shard is listed if it has an active file or a segments manifest.
+    """
+    dirname, filename = os.path.split(event_path)
+    name, _ = os.path.splitext(filename)
+    if not name or not os.path.isdir(dirname or "."):
+        return []
+    pattern = re.compile(
+        r"^{}\.rank(\d+)\.(plxb?)(\.manifest\.json)?$".format(re.escape(name))
+    )
+    shards = {}
+    for f in os.listdir(dirname or "."):
+        match = pattern.match(f)
+        if not match:
+            continue
+        rank, shard_ext = int(match.group(1)), match.group(2)
+        if not match.group(3):
+            shards[rank] = os.path.join(dirname, f)
+        else:
+            shards.setdefault(
+                rank,
+                os.path.join(
+                    dirname, "{}.{}".format(get_shard_name(name, rank), shard_ext)
+                ),
+            )
+    return [shards[k] for k in sorted(shards)]
@@ -14,22 +14,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import datetime
+import functools
+import io
 import json
+import os
 
 from collections import namedtuple
-from typing import Dict, List, Mapping, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Union
 
 from clipped.config.parser import ConfigParser
 from clipped.config.schema import skip_partial
 from clipped.utils.csv import validate_csv
 from clipped.utils.dates import parse_datetime
 from clipped.utils.enums import PEnum
+from clipped.utils.json import orjson_loads
 from clipped.utils.np import sanitize_np_types
-from clipped.utils.tz import now
 from pydantic import StrictStr, root_validator
 
 from polyaxon.schemas.base import BaseSchemaModel
 from traceml.artifacts.kinds import V1ArtifactKind
+from traceml.events import binary, clock, paths, segments
+from traceml.events.index import get_index_ranges, read_index
+from traceml.events.summaries import RunningStats
 
 
 class SearchView(str, PEnum):
@@ -310,6 +316,7 @@ class V1Event(BaseSchemaModel):
         artifact: V1EventArtifact = None,
         model: V1EventModel = None,
         dataframe: V1EventDataframe = None,
+        event_clock: Optional["clock.AnchoredClock"] = None,
     ) -> "V1Event":
         if isinstance(timestamp, str):
             try:
@@ -318,7 +325,9 @@ class V1Event(BaseSchemaModel):
                 raise ValueError("Received an invalid timestamp") from e
 
         return cls(
-            timestamp=timestamp if timestamp else now(tzinfo=True),
+            timestamp=timestamp
+            if timestamp
+            else (event_clock or clock.DEFAULT_CLOCK).now(),
             step=step,
             metric=metric,
             image=image,
@@ -363,17 +372,41 @@ class V1Event(BaseSchemaModel):
         if self.dataframe is not None:
             return self.dataframe.to_json() if dump else self.dataframe
 
-    def to_csv(self) -> str:
+    def to_csv(self, formatter: Optional["clock.TimestampFormatter"] = None) -> str:
+        if formatter is not None:
+            timestamp = formatter.format(self.timestamp)
+        else:
+            timestamp = str(self.timestamp) if self.timestamp is not None else ""
         values = [
             str(self.step) if self.step is not None else "",
-            str(self.timestamp) if self.timestamp is not None else "",
+            timestamp,
             self.get_value(dump=True),
         ]
 
         return self._SEPARATOR.join(values)
 
 
+@functools.lru_cache(maxsize=1024)
+def _load_payload(value: str) -> Dict:
+    return orjson_loads(value)
+
+
 class V1Events:
+    DEFAULT_CHUNK_ROWS = 100_000
+    # The kinds with JSON payloads, decoded on access
+    PAYLOAD_KINDS = {
+        V1ArtifactKind.IMAGE,
+        V1ArtifactKind.HISTOGRAM,
+        V1ArtifactKind.AUDIO,
+        V1ArtifactKind.VIDEO,
+        V1ArtifactKind.CHART,
+        V1ArtifactKind.CURVE,
+        V1ArtifactKind.CONFUSION,
+        V1ArtifactKind.ARTIFACT,
+        V1ArtifactKind.MODEL,
+        V1ArtifactKind.DATAFRAME,
+    }
+    DEFAULT_QUANTILE_ROWS = 1_000_000
     ORIENT_CSV = "csv"
     ORIENT_DICT = "dict"
 
@@ -388,19 +421,14 @@ class V1Events:
     ) -> "V1Events":
         import pandas as pd
 
-        if isinstance(data, str):
-            csv = validate_csv(data)
-            if parse_dates:
-                df = pd.read_csv(
-                    csv,
-                    sep=V1Event._SEPARATOR,
-                    parse_dates=["timestamp"],
-                )
-            else:
-                df = pd.read_csv(
-                    csv,
-                    sep=V1Event._SEPARATOR,
-                )
+        if isinstance(data, str) and "\n" not in data and not os.path.exists(data):
+            shards_paths = paths.get_shards_paths(data)
+        else:
+            shards_paths = None
+        if shards_paths:
+            df = cls._read_shards(shards_paths, parse_dates=parse_dates)
+        elif isinstance(data, str):
+            df = cls._read_path(data, parse_dates=parse_dates)
         elif isinstance(data, dict):
             df = pd.DataFrame.from_dict(data)
         else:
@@ -410,17 +438,553 @@ class V1Events:
 
         return cls(name=name, kind=kind, df=df)
 
+    @classmethod
+    def iter_read(
+        cls,
+        kind: str,
+        name: str,
+        path: str,
+        chunk_rows: Optional[int] = None,
+        min_step: Optional[int] = None,
+        max_step: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        parse_dates: bool = True,
+    ) -> Iterator:
+        """Reads an events file as a stream of DataFrames of at most `chunk_rows` rows.
+
+        Rotated series are read segment by segment, the sealed segments outside
+        of the steps range are skipped using the manifest,
+        and the shards of a distributed job are merged by step and timestamp.
+
+        Args:
+            kind: str, the events kind
+            name: str, the events name
+            path: str, the events file path
+            chunk_rows: int, maximum number of rows per chunk
+            min_step: int, optional, only the rows with a step >= `min_step`
+            max_step: int, optional, only the rows with a step <= `max_step`
+            columns: List[str], optional, the columns to return,
+                e.g. `["step", "metric"]`, defaults to all the columns
+            parse_dates: bool, to parse the timestamps
+        """
+        chunk_rows = chunk_rows or cls.DEFAULT_CHUNK_ROWS
+        if chunk_rows <= 0:
+            raise ValueError("`chunk_rows` should be a positive integer")
+        if columns is not None:
+            unknown = set(columns) - {"step", "timestamp", kind}
+            if unknown:
+                raise ValueError(
+                    "Received unknown columns {} for {} events".format(
+                        sorted(unknown), kind
+                    )
+                )
+        steps_range = (min_step, max_step)
+        # The step and the timestamp are always read to filter and merge the rows
+        usecols = (
+            ["step", "timestamp"] + [c for c in columns if c == kind]
+            if columns is not None
+            else None
+        )
+        shards_paths = None
+        if not os.path.exists(path):
+            shards_paths = paths.get_shards_paths(path)
+        if shards_paths:
+            streams = [
+                cls._iter_path(p, chunk_rows, steps_range, parse_dates, usecols)
+                for p in shards_paths
+            ]
+            chunks = cls._iter_merged(streams, chunk_rows)
+        else:
+            chunks = cls._iter_path(path, chunk_rows, steps_range, parse_dates, usecols)
+        for df in chunks:
+            yield df[columns] if columns is not None else df
+
+    @classmethod
+    def _iter_path(
+        cls,
+        path: str,
+        chunk_rows: int,
+        steps_range: tuple,
+        parse_dates: bool,
+        usecols: Optional[List[str]] = None,
+    ) -> Iterator:
+        manifest = segments.read_manifest(path)
+        if manifest is None:
+            if not os.path.exists(path):
+                raise ValueError("Events file not found: {}".format(path))
+            files = [path]
+        else:
+            # Sealed segments outside of the steps range are not opened
+            files = [
+                p
+                for p, segment in zip(
+                    segments.get_segments_paths(path, manifest), manifest["segments"]
+                )
+                if cls._segment_in_range(segment, steps_range)
+            ]
+            if os.path.exists(path):
+                files.append(path)
+        for f in files:
+            for df in cls._iter_segment(f, chunk_rows, parse_dates, usecols):
+                df = cls._filter_steps(df, steps_range)
+                if not df.empty:
+                    yield df
+
+    @staticmethod
+    def _segment_in_range(segment: Dict, steps_range: tuple) -> bool:
+        min_step, max_step = steps_range
+        step = segment.get("step")
+        if min_step is None and max_step is None:
+            return True
+        if not step:
+            return False
+        if min_step is not None and step["max"] < min_step:
+            return False
+        if max_step is not None and step["min"] > max_step:
+            return False
+        return True
+
+    @classmethod
+    def read_window(
+        cls,
+        kind: str,
+        name: str,
+        path: str,
+        min_step: Optional[int] = None,
+        max_step: Optional[int] = None,
+        min_timestamp: Union[datetime.datetime, int, None] = None,
+        max_timestamp: Union[datetime.datetime, int, None] = None,
+    ) -> "V1Events":
+        """Reads the rows of an events file in a steps and/or a time window.
+
+        The sealed segments outside of the window are skipped using the manifest,
+        and only the blocks of the files' sparse index overlapping the window
+        are parsed, files without an index are read entirely.
+
+        Args:
+            kind: str, the events kind
+            name: str, the events name
+            path: str, the events file path
+            min_step: int, optional, only the rows with a step >= `min_step`
+            max_step: int, optional, only the rows with a step <= `max_step`
+            min_timestamp: datetime or epoch nanoseconds, optional,
+                only the rows logged at or after `min_timestamp`
+            max_timestamp: datetime or epoch nanoseconds, optional,
+                only the rows logged at or before `max_timestamp`
+        """
+        steps_range = (min_step, max_step)
+        timestamps_range = tuple(
+            binary.to_epoch_ns(t) if t is not None else None
+            for t in (min_timestamp, max_timestamp)
+        )
+        shards_paths = None
+        if not os.path.exists(path):
+            shards_paths = paths.get_shards_paths(path)
+        if shards_paths:
+            dfs = [
+                cls._read_window_path(p, kind, steps_range, timestamps_range)
+                for p in shards_paths
+            ]
+            df = cls._concat(dfs).sort_values(
+                ["step", "timestamp"], kind="mergesort", na_position="last"
+            )
+        else:
+            df = cls._read_window_path(path, kind, steps_range, timestamps_range)
+        return cls(kind=kind, name=name, df=df.reset_index(drop=True))
+
+    @classmethod
+    def _read_window_path(
+        cls, path: str, kind: str, steps_range: tuple, timestamps_range: tuple
+    ):
+        manifest = segments.read_manifest(path)
+        if manifest is None:
+            if not os.path.exists(path):
+                raise ValueError("Events file not found: {}".format(path))
+            files = [path]
+        else:
+            files = [
+                p
+                for p, segment in zip(
+                    segments.get_segments_paths(path, manifest), manifest["segments"]
+                )
+                if cls._segment_in_range(segment, steps_range)
+                and cls._segment_in_time_range(segment, timestamps_range)
+            ]
+            if os.path.exists(path):
+                files.append(path)
+        dfs = [cls._read_indexed(f, kind, steps_range, timestamps_range) for f in files]
+        if not dfs:
+            import pandas as pd
+
+            return pd.DataFrame(columns=["step", "timestamp", kind])
+        df = cls._filter_steps(cls._concat(dfs), steps_range)
+        return cls._filter_timestamps(df, timestamps_range)
+
+    @staticmethod
+    def _filter_timestamps(df, timestamps_range: tuple):
+        import pandas as pd
+
+        min_timestamp, max_timestamp = timestamps_range
+        tz = getattr(df.timestamp.dtype, "tz", None)
+        if min_timestamp is not None:
+            df = df[df.timestamp >= pd.Timestamp(min_timestamp, unit="ns", tz=tz)]
+        if max_timestamp is not None:
+            df = df[df.timestamp <= pd.Timestamp(max_timestamp, unit="ns", tz=tz)]
+        return df
+
+    @staticmethod
+    def _segment_in_time_range(segment: Dict, timestamps_range: tuple) -> bool:
+        min_timestamp, max_timestamp = timestamps_range
+        timestamp = segment.get("timestamp")
+        if min_timestamp is None and max_timestamp is None:
+            return True
+        if not timestamp:
+            return False
+        segment_min, segment_max = (
+            binary.to_epoch_ns(datetime.datetime.fromisoformat(timestamp[k]))
+            for k in ("min", "max")
+        )
+        if min_timestamp is not None and segment_max < min_timestamp:
+            return False
+        if max_timestamp is not None and segment_min > max_timestamp:
+            return False
+        return True
+
+    @classmethod
+    def _read_indexed(
+        cls, path: str, kind: str, steps_range: tuple, timestamps_range: tuple
+    ):
+        """Reads the blocks of an events file overlapping a window using its index."""
+        import numpy as np
+
+        index = read_index(path)
+        if index is None:
+            return cls.read_segment(path)
+
+        is_binary = segments.is_binary_path(path)
+        is_compressed = (
+            segments.get_path_compression(path) != segments.SegmentCompression.NONE
+        )
+        with segments.open_segment(path) as f:
+            if is_binary:
+                first_offset = binary.HEADER_SIZE
+            else:
+                header = f.readline()
+                first_offset = len(header.rstrip(b"\n"))
+            # The size of a compressed segment is not known without decompressing it
+            size = np.iinfo(np.int64).max if is_compressed else os.path.getsize(path)
+            ranges = get_index_ranges(
+                index, size, first_offset, steps_range, timestamps_range
+            )
+            data = []
+            for start, end in ranges:
+                f.seek(start)
+                data.append(f.read(end - start) if end < size else f.read())
+        data = b"".join(data)
+
+        if is_binary:
+            count = len(data) // binary.RECORD_SIZE
+            records = np.frombuffer(data, dtype=binary.get_records_dtype(), count=count)
+            return cls._records_to_df(records)
+        header = V1Event._SEPARATOR.join(["step", "timestamp", kind])
+        return cls._read_csv(io.BytesIO(header.encode("utf-8") + data))
+
+    @staticmethod
+    def _filter_steps(df, steps_range: tuple):
+        min_step, max_step = steps_range
+        if min_step is not None:
+            df = df[df.step >= min_step]
+        if max_step is not None:
+            df = df[df.step <= max_step]
+        return df
+
+    @classmethod
+    def _iter_segment(
+        cls,
+        path: str,
+        chunk_rows: int,
+        parse_dates: bool,
+        usecols: Optional[List[str]] = None,
+    ) -> Iterator:
+        """Reads a single events file, compressed or not, by chunks."""
+        if segments.get_path_compression(path) == segments.SegmentCompression.NONE:
+            if binary.is_binary_file(path):
+                yield from cls._iter_records(
+                    binary.read_records(path), chunk_rows, parse_dates
+                )
+                return
+            yield from cls._iter_csv(path, chunk_rows, parse_dates, usecols)
+            return
+
+        if segments.is_binary_path(path):
+            records = binary.decode_records(segments.read_segment(path), path)
+            yield from cls._iter_records(records, chunk_rows, parse_dates)
+            return
+        with segments.open_segment(path) as f:
+            yield from cls._iter_csv(f, chunk_rows, parse_dates, usecols)
+
+    @classmethod
+    def _iter_csv(
+        cls,
+        csv,
+        chunk_rows: int,
+        parse_dates: bool,
+        usecols: Optional[List[str]] = None,
+    ) -> Iterator:
+        import pandas as pd
+
+        with pd.read_csv(
+            csv, sep=V1Event._SEPARATOR, chunksize=chunk_rows, usecols=usecols
+        ) as reader:
+            for df in reader:
+                if parse_dates:
+                    df["timestamp"] = cls.parse_timestamps(df["timestamp"])
+                yield df
+
+    @classmethod
+    def _iter_records(cls, records, chunk_rows: int, parse_dates: bool) -> Iterator:
+        for start in range(0, len(records), chunk_rows):
+            df = cls._records_to_df(
+                records[start : start + chunk_rows], parse_dates=parse_dates
+            )
+            df.index += start
+            yield df
+
+    @staticmethod
+    def _get_sort_keys(df):
+        """Returns the step and timestamp keys, the missing values are sorted last."""
+        import numpy as np
+        import pandas as pd
+
+        step = df.step.to_numpy(dtype=float, na_value=np.inf)
+        timestamp = df.timestamp
+        if pd.api.types.is_datetime64tz_dtype(timestamp.dtype):
+            timestamp = timestamp.dt.tz_convert(None)
+        if pd.api.types.is_datetime64_dtype(timestamp.dtype):
+            timestamp = timestamp.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        elif pd.api.types.is_integer_dtype(timestamp.dtype):
+            timestamp = timestamp.to_numpy()
+        else:
+            return step, np.zeros(len(df), dtype=np.int64)
+        return step, np.where(
+            timestamp == binary.BINARY_NULL, np.iinfo(np.int64).max, timestamp
+        )
+
+    @classmethod
+    def _iter_merged(cls, streams: List[Iterator], chunk_rows: int) -> Iterator:
+        """Merges the sorted chunk streams of the shards by step and timestamp.
+
+        At each round, the rows up to the smallest of the buffered last keys are
+        emitted, this bound is the last row of at least one buffer which is refilled.
+        """
+        import numpy as np
+
+        buffers = [next(s, None) for s in streams]
+        while True:
+            active = [i for i, b in enumerate(buffers) if b is not None]
+            if not active:
+                return
+            keys = {i: cls._get_sort_keys(buffers[i]) for i in active}
+            bound = min((keys[i][0][-1], keys[i][1][-1]) for i in active)
+            parts = []
+            for i in active:
+                step, timestamp = keys[i]
+                mask = (step < bound[0]) | (
+                    (step == bound[0]) & (timestamp <= bound[1])
+                )
+                parts.append(buffers[i][mask])
+                rest = buffers[i][~mask]
+                buffers[i] = rest if not rest.empty else next(streams[i], None)
+            df = cls._concat(parts)
+            step, timestamp = cls._get_sort_keys(df)
+            df = df.iloc[np.lexsort((timestamp, step))].reset_index(drop=True)
+            for start in range(0, len(df), chunk_rows):
+                yield df.iloc[start : start + chunk_rows]
+
+    @classmethod
+    def _read_path(cls, data: str, parse_dates: bool = True):
+        if segments.read_manifest(data) is not None:
+            return cls._read_segments(data, parse_dates=parse_dates)
+        if binary.is_binary_file(data):
+            return cls._read_binary(data, parse_dates=parse_dates)
+        return cls._read_csv(validate_csv(data), parse_dates=parse_dates)
+
+    @classmethod
+    def _read_shards(cls, shards_paths: List[str], parse_dates: bool = True):
+        """Merges the per-rank shards of a series by step and timestamp."""
+        import pandas as pd
+
+        dfs = [cls._read_path(p, parse_dates=parse_dates) for p in shards_paths]
+        df = cls._concat(dfs)
+        return df.sort_values(
+            ["step", "timestamp"], kind="mergesort", na_position="last"
+        ).reset_index(drop=True)
+
+    @classmethod
+    def _read_csv(cls, csv, parse_dates: bool = True):
+        import pandas as pd
+
+        df = pd.read_csv(csv, sep=V1Event._SEPARATOR)
+        if parse_dates:
+            if "timestamp" not in df.columns:
+                raise ValueError("Received events without a timestamp column")
+            df["timestamp"] = cls.parse_timestamps(df["timestamp"])
+        return df
+
+    @staticmethod
+    def parse_timestamps(values):
+        """Parses a timestamp column with ISO strings and/or compact epoch nanoseconds."""
+        import pandas as pd
+
+        from pandas.api.types import is_numeric_dtype
+
+        if is_numeric_dtype(values.dtype):
+            if values.isna().all():
+                return pd.to_datetime(values)
+            return pd.to_datetime(values, unit="ns", utc=True)
+        is_epoch = values.str.isdigit().fillna(False).astype(bool)
+        try:
+            if not is_epoch.any():
+                return pd.to_datetime(values)
+            timestamps = pd.Series(
+                pd.NaT, index=values.index, dtype="datetime64[ns, UTC]"
+            )
+            timestamps[is_epoch] = pd.to_datetime(
+                values[is_epoch].astype("int64"), unit="ns", utc=True
+            )
+            if not is_epoch.all():
+                timestamps[~is_epoch] = pd.to_datetime(values[~is_epoch], utc=True)
+            return timestamps
+        except (TypeError, ValueError):
+            return values
+
+    @classmethod
+    def _read_binary(cls, path: str, parse_dates: bool = True):
+        return cls._records_to_df(binary.read_records(path), parse_dates=parse_dates)
+
+    @classmethod
+    def read_segment(cls, path: str, parse_dates: bool = True):
+        """Reads a single events file, compressed or not, ignoring any manifest."""
+        if segments.get_path_compression(path) == segments.SegmentCompression.NONE:
+            if binary.is_binary_file(path):
+                return cls._read_binary(path, parse_dates=parse_dates)
+            return cls._read_csv(path, parse_dates=parse_dates)
+
+        data = segments.read_segment(path)
+        if data.startswith(binary.BINARY_MAGIC):
+            return cls._records_to_df(
+                binary.decode_records(data, path), parse_dates=parse_dates
+            )
+        return cls._read_csv(io.BytesIO(data), parse_dates=parse_dates)
+
+    @classmethod
+    def _read_segments(cls, path: str, parse_dates: bool = True):
+        """Reads the sealed segments of a rotated series followed by its active segment."""
+        import pandas as pd
+
+        paths = segments.get_segments_paths(path)
+        if os.path.exists(path):
+            paths.append(path)
+        dfs = [cls.read_segment(p, parse_dates=parse_dates) for p in paths]
+        return cls._concat(dfs)
+
+    @staticmethod
+    def _concat(dfs: List):
+        import pandas as pd
+
+        # Empty frames, e.g. a header only active segment, would change the dtypes
+        dfs = [df for df in dfs if not df.empty] or dfs[:1]
+        return pd.concat(dfs, ignore_index=True)
+
+    @staticmethod
+    def _records_to_df(records, parse_dates: bool = True):
+        import numpy as np
+        import pandas as pd
+
+        step = np.array(records["step"])
+        null_steps = step == binary.BINARY_NULL
+        if null_steps.any():
+            step = step.astype(float)
+            step[null_steps] = np.nan
+        timestamp = np.array(records["timestamp"])
+        if parse_dates:
+            timestamp = pd.to_datetime(timestamp, utc=True)
+        return pd.DataFrame(
+            {
+                "step": step,
+                "timestamp": timestamp,
+                V1ArtifactKind.METRIC: np.array(records[V1ArtifactKind.METRIC]),
+            }
+        )
+
     def to_dict(self, orient: str = "list") -> Dict:
         import numpy as np
 
         return self.df.replace({np.nan: None}).to_dict(orient=orient)
 
+    def get_payload_at(self, index) -> Optional[Dict]:
+        """Returns the decoded payload of the event at a position.
+
+        The payloads are decoded on access and the recently decoded payloads
+        are cached, the returned dict is shared and should not be modified.
+        """
+        value = self.df[self.kind].iat[index]
+        if not isinstance(value, str):
+            return None
+        return _load_payload(value)
+
     def get_event_at(self, index):
-        event = self.df.iloc[index].to_dict()
-        event["timestamp"] = event["timestamp"].isoformat()
-        event["step"] = sanitize_np_types(event["step"])
+        event = {
+            "step": sanitize_np_types(self.df["step"].iat[index]),
+            "timestamp": self.df["timestamp"].iat[index].isoformat(),
+        }
+        if self.kind in self.PAYLOAD_KINDS:
+            event[self.kind] = self.get_payload_at(index)
+        else:
+            event[self.kind] = sanitize_np_types(self.df[self.kind].iat[index])
         return V1Event.from_dict(event)
 
+    def get_field(self, field: str):
+        """Returns a payload field of all the events in a single pass.
+
+        The payloads are decoded without building the events, e.g.
+        `events.get_field("image.path")` to list the images' paths,
+        nested fields are separated by dots and the kind prefix is optional.
+
+        Returns:
+            A Series aligned with the events' DataFrame,
+            the events without the field have a None value.
+        """
+        import pandas as pd
+
+        if self.kind not in self.PAYLOAD_KINDS:
+            raise ValueError(
+                "Received a field `{}` for {} events without payloads".format(
+                    field, self.kind
+                )
+            )
+        keys = field.split(".")
+        if keys[0] == self.kind and len(keys) > 1:
+            keys = keys[1:]
+
+        def get_value(value):
+            if not isinstance(value, str):
+                return None
+            # The payloads are not cached, a projection reads each payload once
+            value = orjson_loads(value)
+            for key in keys:
+                if not isinstance(value, dict):
+                    return None
+                value = value.get(key)
+            return value
+
+        return pd.Series(
+            [get_value(v) for v in self.df[self.kind].values],
+            index=self.df.index,
+            name=field,
+            dtype=object,
+        )
+
     def _get_step_summary(self) -> Optional[Dict]:
         _count = self.df.step.count()
         if _count == 0:
@@ -461,28 +1025,373 @@ class V1Events:
 
         return summary
 
+    @classmethod
+    def read_summary(
+        cls,
+        kind: str,
+        name: str,
+        path: str,
+        chunk_rows: Optional[int] = None,
+        max_quantile_rows: int = DEFAULT_QUANTILE_ROWS,
+    ) -> Optional[Dict]:
+        """Computes the summary of an events file over a stream of chunks.
+
+        It returns the same summary as `get_summary`, or `None` for a file without rows,
+        the metric percentiles are exact up to `max_quantile_rows` values
+        and estimated from a uniform sample of that size for larger series.
+        """
+        columns = ["step", "timestamp"]
+        if kind == V1ArtifactKind.METRIC:
+            columns.append(kind)
+        chunks = cls.iter_read(
+            kind=kind, name=name, path=path, chunk_rows=chunk_rows, columns=columns
+        )
+        return cls.get_stream_summary(
+            kind=kind, chunks=chunks, max_quantile_rows=max_quantile_rows
+        )
+
+    @classmethod
+    def get_stream_summary(
+        cls,
+        kind: str,
+        chunks: Iterable,
+        max_quantile_rows: int = DEFAULT_QUANTILE_ROWS,
+    ) -> Optional[Dict]:
+        import numpy as np
+        import pandas as pd
+
+        first = None
+        last = None
+        step_count = 0
+        stats = (
+            RunningStats(max_quantile_rows) if kind == V1ArtifactKind.METRIC else None
+        )
+        for df in chunks:
+            if df.empty:
+                continue
+            # Rows as dicts, a mixed dtypes row would be upcast by pandas
+            if first is None:
+                first = {c: df[c].iloc[0] for c in df.columns}
+            last = {c: df[c].iloc[-1] for c in df.columns}
+            step_count += int(df.step.count())
+            if stats is not None:
+                stats.update(df[kind].to_numpy(dtype=float))
+        if first is None:
+            return None
+
+        summary = {"is_event": True}
+        if step_count:
+            summary["step"] = {
+                "count": step_count,
+                "min": sanitize_np_types(first["step"]),
+                "max": sanitize_np_types(last["step"]),
+            }
+        if pd.notna(first["timestamp"]) or pd.notna(last["timestamp"]):
+            summary["timestamp"] = {
+                "min": first["timestamp"].isoformat(),
+                "max": last["timestamp"].isoformat(),
+            }
+        if stats is not None:
+            summary[kind] = {
+                k: sanitize_np_types(v) for k, v in stats.describe().items()
+            }
+            summary[kind]["last"] = sanitize_np_types(np.float64(last[kind]))
+        return summary
+
 
 class LoggedEventSpec(namedtuple("LoggedEventSpec", "name kind event")):
     pass
 
 
+class LoggedMetricSpec(namedtuple("LoggedMetricSpec", "name step timestamp metric")):
+    """A compact metric record that bypasses the `V1Event` validation.
+
+    It exposes the same `kind`/`event` interface as `LoggedEventSpec`
+    and serializes to the same csv row as the equivalent `V1Event`.
+    """
+
+    __slots__ = ()
+
+    kind = V1ArtifactKind.METRIC.value
+
+    @property
+    def event(self) -> "LoggedMetricSpec":
+        return self
+
+    @classmethod
+    def make(
+        cls,
+        name: str,
+        metric: float,
+        step: Optional[int] = None,
+        timestamp=None,
+        event_clock: Optional["clock.AnchoredClock"] = None,
+    ) -> "LoggedMetricSpec":
+        if timestamp is None:
+            # Epoch nanoseconds, formatted by the writer
+            timestamp = (event_clock or clock.DEFAULT_CLOCK).now_ns()
+        elif isinstance(timestamp, str):
+            try:
+                timestamp = parse_datetime(timestamp)
+            except Exception as e:
+                raise ValueError("Received an invalid timestamp") from e
+        elif not isinstance(timestamp, datetime.datetime):
+            timestamp = V1Event.make(timestamp=timestamp, metric=metric).timestamp
+        return cls(
+            name,
+            int(step) if step is not None else None,
+            timestamp,
+            metric,
+        )
+
+    def to_csv(self, formatter: Optional["clock.TimestampFormatter"] = None) -> str:
+        return "{}|{}|{}".format(
+            "" if self.step is None else self.step,
+            (formatter or clock.DEFAULT_FORMATTER).format(self.timestamp),
+            self.metric,
+        )
+
+    def to_event(self) -> V1Event:
+        timestamp = self.timestamp
+        if isinstance(timestamp, int):
+            timestamp = binary.from_epoch_ns(timestamp)
+        return V1Event.construct(
+            timestamp=timestamp, step=self.step, metric=self.metric
+        )
+
+
+class LoggedMetricArraySpec:
+    """A block of metric records of a single series backed by numpy arrays.
+
+    It's validated and serialized in vectorized passes, and it's handed to the writer
+    as a single event, the timestamps are stored in epoch nanoseconds.
+    """
+
+    __slots__ = ("name", "steps", "timestamps", "values")
+
+    kind = V1ArtifactKind.METRIC.value
+
+    def __init__(self, name: str, steps, timestamps, values):
+        self.name = name
+        self.steps = steps
+        self.timestamps = timestamps
+        self.values = values
+
+    def __getstate__(self):
+        return self.name, self.steps, self.timestamps, self.values
+
+    def __setstate__(self, state):
+        self.name, self.steps, self.timestamps, self.values = state
+
+    @property
+    def event(self) -> "LoggedMetricArraySpec":
+        return self
+
+    @property
+    def size(self) -> int:
+        return len(self.values)
+
+    @staticmethod
+    def get_values(values):
+        import numpy as np
+
+        try:
+            values = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise ValueError("Received invalid metric values") from e
+        if values.ndim != 1:
+            raise ValueError(
+                "Metric values should be a 1-D array, received an array with shape {}".format(
+                    values.shape
+                )
+            )
+        return values
+
+    @staticmethod
+    def get_steps(steps, size: int):
+        import numpy as np
+
+        if steps is None:
+            return None
+        steps = np.asarray(steps)
+        if steps.shape != (size,):
+            raise ValueError(
+                "Received {} steps for {} metric values".format(steps.size, size)
+            )
+        if steps.dtype.kind == "f":
+            if not np.isfinite(steps).all() or (steps != np.floor(steps)).any():
+                raise ValueError("Metric steps should be integers")
+        elif steps.dtype.kind not in {"i", "u"}:
+            raise ValueError("Metric steps should be integers")
+        return steps.astype(np.int64, copy=False)
+
+    @staticmethod
+    def get_timestamps(
+        timestamps, size: int, event_clock: Optional["clock.AnchoredClock"] = None
+    ):
+        """Returns the timestamps as epoch nanoseconds.
+
+        The timestamps can be a datetime64 array, epoch seconds, or datetimes,
+        they default to the current time for all the records.
+        """
+        import numpy as np
+
+        if timestamps is None:
+            return np.full(
+                size, (event_clock or clock.DEFAULT_CLOCK).now_ns(), dtype=np.int64
+            )
+        timestamps = np.asarray(timestamps)
+        if timestamps.shape != (size,):
+            raise ValueError(
+                "Received {} timestamps for {} metric values".format(
+                    timestamps.size, size
+                )
+            )
+        if timestamps.dtype.kind == "M":
+            timestamps = timestamps.astype("datetime64[ns]").view(np.int64)
+            if (timestamps == binary.BINARY_NULL).any():
+                raise ValueError("Received missing timestamps")
+            return timestamps
+        if timestamps.dtype.kind in {"i", "u", "f"}:
+            return (timestamps * 1_000_000_000).astype(np.int64)
+        try:
+            return np.fromiter(
+                (
+                    binary.to_epoch_ns(
+                        parse_datetime(t)
+                        if isinstance(t, str)
+                        else V1Event.make(timestamp=t, metric=0).timestamp
+                    )
+                    for t in timestamps
+                ),
+                dtype=np.int64,
+                count=size,
+            )
+        except Exception as e:
+            raise ValueError("Received invalid timestamps") from e
+
+    @classmethod
+    def make(
+        cls,
+        name: str,
+        values,
+        steps=None,
+        timestamps=None,
+        event_clock: Optional["clock.AnchoredClock"] = None,
+    ) -> "LoggedMetricArraySpec":
+        values = cls.get_values(values)
+        return cls(
+            name,
+            cls.get_steps(steps, len(values)),
+            cls.get_timestamps(timestamps, len(values), event_clock=event_clock),
+            values,
+        )
+
+    def to_csv(self, formatter: Optional["clock.TimestampFormatter"] = None) -> str:
+        """Returns the csv rows of the block, separated by new lines.
+
+        The columns are formatted with numpy into fixed width fields,
+        the rows are then joined by stripping the fields' NUL padding.
+        The values are formatted as their shortest repr, which takes about 1s
+        per 1M values, the binary records are much cheaper to write.
+        """
+        import numpy as np
+
+        if not self.size:
+            return ""
+        formatter = formatter or clock.DEFAULT_FORMATTER
+        timestamps = formatter.format_array(self.timestamps)
+        # Same as `repr`, a float64 is at most 24 characters
+        values = self.values.astype("S24")
+        fields = []
+        if self.steps is not None:
+            steps = clock.format_int_array(self.steps)
+            fields.append(("step", steps.dtype))
+        fields += [
+            ("sep1", "S1"),
+            ("timestamp", timestamps.dtype),
+            ("sep2", "S1"),
+            ("value", values.dtype),
+            ("end", "S1"),
+        ]
+        rows = np.empty(self.size, dtype=fields)
+        if self.steps is not None:
+            rows["step"] = steps
+        rows["sep1"] = rows["sep2"] = V1Event._SEPARATOR.encode()
+        rows["timestamp"] = timestamps
+        rows["value"] = values
+        rows["end"] = b"\n"
+        chars = rows.view(np.uint8)
+        # Without the last row's new line
+        return chars[chars != 0][:-1].tobytes().decode("ascii")
+
+    def to_binary(self) -> bytes:
+        import numpy as np
+
+        records = np.empty(self.size, dtype=binary.get_records_dtype())
+        records["step"] = binary.BINARY_NULL if self.steps is None else self.steps
+        records["timestamp"] = self.timestamps
+        records["metric"] = self.values
+        return records.tobytes()
+
+    def iter_metrics(self):
+        """Yields the block's records as `LoggedMetricSpec`, e.g. to downsample them."""
+        steps = self.steps.tolist() if self.steps is not None else [None] * self.size
+        for step, timestamp, value in zip(
+            steps, self.timestamps.tolist(), self.values.tolist()
+        ):
+            yield LoggedMetricSpec(self.name, step, timestamp, value)
+
+
+def count_events(events: List) -> int:
+    """Returns the number of records, a block counts for all its records."""
+    return sum(e.size if isinstance(e, LoggedMetricArraySpec) else 1 for e in events)
+
+
 class LoggedEventListSpec(namedtuple("LoggedEventListSpec", "name kind events")):
     def get_csv_header(self) -> str:
         return V1Event._SEPARATOR.join(["step", "timestamp", self.kind])
 
-    def get_csv_events(self) -> str:
-        events = ["\n{}".format(e.to_csv()) for e in self.events]
+    def get_csv_events(
+        self, formatter: Optional["clock.TimestampFormatter"] = None
+    ) -> str:
+        events = ["\n{}".format(e.to_csv(formatter)) for e in self.events]
         return "".join(events)
 
+    def get_binary_header(self) -> bytes:
+        return binary.get_binary_header()
+
+    def get_binary_events(self) -> bytes:
+        chunks = []
+        points = []
+        for e in self.events:
+            if isinstance(e, LoggedMetricArraySpec):
+                if points:
+                    chunks.append(binary.encode_events(points))
+                    points = []
+                chunks.append(e.to_binary())
+            else:
+                points.append(e)
+        if points:
+            chunks.append(binary.encode_events(points))
+        return b"".join(chunks)
+
+    def count_events(self) -> int:
+        return count_events(self.events)
+
     def empty_events(self):
         self.events[:] = []
 
     def to_dict(self):
-        return {
-            "name": self.name,
-            "kind": self.kind,
-            "events": [e.to_dict() for e in self.events],
-        }
+        events = []
+        for e in self.events:
+            if isinstance(e, LoggedMetricArraySpec):
+                events += [m.to_event().to_dict() for m in e.iter_metrics()]
+            elif isinstance(e, LoggedMetricSpec):
+                events.append(e.to_event().to_dict())
+            else:
+                events.append(e.to_dict())
+        return {"name": self.name, "kind": self.kind, "events": events}
 
     @classmethod
     def from_dict(cls, value: Mapping) -> "LoggedEventListSpec":
@@ -0,0 +1,236 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import gzip
+import os
+import re
+import shutil
+
+from typing import IO, Dict, List, Optional, Tuple
+
+from clipped.utils.enums import PEnum, get_enum_value
+from clipped.utils.json import orjson_dumps, orjson_loads
+
+# A rotated series is stored as sealed segments next to the active file:
+#   {name}.plx                 active segment, appended to by the writer
+#   {name}.plx.{n}[.gz|.zst]   sealed segments, never modified once written
+#   {name}.plx.manifest.json   segments list with their rows, step and time ranges
+# The sidecars of a series are named after its full event file, i.e. `{name}.plx`
+# or `{name}.plxb`, and their suffixes never contain `.plx`,
+# e.g. the segment `loss.plx.1` does not collide with a series named `loss.1`.
+MANIFEST_EXTENSION = "manifest.json"
+EVENT_EXTENSIONS = {"plx", "plxb"}
+MANIFEST_VERSION = 1
+SHARD_NAME_PATTERN = re.compile(r"^(.*)\.rank\d+$")
+ZSTD_ERROR_MESSAGE = "zstandard is required for the zstd segment compression."
+
+
+class SegmentCompression(str, PEnum):
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+
+COMPRESSION_EXTENSIONS = {
+    SegmentCompression.GZIP: "gz",
+    SegmentCompression.ZSTD: "zst",
+}
+
+
+def validate_compression(compression: Optional[str]):
+    compression = get_enum_value(compression or SegmentCompression.NONE)
+    if compression not in SegmentCompression.to_set():
+        raise ValueError("Unrecognized segment compression {}".format(compression))
+    if compression == SegmentCompression.ZSTD:
+        try:
+            import zstandard  # noqa
+        except ImportError as e:
+            raise ValueError(ZSTD_ERROR_MESSAGE) from e
+
+
+def split_event_path(path: str) -> Optional[Tuple[str, str, str]]:
+    """Splits the name of a series' file to `(name, ext, suffix)`.
+
+    e.g. `("loss", "plx", "")` for `loss.plx` and `("loss", "plx", "3.gz")`
+    for the sealed segment `loss.plx.3.gz`, returns None if it's not a series' file.
+    """
+    filename = os.path.basename(path)
+    position = filename.rfind(".plx")
+    if position <= 0:
+        return None
+    ext, _, suffix = filename[position + 1 :].partition(".")
+    if ext not in EVENT_EXTENSIONS:
+        return None
+    return filename[:position], ext, suffix
+
+
+def is_binary_path(path: str) -> bool:
+    parts = split_event_path(path)
+    return parts is not None and parts[1] == "plxb"
+
+
+def get_manifest_path(event_path: str) -> str:
+    return "{}.{}".format(event_path, MANIFEST_EXTENSION)
+
+
+def is_manifest_path(path: str) -> bool:
+    return path.endswith(".{}".format(MANIFEST_EXTENSION))
+
+
+def get_segment_path(
+    event_path: str, index: int, compression: Optional[str] = None
+) -> str:
+    path = "{}.{}".format(event_path, index)
+    compression = get_enum_value(compression or SegmentCompression.NONE)
+    if compression in COMPRESSION_EXTENSIONS:
+        path = "{}.{}".format(path, COMPRESSION_EXTENSIONS[compression])
+    return path
+
+
+def get_path_compression(path: str) -> str:
+    for compression, ext in COMPRESSION_EXTENSIONS.items():
+        if path.endswith(".{}".format(ext)):
+            return compression
+    return SegmentCompression.NONE
+
+
+def fsync_path(path: str):
+    """Flushes a file or a directory, e.g. after creating or renaming its files, to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def compress_file(path: str, compressed_path: str, compression: str):
+    """Compresses a sealed segment in a streaming fashion and removes the source."""
+    compression = get_enum_value(compression)
+    with open(path, "rb") as src:
+        if compression == SegmentCompression.GZIP:
+            with gzip.open(compressed_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        elif compression == SegmentCompression.ZSTD:
+            import zstandard
+
+            with open(compressed_path, "wb") as dst:
+                zstandard.ZstdCompressor().copy_stream(src, dst)
+        else:
+            raise ValueError("Unrecognized segment compression {}".format(compression))
+    # The source is only removed once its compressed copy is on disk
+    fsync_path(compressed_path)
+    os.remove(path)
+
+
+def open_segment(path: str) -> IO:
+    compression = get_path_compression(path)
+    if compression == SegmentCompression.GZIP:
+        return gzip.open(path, "rb")
+    if compression == SegmentCompression.ZSTD:
+        import zstandard
+
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    return open(path, "rb")
+
+
+def read_segment(path: str) -> bytes:
+    with open_segment(path) as f:
+        return f.read()
+
+
+def read_manifest_file(manifest_path: str) -> Dict:
+    with open(manifest_path, "r") as f:
+        return orjson_loads(f.read())
+
+
+def read_manifest(event_path: str) -> Optional[Dict]:
+    manifest_path = get_manifest_path(event_path)
+    if not os.path.exists(manifest_path):
+        return None
+    return read_manifest_file(manifest_path)
+
+
+def write_manifest(event_path: str, manifest: Dict):
+    """Writes the manifest atomically, readers never see a partial manifest."""
+    manifest_path = get_manifest_path(event_path)
+    tmp_path = "{}.tmp".format(manifest_path)
+    with open(tmp_path, "w") as f:
+        f.write(orjson_dumps(manifest))
+    os.replace(tmp_path, manifest_path)
+
+
+def get_new_manifest(event_path: str) -> Dict:
+    return {
+        "version": MANIFEST_VERSION,
+        "name": os.path.basename(event_path),
+        "segments": [],
+    }
+
+
+def get_segments_paths(event_path: str, manifest: Optional[Dict] = None) -> List[str]:
+    """Returns the sealed segments' paths in order, without the active segment."""
+    manifest = manifest or read_manifest(event_path)
+    if not manifest:
+        return []
+    dirname = os.path.dirname(event_path)
+    return [os.path.join(dirname, s["path"]) for s in manifest["segments"]]
+
+
+def get_events_files(files: List[str]) -> List[Tuple[str, str, List[str]]]:
+    """Groups the files of an events directory by series.
+
+    Returns a list of `(name, event_path, files)`, a rotated series groups
+    its manifest, its sealed segments, and its active segment if any,
+    a sharded series groups the files of all its ranks.
+    """
+    files_set = set(files)
+    grouped = set()
+    results = []
+    for f in files:
+        if not is_manifest_path(f):
+            continue
+        manifest = read_manifest_file(f)
+        event_path = os.path.join(os.path.dirname(f), manifest["name"])
+        series_files = [f] + get_segments_paths(event_path, manifest)
+        if event_path in files_set:
+            series_files.append(event_path)
+        grouped.update(series_files)
+        name = split_event_path(event_path)[0]
+        results.append((name, event_path, series_files))
+
+    for f in files:
+        if f in grouped:
+            continue
+        # Only the active files, the other files of a series are its sidecars
+        parts = split_event_path(f)
+        if parts is None or parts[2]:
+            continue
+        results.append((parts[0], f, [f]))
+
+    sharded = {}  # type: Dict[str, Tuple[str, str, List[str]]]
+    for name, event_path, series_files in results:
+        match = SHARD_NAME_PATTERN.match(name)
+        if match:
+            name = match.group(1)
+            ext = split_event_path(event_path)[1]
+            event_path = os.path.join(
+                os.path.dirname(event_path), "{}.{}".format(name, ext)
+            )
+        key = event_path
+        if key in sharded:
+            sharded[key][2].extend(series_files)
+        else:
+            sharded[key] = (name, event_path, list(series_files))
+    return list(sharded.values())
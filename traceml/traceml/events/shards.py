@@ -0,0 +1,128 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import heapq
+import io
+import os
+
+from typing import Iterator, List, Optional, Tuple
+
+from traceml.events import binary, segments
+from traceml.events.index import get_index_path
+from traceml.events.paths import get_shards_paths
+from traceml.events.schemas import V1Event
+
+
+def get_shard_files(shard_path: str) -> List[str]:
+    """Returns the files of a shard in order, sealed segments first."""
+    files = segments.get_segments_paths(shard_path)
+    if os.path.exists(shard_path):
+        files.append(shard_path)
+    return files
+
+
+def _is_binary_shard(shard_path: str) -> bool:
+    files = get_shard_files(shard_path)
+    if not files:
+        return False
+    with segments.open_segment(files[0]) as f:
+        return f.read(len(binary.BINARY_MAGIC)) == binary.BINARY_MAGIC
+
+
+def _iter_csv_rows(shard_path: str) -> Iterator[Tuple[Tuple, str]]:
+    for path in get_shard_files(shard_path):
+        with segments.open_segment(path) as f:
+            lines = io.TextIOWrapper(f, encoding="utf-8")
+            next(lines, None)  # header
+            for line in lines:
+                line = line.rstrip("\n")
+                if not line:
+                    continue
+                step, timestamp, _ = line.split(V1Event._SEPARATOR, 2)
+                yield (not step, int(step) if step else 0, timestamp), line
+
+
+def _iter_binary_records(shard_path: str) -> Iterator[Tuple[Tuple, bytes]]:
+    for path in get_shard_files(shard_path):
+        records = binary.decode_records(segments.read_segment(path), path)
+        for record in records:
+            step = int(record["step"])
+            is_null = step == binary.BINARY_NULL
+            yield (is_null, 0 if is_null else step, int(record["timestamp"])), (
+                record.tobytes()
+            )
+
+
+def merge_shards(event_path: str, remove_shards: bool = False) -> Optional[str]:
+    """K-way merges the per-rank shards of a series into a single event file.
+
+    Each rank writes its shard in logging order, the shards are merged
+    by step and then by timestamp, rows without a step come last.
+    The merge streams the rows and should run once all ranks are done writing.
+
+    Args:
+        event_path: str, the path of the merged event file, e.g. `events/metric/loss.plx`.
+        remove_shards: bool, optional, to remove the shards' files after the merge.
+
+    Returns:
+        The merged event file's path, or None if the series has no shards.
+    """
+    shards_paths = get_shards_paths(event_path)
+    if not shards_paths:
+        return None
+    if os.path.exists(event_path):
+        raise ValueError(
+            "The merged event file `{}` already exists.".format(event_path)
+        )
+
+    is_binary = [_is_binary_shard(p) for p in shards_paths]
+    if any(is_binary) and not all(is_binary):
+        raise ValueError(
+            "The shards of `{}` do not share the same format.".format(event_path)
+        )
+
+    tmp_path = "{}.tmp".format(event_path)
+    if all(is_binary):
+        streams = [_iter_binary_records(p) for p in shards_paths]
+        with open(tmp_path, "wb") as f:
+            f.write(binary.get_binary_header())
+            for _, record in heapq.merge(*streams, key=lambda r: r[0]):
+                f.write(record)
+    else:
+        header = None
+        for path in shards_paths:
+            files = get_shard_files(path)
+            if files:
+                with segments.open_segment(files[0]) as f:
+                    header = io.TextIOWrapper(f, encoding="utf-8").readline()
+                break
+        streams = [_iter_csv_rows(p) for p in shards_paths]
+        with open(tmp_path, "w") as f:
+            f.write(header.rstrip("\n"))
+            for _, line in heapq.merge(*streams, key=lambda r: r[0]):
+                f.write("\n{}".format(line))
+    os.replace(tmp_path, event_path)
+
+    if remove_shards:
+        for path in shards_paths:
+            for f in get_shard_files(path):
+                os.remove(f)
+                index_path = get_index_path(f)
+                if os.path.exists(index_path):
+                    os.remove(index_path)
+            manifest_path = segments.get_manifest_path(path)
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+    return event_path
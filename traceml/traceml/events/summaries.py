@@ -0,0 +1,345 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+from typing import Dict, Optional
+
+from clipped.utils.json import orjson_dumps, orjson_loads
+from clipped.utils.np import sanitize_np_types
+
+from traceml.artifacts.kinds import V1ArtifactKind
+from traceml.events import binary, segments
+
+# The writer keeps a running summary of each series, persisted on each flush
+# in a sidecar `{name}.plx.summary.json` next to the event file,
+# e.g. `loss.plx.summary.json`.
+# The sidecar records the sealed segments and the active file's size it covers,
+# a summary that does not match the files anymore is ignored.
+SUMMARY_EXTENSION = "summary.json"
+SUMMARY_VERSION = 1
+# Number of values kept by the sidecar to compute the summaries' percentiles,
+# the percentiles of a larger series are computed from its values when it's synced.
+SUMMARY_SAMPLE_ROWS = 256
+
+
+class RunningStats:
+    """Running count, mean, variance, min, max, and percentiles of a stream of values.
+
+    The mean and the variance are merged per chunk with Chan's formula,
+    the percentiles are computed on the values kept, all of them up to
+    `max_rows`, then a uniform reservoir sample of `max_rows` values,
+    or none without `reservoir`, the percentiles are then not estimated.
+    """
+
+    PERCENTILES = (25, 50, 75)
+
+    def __init__(self, max_rows: int, reservoir: bool = True):
+        import numpy as np
+
+        self.max_rows = max_rows
+        self.reservoir = reservoir
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self._sample = np.empty(0, dtype=float)
+        self._rng = np.random.default_rng(0)
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": None if self.count == 0 else float(self.min),
+            "max": None if self.count == 0 else float(self.max),
+            "sample": self._sample.tolist() if self._sample is not None else None,
+        }
+
+    @property
+    def is_exact(self) -> bool:
+        """Whether all the values are kept, i.e. the percentiles are exact."""
+        return self.count <= self.max_rows and self._sample is not None
+
+    @classmethod
+    def from_dict(
+        cls, value: Dict, max_rows: int, reservoir: bool = True
+    ) -> "RunningStats":
+        import numpy as np
+
+        stats = cls(max_rows, reservoir=reservoir)
+        stats.count = value["count"]
+        stats.mean = value["mean"]
+        stats.m2 = value["m2"]
+        if stats.count:
+            stats.min = value["min"]
+            stats.max = value["max"]
+        if value["sample"] is None or (not reservoir and stats.count > max_rows):
+            stats._sample = None
+        else:
+            stats._sample = np.array(value["sample"], dtype=float)[:max_rows]
+        # The resumed reservoir draws a different sequence than an uninterrupted one
+        stats._rng = np.random.default_rng(stats.count)
+        return stats
+
+    def update(self, values):
+        import numpy as np
+
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if not n:
+            return
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta**2 * self.count * n / total
+        self.min = np.nanmin([self.min, values.min()])
+        self.max = np.nanmax([self.max, values.max()])
+        self._update_sample(values)
+        self.count = total
+
+    def _update_sample(self, values):
+        import numpy as np
+
+        if self._sample is None:
+            return
+        if not self.reservoir and self.count + len(values) > self.max_rows:
+            self._sample = None
+            return
+        # Position in the stream of the values before this chunk
+        seen = self.count
+        free = self.max_rows - len(self._sample)
+        if free > 0:
+            self._sample = np.concatenate([self._sample, values[:free]])
+            seen += min(free, len(values))
+            values = values[free:]
+        if not len(values):
+            return
+        # Reservoir sampling: the i-th value replaces a random kept value
+        # with a probability `max_rows / i`.
+        positions = np.arange(seen + 1, seen + len(values) + 1)
+        slots = (self._rng.random(len(values)) * positions).astype(np.int64)
+        kept = slots < self.max_rows
+        self._sample[slots[kept]] = values[kept]
+
+    @classmethod
+    def get_percentiles(cls, values):
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return [np.nan] * len(cls.PERCENTILES)
+        return np.percentile(values, cls.PERCENTILES)
+
+    def describe(self, percentiles=None) -> Dict:
+        """Returns the stats as `pd.Series.describe`.
+
+        Args:
+            percentiles: the exact percentiles, e.g. computed from the series' values,
+                otherwise they are computed on the values kept, if any.
+        """
+        import numpy as np
+
+        if percentiles is None:
+            if self.count and self._sample is not None:
+                percentiles = np.percentile(self._sample, self.PERCENTILES)
+            else:
+                percentiles = [np.nan] * len(self.PERCENTILES)
+        result = {
+            "count": float(self.count),
+            "mean": self.mean if self.count else np.nan,
+            "std": np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan,
+            "min": self.min,
+        }
+        for p, v in zip(self.PERCENTILES, percentiles):
+            result["{}%".format(p)] = v
+        result["max"] = self.max
+        return result
+
+
+class SeriesSummary:
+    """Running summary of an event series, updated as its rows are written.
+
+    It produces the same summary as `V1Events.get_summary` without reading the series:
+    the steps and timestamps counts, the first and last rows' steps and timestamps,
+    and for metrics, the count, mean, std, min, max, percentiles, and last value.
+    The values are only kept up to `sample_rows` for exact percentiles,
+    a larger series requires its values to get its summary.
+    """
+
+    def __init__(self, kind: str, sample_rows: int = SUMMARY_SAMPLE_ROWS):
+        self.kind = kind
+        self.rows = 0
+        self.step_count = 0
+        self.timestamp_count = 0
+        # Step and timestamp of the first and last rows, `BINARY_NULL` if missing
+        self.first = None  # type: Optional[list]
+        self.last = None  # type: Optional[list]
+        self.last_value = None  # type: Optional[float]
+        self.stats = (
+            RunningStats(sample_rows, reservoir=False)
+            if kind == V1ArtifactKind.METRIC
+            else None
+        )
+
+    def update(self, steps, timestamps, values=None):
+        """Adds the rows written to the series.
+
+        Args:
+            steps: the rows' steps as int64, `BINARY_NULL` if missing.
+            timestamps: the rows' timestamps in epoch nanoseconds.
+            values: the metric values as float64, for metric series.
+        """
+        if not len(steps):
+            return
+        if self.first is None:
+            self.first = [int(steps[0]), int(timestamps[0])]
+        self.last = [int(steps[-1]), int(timestamps[-1])]
+        self.rows += len(steps)
+        self.step_count += int((steps != binary.BINARY_NULL).sum())
+        self.timestamp_count += int((timestamps != binary.BINARY_NULL).sum())
+        if self.stats is not None and values is not None:
+            self.last_value = float(values[-1])
+            self.stats.update(values)
+
+    @staticmethod
+    def _get_step(value: int):
+        return None if value == binary.BINARY_NULL else value
+
+    @staticmethod
+    def _get_timestamp(value: int) -> str:
+        import pandas as pd
+
+        if value == binary.BINARY_NULL:
+            return pd.NaT.isoformat()
+        return pd.Timestamp(value, unit="ns", tz="UTC").isoformat()
+
+    @property
+    def requires_values(self) -> bool:
+        """Whether the metric values are required to compute the exact percentiles."""
+        return self.stats is not None and not self.stats.is_exact
+
+    def get_summary(self, values=None) -> Optional[Dict]:
+        """Returns the series summary, or `None` if no rows were written.
+
+        Args:
+            values: the series' metric values, to compute the exact percentiles
+                of a series larger than the values kept.
+        """
+        import numpy as np
+
+        if not self.rows:
+            return None
+        summary = {"is_event": True}
+        if self.step_count:
+            first_step = self._get_step(self.first[0])
+            summary["step"] = {
+                "count": self.step_count,
+                "min": first_step if first_step is not None else np.nan,
+                "max": self._get_step(self.last[0]),
+            }
+        if self.timestamp_count:
+            summary["timestamp"] = {
+                "min": self._get_timestamp(self.first[1]),
+                "max": self._get_timestamp(self.last[1]),
+            }
+        if self.stats is not None:
+            percentiles = (
+                RunningStats.get_percentiles(values)
+                if values is not None and not self.stats.is_exact
+                else None
+            )
+            summary[self.kind] = {
+                k: sanitize_np_types(v)
+                for k, v in self.stats.describe(percentiles).items()
+            }
+            summary[self.kind]["last"] = sanitize_np_types(np.float64(self.last_value))
+        return summary
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "rows": self.rows,
+            "step_count": self.step_count,
+            "timestamp_count": self.timestamp_count,
+            "first": self.first,
+            "last": self.last,
+            "last_value": self.last_value,
+            "stats": self.stats.to_dict() if self.stats is not None else None,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, value: Dict, sample_rows: int = SUMMARY_SAMPLE_ROWS
+    ) -> "SeriesSummary":
+        summary = cls(value["kind"], sample_rows=sample_rows)
+        summary.rows = value["rows"]
+        summary.step_count = value["step_count"]
+        summary.timestamp_count = value["timestamp_count"]
+        summary.first = value["first"]
+        summary.last = value["last"]
+        summary.last_value = value["last_value"]
+        if value["stats"] is not None:
+            summary.stats = RunningStats.from_dict(
+                value["stats"], sample_rows, reservoir=False
+            )
+        return summary
+
+
+def get_summary_path(event_path: str) -> str:
+    return "{}.{}".format(event_path, SUMMARY_EXTENSION)
+
+
+def _get_files_state(event_path: str, manifest: Optional[Dict] = None) -> Dict:
+    """Returns the sealed segments count and the active file's size of a series."""
+    return {
+        "segments": len(segments.get_segments_paths(event_path, manifest)),
+        "bytes": os.path.getsize(event_path) if os.path.exists(event_path) else None,
+    }
+
+
+def write_series_summary(
+    event_path: str, summary: SeriesSummary, manifest: Optional[Dict] = None
+):
+    """Writes the summary sidecar atomically with the state of the files it covers."""
+    summary_path = get_summary_path(event_path)
+    value = dict(
+        summary.to_dict(),
+        version=SUMMARY_VERSION,
+        **_get_files_state(event_path, manifest),
+    )
+    tmp_path = "{}.tmp".format(summary_path)
+    with open(tmp_path, "w") as f:
+        f.write(orjson_dumps(value))
+    os.replace(tmp_path, summary_path)
+
+
+def load_series_summary(event_path: str) -> Optional[SeriesSummary]:
+    """Loads the summary sidecar of a series if it covers all of its files."""
+    summary_path = get_summary_path(event_path)
+    if not os.path.exists(summary_path):
+        return None
+    with open(summary_path, "r") as f:
+        value = orjson_loads(f.read())
+    if value.get("version") != SUMMARY_VERSION:
+        return None
+    state = _get_files_state(event_path)
+    if any(value.get(k) != v for k, v in state.items()):
+        return None
+    return SeriesSummary.from_dict(value)
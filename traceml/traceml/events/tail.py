@@ -0,0 +1,250 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import io
+import os
+
+from collections import namedtuple
+from typing import IO, Dict, List, Optional, Tuple
+
+from traceml.events import binary, segments
+from traceml.events.schemas import V1Event, V1Events
+
+# A csv file is a header followed by rows written as `\n{row}`, the last row
+# of a file being written has no terminator, it can also be partially written.
+# The cursor's offset is the position after the last row read, i.e. the `\n`
+# starting the next row, and `line` is that last row, used to check that the file
+# was not truncated or rewritten since. A trailing row is only returned
+# once it was read unchanged twice, it's kept as `pending` in between.
+_NEWLINE = b"\n"
+
+
+class EventsCursor(
+    namedtuple("EventsCursor", "path offset line segments file_id pending reset")
+):
+    """Position of a tail reader in an event series.
+
+    Attributes:
+        path: str, the event file tailed, i.e. the active segment of the series.
+        offset: int, byte offset after the last row read in the current file.
+        line: str, the last complete row read, hex encoded for binary files.
+        segments: int, number of sealed segments read, i.e. the current file's index.
+        file_id: int, inode of the active file, to detect a rotation or a replacement.
+        pending: str, hex encoded trailing row that might be partially written.
+        reset: bool, if the last read restarted the series from its beginning
+            because the file was truncated or rewritten.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def new(cls, path: str) -> "EventsCursor":
+        return cls(
+            path=path,
+            offset=0,
+            line=None,
+            segments=0,
+            file_id=None,
+            pending=None,
+            reset=False,
+        )
+
+    @classmethod
+    def from_dict(cls, value: Dict) -> "EventsCursor":
+        return cls.new(value["path"])._replace(
+            **{k: v for k, v in value.items() if k in cls._fields}
+        )
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+def _is_binary_path(path: str) -> bool:
+    return segments.is_binary_path(path)
+
+
+def _get_line_bytes(line: Optional[str], is_binary: bool) -> Optional[bytes]:
+    if line is None:
+        return None
+    return bytes.fromhex(line) if is_binary else line.encode("utf-8")
+
+
+def _is_continuous(f: IO, offset: int, line: Optional[bytes]) -> bool:
+    """Checks that the last row read is still right before the offset."""
+    if line is None:
+        return True
+    if offset < len(line):
+        return False
+    f.seek(offset - len(line))
+    return f.read(len(line)) == line
+
+
+def _skip_header(f: IO, is_binary: bool) -> Optional[int]:
+    """Returns the offset of the first row, or None if the header is not written yet."""
+    if is_binary:
+        header = f.read(binary.HEADER_SIZE)
+        return binary.HEADER_SIZE if len(header) == binary.HEADER_SIZE else None
+    header = f.readline()
+    if not header.endswith(_NEWLINE):
+        return None
+    return len(header) - 1
+
+
+def _read_rows(
+    f: IO,
+    offset: int,
+    is_binary: bool,
+    sealed: bool,
+    pending: Optional[bytes] = None,
+) -> Tuple[List[bytes], int, Optional[bytes]]:
+    """Reads the complete rows after the offset.
+
+    Returns the rows, the offset after the last complete row, and the trailing
+    row if it might still be written.
+    """
+    if offset == 0:
+        first_offset = _skip_header(f, is_binary)
+        if first_offset is None:
+            return [], 0, None
+        offset = first_offset
+    f.seek(offset)
+    data = f.read()
+
+    if is_binary:
+        size = len(data) - len(data) % binary.RECORD_SIZE
+        rows = [
+            data[i : i + binary.RECORD_SIZE] for i in range(0, size, binary.RECORD_SIZE)
+        ]
+        return rows, offset + size, None
+
+    if not data:
+        return [], offset, None
+    rows = data[1:].split(_NEWLINE)
+    fragment = None
+    if not sealed:
+        fragment = rows.pop()
+        if fragment and fragment == pending and _is_complete_row(fragment):
+            rows.append(fragment)
+            fragment = None
+    offset += sum(len(r) + 1 for r in rows)
+    return [r for r in rows if r], offset, fragment or None
+
+
+def _is_complete_row(row: bytes) -> bool:
+    return row.count(V1Event._SEPARATOR.encode("utf-8")) == 2
+
+
+def _to_events(
+    kind: str, name: str, rows: List[bytes], is_binary: bool, parse_dates: bool
+) -> V1Events:
+    if is_binary:
+        import numpy as np
+
+        records = np.frombuffer(b"".join(rows), dtype=binary.get_records_dtype())
+        df = V1Events._records_to_df(records, parse_dates=parse_dates)
+    else:
+        header = V1Event._SEPARATOR.join(["step", "timestamp", kind])
+        data = _NEWLINE.join([header.encode("utf-8")] + rows)
+        df = V1Events._read_csv(io.BytesIO(data), parse_dates=parse_dates)
+    return V1Events(kind=kind, name=name, df=df)
+
+
+def _get_segment_paths(event_path: str, index: int) -> List[str]:
+    return [
+        segments.get_segment_path(event_path, index, compression)
+        for compression in segments.SegmentCompression.to_set()
+    ]
+
+
+def read_tail(
+    kind: str,
+    name: str,
+    path: str,
+    cursor: Optional[EventsCursor] = None,
+    parse_dates: bool = True,
+) -> Tuple[V1Events, EventsCursor]:
+    """Reads the rows appended to an event series since the cursor.
+
+    The cost of a read is proportional to the new data, the cursor can be persisted,
+    e.g. `cursor.to_dict()`, to resume tailing a series from another process.
+    Rotated series are followed through their sealed segments, if the file was
+    truncated or rewritten, the series is read again from the beginning
+    and the returned cursor's `reset` is set.
+
+    Args:
+        kind: str, the events kind.
+        name: str, the series name.
+        path: str, the event file path, i.e. the active segment of a rotated series.
+        cursor: EventsCursor, optional, the cursor returned by the previous read,
+            the series is read from its beginning by default.
+        parse_dates: bool, optional, to parse the timestamps.
+
+    Returns:
+        The new events and the cursor to pass to the next read.
+    """
+    is_binary = _is_binary_path(path)
+    cursor = (cursor or EventsCursor.new(path))._replace(reset=False)
+    sealed_paths = segments.get_segments_paths(path)
+    if cursor.segments > len(sealed_paths):
+        return _read_reset(kind, name, path, parse_dates)
+
+    index, offset, line = cursor.segments, cursor.offset, cursor.line
+    rows = []
+    while index < len(sealed_paths):
+        with segments.open_segment(sealed_paths[index]) as f:
+            if not _is_continuous(f, offset, _get_line_bytes(line, is_binary)):
+                return _read_reset(kind, name, path, parse_dates)
+            rows += _read_rows(f, offset, is_binary, sealed=True)[0]
+        index, offset, line = index + 1, 0, None
+
+    try:
+        file_id = os.stat(path).st_ino
+    except FileNotFoundError:
+        file_id = None
+    if index == cursor.segments and cursor.file_id not in (None, file_id):
+        if any(os.path.exists(p) for p in _get_segment_paths(path, index)):
+            # The file is being sealed, the manifest is not updated yet
+            return _to_events(kind, name, [], is_binary, parse_dates), cursor
+        if file_id is not None:
+            return _read_reset(kind, name, path, parse_dates)
+    if file_id is None:
+        return _to_events(kind, name, rows, is_binary, parse_dates), cursor._replace(
+            offset=offset, line=line, segments=index, file_id=None, pending=None
+        )
+
+    with open(path, "rb") as f:
+        if not _is_continuous(f, offset, _get_line_bytes(line, is_binary)):
+            return _read_reset(kind, name, path, parse_dates)
+        pending = bytes.fromhex(cursor.pending) if cursor.pending else None
+        new_rows, offset, pending = _read_rows(
+            f, offset, is_binary, sealed=False, pending=pending
+        )
+    rows += new_rows
+    if new_rows:
+        line = new_rows[-1].hex() if is_binary else new_rows[-1].decode("utf-8")
+    return _to_events(kind, name, rows, is_binary, parse_dates), cursor._replace(
+        offset=offset,
+        line=line,
+        segments=index,
+        file_id=file_id,
+        pending=pending.hex() if pending else None,
+    )
+
+
+def _read_reset(
+    kind: str, name: str, path: str, parse_dates: bool
+) -> Tuple[V1Events, EventsCursor]:
+    events, cursor = read_tail(kind, name, path, parse_dates=parse_dates)
+    return events, cursor._replace(reset=True)
@@ -0,0 +1,248 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+from typing import Dict, List, Optional
+
+from clipped.utils.enums import PEnum
+
+from traceml.processors.events_processors import metrics_dict_to_list
+
+CGROUP_PATH = "/sys/fs/cgroup"
+PROC_CGROUP_PATH = "/proc/self/cgroup"
+# cgroup v1 reports a page aligned max int64 when the memory is not limited
+V1_UNLIMITED = 1 << 62
+
+
+class CgroupVersion(str, PEnum):
+    V1 = "v1"
+    V2 = "v2"
+
+
+def _read(path: str) -> str:
+    with open(path) as f:
+        return f.read().strip()
+
+
+def _read_int(path: str) -> int:
+    return int(_read(path))
+
+
+def _read_keys(path: str) -> Dict[str, int]:
+    """Reads a flat keyed file, e.g. `memory.stat` or `cpu.stat`."""
+    values = {}
+    for line in _read(path).splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            values[parts[0]] = int(parts[1])
+    return values
+
+
+def read_pressure(path: str) -> Dict[str, float]:
+    """Reads a PSI file, e.g. `some avg10=0.12 avg60=0.05 avg300=0.01 total=1234`."""
+    values = {}
+    for line in _read(path).splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        for item in parts[1:]:
+            key, _, value = item.partition("=")
+            values["{}_{}".format(parts[0], key)] = float(value)
+    return values
+
+
+def read_proc_cgroup(path: str = PROC_CGROUP_PATH) -> Dict[str, str]:
+    """Returns the cgroup path of the process by controller, `""` for cgroup v2."""
+    paths = {}
+    for line in _read(path).splitlines():
+        _, controllers, cgroup_path = line.split(":", 2)
+        if not controllers:
+            paths[""] = cgroup_path
+        for controller in controllers.split(","):
+            if controller:
+                paths[controller] = cgroup_path
+    return paths
+
+
+class CgroupCollector:
+    """Reads the container's resources from the cgroup v1 or v2 filesystem.
+
+    Unlike the host-wide psutil metrics, the usage is reported against
+    the container's limits, e.g. `cgroup_memory_percent` of the memory limit.
+    The files are resolved once, each query then only reads a few small files,
+    a file that is missing or can't be parsed is skipped.
+
+    Args:
+        cgroup_path: str, optional, the cgroup filesystem mount point.
+        proc_cgroup_path: str, optional, the cgroups of the process,
+            used to find the process's cgroup when the namespace is not private.
+        prefix: str, optional, the prefix of the series.
+    """
+
+    def __init__(
+        self,
+        cgroup_path: str = CGROUP_PATH,
+        proc_cgroup_path: str = PROC_CGROUP_PATH,
+        prefix: str = "cgroup",
+    ):
+        self.prefix = prefix
+        self.version = None  # type: Optional[CgroupVersion]
+        self._paths = {}  # type: Dict[str, str]
+        try:
+            proc_paths = read_proc_cgroup(proc_cgroup_path)
+        except (OSError, ValueError):
+            proc_paths = {}
+        if os.path.exists(os.path.join(cgroup_path, "cgroup.controllers")):
+            self.version = CgroupVersion.V2
+            self._paths[""] = self._get_path(cgroup_path, proc_paths.get(""))
+        else:
+            for controller in ["memory", "cpu", "cpuacct", "blkio"]:
+                path = os.path.join(cgroup_path, controller)
+                if os.path.isdir(path):
+                    self._paths[controller] = self._get_path(
+                        path, proc_paths.get(controller)
+                    )
+            if self._paths:
+                self.version = CgroupVersion.V1
+
+    @staticmethod
+    def _get_path(root: str, cgroup_path: Optional[str]) -> str:
+        # In a private cgroup namespace the process's cgroup is the root
+        if cgroup_path and cgroup_path != "/":
+            path = os.path.join(root, cgroup_path.lstrip("/"))
+            if os.path.isdir(path):
+                return path
+        return root
+
+    @property
+    def is_available(self) -> bool:
+        return self.version is not None
+
+    def _get_file(self, controller: str, filename: str) -> Optional[str]:
+        path = self._paths.get(controller)
+        return os.path.join(path, filename) if path else None
+
+    def _query_memory_v2(self, results: Dict):
+        usage = _read_int(self._get_file("", "memory.current"))
+        results["memory_usage"] = usage
+        limit = _read(self._get_file("", "memory.max"))
+        if limit != "max":
+            results["memory_limit"] = int(limit)
+        stat = _read_keys(self._get_file("", "memory.stat"))
+        if "inactive_file" in stat:
+            results["memory_working_set"] = max(usage - stat["inactive_file"], 0)
+
+    def _query_cpu_v2(self, results: Dict):
+        quota, _, period = _read(self._get_file("", "cpu.max")).partition(" ")
+        if quota != "max":
+            results["cpu_quota"] = int(quota) / int(period)
+        stat = _read_keys(self._get_file("", "cpu.stat"))
+        results["cpu_usage_secs"] = stat["usage_usec"] / 1e6
+        if "nr_throttled" in stat:
+            results["cpu_throttled_periods"] = stat["nr_throttled"]
+            results["cpu_throttled_secs"] = stat["throttled_usec"] / 1e6
+
+    def _query_io_v2(self, results: Dict):
+        totals = {"rbytes": 0, "wbytes": 0, "rios": 0, "wios": 0}
+        for line in _read(self._get_file("", "io.stat")).splitlines():
+            for item in line.split()[1:]:
+                key, _, value = item.partition("=")
+                if key in totals:
+                    totals[key] += int(value)
+        results["io_read_bytes"] = totals["rbytes"]
+        results["io_write_bytes"] = totals["wbytes"]
+        results["io_read_ops"] = totals["rios"]
+        results["io_write_ops"] = totals["wios"]
+
+    def _query_pressure_v2(self, results: Dict):
+        for resource in ["memory", "cpu", "io"]:
+            path = self._get_file("", "{}.pressure".format(resource))
+            if not os.path.exists(path):
+                continue
+            for key, value in read_pressure(path).items():
+                # The totals are cumulative stall times in microseconds
+                if key.endswith("_total"):
+                    key, value = key[: -len("_total")] + "_secs", value / 1e6
+                results["{}_pressure_{}".format(resource, key)] = value
+
+    def _query_memory_v1(self, results: Dict):
+        usage = _read_int(self._get_file("memory", "memory.usage_in_bytes"))
+        results["memory_usage"] = usage
+        limit = _read_int(self._get_file("memory", "memory.limit_in_bytes"))
+        if limit < V1_UNLIMITED:
+            results["memory_limit"] = limit
+        stat = _read_keys(self._get_file("memory", "memory.stat"))
+        if "total_inactive_file" in stat:
+            results["memory_working_set"] = max(usage - stat["total_inactive_file"], 0)
+
+    def _query_cpu_v1(self, results: Dict):
+        quota = _read_int(self._get_file("cpu", "cpu.cfs_quota_us"))
+        if quota > 0:
+            period = _read_int(self._get_file("cpu", "cpu.cfs_period_us"))
+            results["cpu_quota"] = quota / period
+        stat = _read_keys(self._get_file("cpu", "cpu.stat"))
+        results["cpu_throttled_periods"] = stat["nr_throttled"]
+        results["cpu_throttled_secs"] = stat["throttled_time"] / 1e9
+        controller = "cpuacct" if "cpuacct" in self._paths else "cpu"
+        usage = _read_int(self._get_file(controller, "cpuacct.usage"))
+        results["cpu_usage_secs"] = usage / 1e9
+
+    def _query_io_v1(self, results: Dict):
+        for filename, suffix in [
+            ("blkio.throttle.io_service_bytes", "bytes"),
+            ("blkio.throttle.io_serviced", "ops"),
+        ]:
+            totals = {"Read": 0, "Write": 0}
+            for line in _read(self._get_file("blkio", filename)).splitlines():
+                parts = line.split()
+                if len(parts) == 3 and parts[1] in totals:
+                    totals[parts[1]] += int(parts[2])
+            results["io_read_{}".format(suffix)] = totals["Read"]
+            results["io_write_{}".format(suffix)] = totals["Write"]
+
+    def query(self) -> Dict:
+        """Returns the cgroup's resources, each group of metrics is read independently."""
+        if self.version == CgroupVersion.V2:
+            queries = [
+                self._query_memory_v2,
+                self._query_cpu_v2,
+                self._query_io_v2,
+                self._query_pressure_v2,
+            ]
+        elif self.version == CgroupVersion.V1:
+            queries = [self._query_memory_v1, self._query_cpu_v1, self._query_io_v1]
+        else:
+            return {}
+
+        values = {}
+        for query in queries:
+            try:
+                query(values)
+            except (OSError, ValueError, KeyError, TypeError, ZeroDivisionError):
+                pass
+        # The working set, i.e. without the reclaimable page cache, is what counts
+        # towards an OOM kill
+        usage = values.get("memory_working_set", values.get("memory_usage"))
+        if values.get("memory_limit") and usage is not None:
+            values["memory_percent"] = 100 * usage / values["memory_limit"]
+        return {"{}_{}".format(self.prefix, k): v for k, v in values.items()}
+
+    def get_metrics(self) -> List:
+        return metrics_dict_to_list(self.query())
+
+
+def can_log_cgroup_resources(cgroup_path: str = CGROUP_PATH) -> bool:
+    return CgroupCollector(cgroup_path=cgroup_path).is_available
@@ -0,0 +1,163 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from collections import Counter, namedtuple
+from typing import List, Optional
+
+from traceml.vendor import pynvml
+
+FakeMemoryInfo = namedtuple("FakeMemoryInfo", ["total", "free", "used"])
+FakeUtilization = namedtuple("FakeUtilization", ["gpu", "memory"])
+FakeProcessInfo = namedtuple("FakeProcessInfo", ["pid", "usedGpuMemory"])
+
+
+class FakeGPU:
+    """The readings of a fake gpu, in NVML's units.
+
+    A reading set to `None` raises a `Not Supported` error,
+    a reading set to an `NVMLError` raises that error.
+
+    Args:
+        memory_total: int, optional, in bytes.
+        memory_used: int, optional, in bytes.
+        utilization: int, optional, in percent.
+        memory_utilization: int, optional, in percent.
+        power_usage: int, optional, in milliwatts.
+        power_limit: int, optional, in milliwatts.
+        temperature: int, optional, in degrees Celsius.
+        sm_clock: int, optional, in MHz.
+        pcie_tx: int, optional, in KB/s.
+        pcie_rx: int, optional, in KB/s.
+        processes: List[Tuple[int, int]], optional, the pid and
+            the gpu memory used in bytes of each compute process.
+    """
+
+    def __init__(
+        self,
+        memory_total: Optional[int] = 16 * 1024**3,
+        memory_used: Optional[int] = 0,
+        utilization: Optional[int] = 0,
+        memory_utilization: Optional[int] = 0,
+        power_usage: Optional[int] = 70000,
+        power_limit: Optional[int] = 300000,
+        temperature: Optional[int] = 40,
+        sm_clock: Optional[int] = 1410,
+        pcie_tx: Optional[int] = 0,
+        pcie_rx: Optional[int] = 0,
+        processes: Optional[List] = None,
+    ):
+        self.memory_total = memory_total
+        self.memory_used = memory_used
+        self.utilization = utilization
+        self.memory_utilization = memory_utilization
+        self.power_usage = power_usage
+        self.power_limit = power_limit
+        self.temperature = temperature
+        self.sm_clock = sm_clock
+        self.pcie_tx = pcie_tx
+        self.pcie_rx = pcie_rx
+        self.processes = processes if processes is not None else []
+
+
+class FakeNVML:
+    """In-memory NVML bindings, to run the gpu collector on machines without gpus.
+
+    It implements the `pynvml` functions used by `GPUCollector`,
+    the calls are counted by function name in `calls`.
+
+    Args:
+        gpus: List[FakeGPU], optional, the devices, defaults to a single gpu.
+        init_error: int, optional, the NVML error code raised by `nvmlInit`,
+            e.g. `pynvml.NVML_ERROR_DRIVER_NOT_LOADED`.
+    """
+
+    def __init__(
+        self, gpus: Optional[List[FakeGPU]] = None, init_error: Optional[int] = None
+    ):
+        self.gpus = gpus if gpus is not None else [FakeGPU()]
+        self.init_error = init_error
+        self.initialized = 0
+        self.calls = Counter()
+
+    def _read(self, name: str, gpu: FakeGPU, reading: str):
+        self.calls[name] += 1
+        value = getattr(gpu, reading)
+        if value is None:
+            raise pynvml.NVMLError(pynvml.NVML_ERROR_NOT_SUPPORTED)
+        if isinstance(value, pynvml.NVMLError):
+            raise value
+        return value
+
+    def _check_initialized(self):
+        if not self.initialized:
+            raise pynvml.NVMLError(pynvml.NVML_ERROR_UNINITIALIZED)
+
+    def nvmlInit(self):
+        self.calls["nvmlInit"] += 1
+        if self.init_error is not None:
+            raise pynvml.NVMLError(self.init_error)
+        self.initialized += 1
+
+    def nvmlShutdown(self):
+        self.calls["nvmlShutdown"] += 1
+        self._check_initialized()
+        self.initialized -= 1
+
+    def nvmlDeviceGetCount(self) -> int:
+        self.calls["nvmlDeviceGetCount"] += 1
+        self._check_initialized()
+        return len(self.gpus)
+
+    def nvmlDeviceGetHandleByIndex(self, index: int) -> FakeGPU:
+        self.calls["nvmlDeviceGetHandleByIndex"] += 1
+        self._check_initialized()
+        if index >= len(self.gpus):
+            raise pynvml.NVMLError(pynvml.NVML_ERROR_INVALID_ARGUMENT)
+        return self.gpus[index]
+
+    def nvmlDeviceGetMemoryInfo(self, handle: FakeGPU) -> FakeMemoryInfo:
+        total = self._read("nvmlDeviceGetMemoryInfo", handle, "memory_total")
+        used = self._read("nvmlDeviceGetMemoryInfo", handle, "memory_used")
+        return FakeMemoryInfo(total=total, free=total - used, used=used)
+
+    def nvmlDeviceGetUtilizationRates(self, handle: FakeGPU) -> FakeUtilization:
+        return FakeUtilization(
+            gpu=self._read("nvmlDeviceGetUtilizationRates", handle, "utilization"),
+            memory=self._read(
+                "nvmlDeviceGetUtilizationRates", handle, "memory_utilization"
+            ),
+        )
+
+    def nvmlDeviceGetPowerUsage(self, handle: FakeGPU) -> int:
+        return self._read("nvmlDeviceGetPowerUsage", handle, "power_usage")
+
+    def nvmlDeviceGetEnforcedPowerLimit(self, handle: FakeGPU) -> int:
+        return self._read("nvmlDeviceGetEnforcedPowerLimit", handle, "power_limit")
+
+    def nvmlDeviceGetTemperature(self, handle: FakeGPU, sensor: int) -> int:
+        return self._read("nvmlDeviceGetTemperature", handle, "temperature")
+
+    def nvmlDeviceGetClockInfo(self, handle: FakeGPU, type: int) -> int:
+        return self._read("nvmlDeviceGetClockInfo", handle, "sm_clock")
+
+    def nvmlDeviceGetPcieThroughput(self, handle: FakeGPU, counter: int) -> int:
+        reading = "pcie_tx" if counter == pynvml.NVML_PCIE_UTIL_TX_BYTES else "pcie_rx"
+        return self._read("nvmlDeviceGetPcieThroughput", handle, reading)
+
+    def nvmlDeviceGetComputeRunningProcesses(self, handle: FakeGPU) -> List:
+        processes = self._read(
+            "nvmlDeviceGetComputeRunningProcesses", handle, "processes"
+        )
+        return [FakeProcessInfo(*p) for p in processes]
@@ -14,7 +14,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict, List
+import os
+import threading
+
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from traceml.logger import logger
 from traceml.processors.events_processors import metrics_dict_to_list
@@ -25,39 +28,222 @@ try:
 except ImportError:
     psutil = None
 
+# The errors disabling a metric of a device for the collector's lifetime,
+# the other errors only skip the metric for the current query
+UNSUPPORTED_ERRORS = {
+    pynvml.NVML_ERROR_NOT_SUPPORTED,
+    pynvml.NVML_ERROR_FUNCTION_NOT_FOUND,
+    pynvml.NVML_ERROR_NO_PERMISSION,
+}
 
-def can_log_gpu_resources():
-    if pynvml is None:
-        return False
 
-    try:
-        pynvml.nvmlInit()
-        return True
-    except pynvml.NVMLError:
-        return False
+def get_process_tree_pids() -> Set[int]:
+    """Returns the pids of the current process and its children."""
+    pids = {os.getpid()}
+    if psutil is not None:
+        try:
+            pids.update(p.pid for p in psutil.Process().children(recursive=True))
+        except psutil.Error:
+            pass
+    return pids
 
 
-def query_gpu(handle_idx: int, handle: any) -> Dict:
-    memory = pynvml.nvmlDeviceGetMemoryInfo(handle)  # in Bytes
-    utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
+class GPUCollector:
+    """Reads the gpus' resources with NVML.
 
-    return {
-        "gpu_{}_memory_free".format(handle_idx): int(memory.free),
-        "gpu_{}_memory_used".format(handle_idx): int(memory.used),
-        "gpu_{}_utilization".format(handle_idx): utilization.gpu,
-    }
+    NVML is initialized and the device handles are resolved once,
+    each query then only reads the metrics. A metric that is not supported
+    by a device, e.g. the power draw of some consumer gpus, is disabled
+    for that device, the other metrics are still reported.
 
+    The series are `gpu_{index}_{metric}`: `memory_free`, `memory_used`,
+    `utilization`, `memory_utilization`, `power_watts`, `power_limit_watts`,
+    `temperature`, `sm_clock_mhz`, `pcie_tx_bytes_per_sec`, `pcie_rx_bytes_per_sec`,
+    `process_count`, and the memory used by the current process tree,
+    `process_memory_used`, and by each of its processes, `process_{pid}_memory_used`.
+    NVML reports the host's pids, the processes of a container without
+    the host's pid namespace are not matched.
 
-def get_gpu_metrics() -> List:
-    try:
-        pynvml.nvmlInit()
-        device_count = pynvml.nvmlDeviceGetCount()
-        results = []
-
-        for i in range(device_count):
-            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
-            results += metrics_dict_to_list(query_gpu(i, handle))
+    Args:
+        backend: optional, the NVML bindings, defaults to the vendored `pynvml`,
+            e.g. a `FakeNVML` to run the collector without gpus.
+        get_pids: callable, optional, returns the pids whose gpu memory is reported,
+            defaults to the current process and its children.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        get_pids: Optional[Callable[[], Iterable[int]]] = None,
+    ):
+        self.backend = backend if backend is not None else pynvml
+        self._get_pids = get_pids or get_process_tree_pids
+        self._handles = None  # type: Optional[List]
+        self._pid = None  # type: Optional[int]
+        self._unsupported = set()  # type: Set[Tuple[int, str]]
+        self._lock = threading.Lock()
+        self._queries = [
+            ("memory", self._query_memory),
+            ("utilization", self._query_utilization),
+            ("power", self._query_power),
+            ("power_limit", self._query_power_limit),
+            ("temperature", self._query_temperature),
+            ("sm_clock", self._query_sm_clock),
+            ("pcie", self._query_pcie),
+            ("processes", self._query_processes),
+        ]
+
+    def init(self) -> bool:
+        """Initializes NVML and caches the device handles, returns whether it succeeded."""
+        with self._lock:
+            # The handles are not valid in a forked process
+            if self._handles is not None and self._pid == os.getpid():
+                return True
+            try:
+                self.backend.nvmlInit()
+                count = self.backend.nvmlDeviceGetCount()
+                handles = [
+                    self.backend.nvmlDeviceGetHandleByIndex(i) for i in range(count)
+                ]
+            except pynvml.NVMLError:
+                logger.debug("Failed to initialize NVML", exc_info=True)
+                return False
+            self._handles = handles
+            self._pid = os.getpid()
+            self._unsupported = set()
+            return True
+
+    @property
+    def is_available(self) -> bool:
+        return self.init()
+
+    def shutdown(self):
+        with self._lock:
+            if self._handles is None:
+                return
+            self._handles = None
+            try:
+                self.backend.nvmlShutdown()
+            except pynvml.NVMLError:
+                pass
+
+    def _query_memory(self, handle) -> Dict:
+        memory = self.backend.nvmlDeviceGetMemoryInfo(handle)  # in Bytes
+        return {"memory_free": int(memory.free), "memory_used": int(memory.used)}
+
+    def _query_utilization(self, handle) -> Dict:
+        utilization = self.backend.nvmlDeviceGetUtilizationRates(handle)
+        return {
+            "utilization": utilization.gpu,
+            "memory_utilization": utilization.memory,
+        }
+
+    def _query_power(self, handle) -> Dict:
+        # in milliwatts
+        return {"power_watts": self.backend.nvmlDeviceGetPowerUsage(handle) / 1000}
+
+    def _query_power_limit(self, handle) -> Dict:
+        limit = self.backend.nvmlDeviceGetEnforcedPowerLimit(handle)
+        return {"power_limit_watts": limit / 1000}
+
+    def _query_temperature(self, handle) -> Dict:
+        temperature = self.backend.nvmlDeviceGetTemperature(
+            handle, pynvml.NVML_TEMPERATURE_GPU
+        )
+        return {"temperature": temperature}
+
+    def _query_sm_clock(self, handle) -> Dict:
+        clock = self.backend.nvmlDeviceGetClockInfo(handle, pynvml.NVML_CLOCK_SM)
+        return {"sm_clock_mhz": clock}
+
+    def _query_pcie(self, handle) -> Dict:
+        # in KB/s, sampled by NVML over a short interval
+        tx = self.backend.nvmlDeviceGetPcieThroughput(
+            handle, pynvml.NVML_PCIE_UTIL_TX_BYTES
+        )
+        rx = self.backend.nvmlDeviceGetPcieThroughput(
+            handle, pynvml.NVML_PCIE_UTIL_RX_BYTES
+        )
+        return {"pcie_tx_bytes_per_sec": tx * 1024, "pcie_rx_bytes_per_sec": rx * 1024}
+
+    def _query_processes(self, handle, pids: Set[int]) -> Dict:
+        processes = self.backend.nvmlDeviceGetComputeRunningProcesses(handle)
+        results = {"process_count": len(processes)}
+        total = 0
+        for process in processes:
+            # The memory is not available on Windows with WDDM
+            if process.pid not in pids or process.usedGpuMemory is None:
+                continue
+            results["process_{}_memory_used".format(process.pid)] = int(
+                process.usedGpuMemory
+            )
+            total += int(process.usedGpuMemory)
+        results["process_memory_used"] = total
+        return results
+
+    def query(self) -> Dict:
+        """Returns the resources of all the gpus, each metric is read independently."""
+        if not self.init():
+            return {}
+        results = {}
+        # The process tree is walked once per query, not once per device
+        pids = set(self._get_pids())
+        for idx, handle in enumerate(self._handles):
+            for metric, query in self._queries:
+                if (idx, metric) in self._unsupported:
+                    continue
+                try:
+                    if metric == "processes":
+                        values = query(handle, pids)
+                    else:
+                        values = query(handle)
+                except pynvml.NVMLError as e:
+                    if e.value in UNSUPPORTED_ERRORS:
+                        self._unsupported.add((idx, metric))
+                    continue
+                for k, v in values.items():
+                    results["gpu_{}_{}".format(idx, k)] = v
         return results
-    except pynvml.NVMLError:
-        logger.debug("Failed to collect gpu resources", exc_info=True)
-        return []
+
+    def get_metrics(self) -> List:
+        return metrics_dict_to_list(self.query())
+
+
+_GPU_COLLECTOR = None  # type: Optional[GPUCollector]
+_GPU_COLLECTOR_LOCK = threading.Lock()
+
+
+def get_gpu_collector() -> GPUCollector:
+    """Returns the process-wide gpu collector."""
+    global _GPU_COLLECTOR
+
+    with _GPU_COLLECTOR_LOCK:
+        if _GPU_COLLECTOR is None:
+            _GPU_COLLECTOR = GPUCollector()
+        return _GPU_COLLECTOR
+
+
+def set_nvml_backend(backend=None):
+    """Replaces the NVML bindings of the process-wide gpu collector.
+
+    Args:
+        backend: optional, e.g. a `FakeNVML` to test or benchmark the resources
+            on a machine without gpus, `None` restores the vendored `pynvml`.
+    """
+    global _GPU_COLLECTOR
+
+    with _GPU_COLLECTOR_LOCK:
+        if _GPU_COLLECTOR is not None:
+            _GPU_COLLECTOR.shutdown()
+        _GPU_COLLECTOR = GPUCollector(backend=backend)
+
+
+def can_log_gpu_resources():
+    if pynvml is None:
+        return False
+
+    return get_gpu_collector().is_available
+
+
+def get_gpu_metrics() -> List:
+    return get_gpu_collector().get_metrics()
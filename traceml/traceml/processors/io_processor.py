@@ -0,0 +1,209 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import fnmatch
+import os
+import time
+
+from typing import Dict, List, Mapping, Optional, Union
+
+from traceml.processors.events_processors import metrics_dict_to_list
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Virtual devices excluded unless they are explicitly selected
+DEFAULT_EXCLUDED_DISKS = ["loop*", "ram*", "zram*"]
+DEFAULT_EXCLUDED_INTERFACES = ["lo", "docker*", "veth*", "ifb*"]
+# The whole disks, the partitions are not selected by default to avoid counting twice
+SYS_BLOCK_PATH = "/sys/block"
+DEFAULT_MAX_DEVICES = 8
+
+IO_RATES_OPTIONS = {"disks", "interfaces", "max_devices", "per_device"}
+
+
+def can_log_io_resources():
+    return psutil is not None
+
+
+def get_io_rates_options(value: Optional[Union[bool, Mapping]]) -> Optional[Dict]:
+    """Validates the I/O rates option, `True` uses the default options."""
+    if not value:
+        return None
+    if value is True:
+        return {}
+    if not isinstance(value, Mapping):
+        raise ValueError(
+            "I/O rates received an unsupported value `{}`, "
+            "expected a boolean or a dict.".format(value)
+        )
+    unknown = set(value) - IO_RATES_OPTIONS
+    if unknown:
+        raise ValueError(
+            "I/O rates received unknown options {}, "
+            "supported options are {}.".format(
+                sorted(unknown), sorted(IO_RATES_OPTIONS)
+            )
+        )
+    return dict(value)
+
+
+def _matches(name: str, patterns: List[str]) -> bool:
+    return any(fnmatch.fnmatch(name, p) for p in patterns)
+
+
+class IORatesCollector:
+    """Reports the disk and network throughput between two queries.
+
+    The rates are computed from successive `psutil` counters snapshots,
+    the first query only takes the initial snapshot. A counter that was reset
+    or wrapped around is skipped for the interval.
+
+    The series are `disk_read_bytes_per_sec`, `disk_write_bytes_per_sec`,
+    `disk_read_iops`, `disk_write_iops`, `disk_busy_percent`,
+    `net_rx_bytes_per_sec`, and `net_tx_bytes_per_sec` for the selected devices,
+    and `disk_{device}_*` and `net_{interface}_*` for each device.
+
+    Args:
+        disks: List[str], optional, the disks to report by name or glob pattern,
+            e.g. `["nvme*"]`, defaults to all the whole disks except the virtual ones.
+        interfaces: List[str], optional, the network interfaces to report,
+            e.g. `["eth0"]`, defaults to all the interfaces except the virtual ones.
+        max_devices: int, optional, the maximum number of disks and
+            of interfaces reported, to keep the number of series bounded.
+        per_device: bool, optional, to also report the series of each device.
+    """
+
+    def __init__(
+        self,
+        disks: Optional[List[str]] = None,
+        interfaces: Optional[List[str]] = None,
+        max_devices: int = DEFAULT_MAX_DEVICES,
+        per_device: bool = True,
+    ):
+        if max_devices < 1:
+            raise ValueError("I/O rates requires `max_devices` >= 1.")
+        self.disks = disks
+        self.interfaces = interfaces
+        self.max_devices = max_devices
+        self.per_device = per_device
+        self._disk_names = None  # type: Optional[List[str]]
+        self._interface_names = None  # type: Optional[List[str]]
+        self._last_disks = None  # type: Optional[Dict]
+        self._last_net = None  # type: Optional[Dict]
+        self._last_time = None  # type: Optional[float]
+
+    def _select(
+        self, names, patterns: Optional[List[str]], excluded: List[str]
+    ) -> List[str]:
+        if patterns is not None:
+            selected = [n for n in names if _matches(n, patterns)]
+        else:
+            selected = [n for n in names if not _matches(n, excluded)]
+        return sorted(selected)[: self.max_devices]
+
+    def _get_disks(self) -> Dict:
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        if self._disk_names is None:
+            names = list(counters)
+            if self.disks is None and os.path.isdir(SYS_BLOCK_PATH):
+                disks = set(os.listdir(SYS_BLOCK_PATH))
+                names = [n for n in names if n in disks]
+            self._disk_names = self._select(names, self.disks, DEFAULT_EXCLUDED_DISKS)
+        return {n: counters[n] for n in self._disk_names if n in counters}
+
+    def _get_net(self) -> Dict:
+        counters = psutil.net_io_counters(pernic=True) or {}
+        if self._interface_names is None:
+            self._interface_names = self._select(
+                counters, self.interfaces, DEFAULT_EXCLUDED_INTERFACES
+            )
+        return {n: counters[n] for n in self._interface_names if n in counters}
+
+    @staticmethod
+    def _get_rates(
+        current, last, fields: Mapping[str, str], elapsed: float
+    ) -> Optional[Dict]:
+        rates = {}
+        for name, field in fields.items():
+            delta = getattr(current, field) - getattr(last, field)
+            if delta < 0:
+                return None
+            rates[name] = delta / elapsed
+        return rates
+
+    def _add_rates(
+        self, results: Dict, prefix: str, current: Dict, last: Dict, fields, elapsed
+    ):
+        totals = {}
+        for device, counters in current.items():
+            if device not in last:
+                continue
+            rates = self._get_rates(counters, last[device], fields, elapsed)
+            if rates is None:
+                continue
+            if "busy_percent" in rates:
+                # The busy time is in milliseconds
+                rates["busy_percent"] = min(rates["busy_percent"] / 10, 100)
+            for k, v in rates.items():
+                if k == "busy_percent":
+                    # The busiest disk is reported, a sum is not a percentage
+                    totals[k] = max(totals.get(k, 0), v)
+                else:
+                    totals[k] = totals.get(k, 0) + v
+                if self.per_device:
+                    results["{}_{}_{}".format(prefix, device, k)] = v
+        for k, v in totals.items():
+            results["{}_{}".format(prefix, k)] = v
+
+    def query(self, now: Optional[float] = None) -> Dict:
+        """Returns the rates since the previous query."""
+        now = time.monotonic() if now is None else now
+        disks, net = {}, {}
+        try:
+            disks = self._get_disks()
+        except Exception:
+            pass
+        try:
+            net = self._get_net()
+        except Exception:
+            pass
+
+        results = {}
+        elapsed = now - self._last_time if self._last_time is not None else 0
+        if elapsed > 0:
+            disk_fields = {
+                "read_bytes_per_sec": "read_bytes",
+                "write_bytes_per_sec": "write_bytes",
+                "read_iops": "read_count",
+                "write_iops": "write_count",
+            }
+            if any(hasattr(c, "busy_time") for c in disks.values()):
+                disk_fields["busy_percent"] = "busy_time"
+            self._add_rates(
+                results, "disk", disks, self._last_disks, disk_fields, elapsed
+            )
+            net_fields = {
+                "rx_bytes_per_sec": "bytes_recv",
+                "tx_bytes_per_sec": "bytes_sent",
+            }
+            self._add_rates(results, "net", net, self._last_net, net_fields, elapsed)
+        self._last_disks, self._last_net, self._last_time = disks, net, now
+        return results
+
+    def get_metrics(self) -> List:
+        return metrics_dict_to_list(self.query())
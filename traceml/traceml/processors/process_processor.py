@@ -0,0 +1,236 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from typing import Dict, List, Mapping, Optional, Union
+
+from traceml.processors.events_processors import metrics_dict_to_list
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# The counters accumulated over the lifetime of a process,
+# the aggregated series keep the last values of the exited children.
+CUMULATIVE_METRICS = (
+    "cpu_time",
+    "read_bytes",
+    "write_bytes",
+    "ctx_switches_voluntary",
+    "ctx_switches_involuntary",
+)
+DEFAULT_MAX_PROCESSES = 8
+
+PROCESS_TREE_OPTIONS = {"per_process", "max_processes", "full_memory"}
+
+
+def can_log_process_resources():
+    return psutil is not None
+
+
+def get_process_tree_options(value: Optional[Union[bool, Mapping]]) -> Optional[Dict]:
+    """Validates the process tree option, `True` uses the default options."""
+    if not value:
+        return None
+    if value is True:
+        return {}
+    if not isinstance(value, Mapping):
+        raise ValueError(
+            "Process tree received an unsupported value `{}`, "
+            "expected a boolean or a dict.".format(value)
+        )
+    unknown = set(value) - PROCESS_TREE_OPTIONS
+    if unknown:
+        raise ValueError(
+            "Process tree received unknown options {}, "
+            "supported options are {}.".format(
+                sorted(unknown), sorted(PROCESS_TREE_OPTIONS)
+            )
+        )
+    return dict(value)
+
+
+def query_process(process, full_memory: bool = False) -> Dict:
+    """Returns the resources used by a single process.
+
+    The metrics that are not supported by the platform or not accessible,
+    e.g. the USS of a process owned by another user, are skipped.
+
+    Args:
+        process: psutil.Process, the process to query.
+        full_memory: bool, optional, to also read the USS and, on Linux, the PSS,
+            they are computed by walking the process' memory maps.
+    """
+    results = {}
+    with process.oneshot():
+        memory = None
+        if full_memory:
+            try:
+                memory = process.memory_full_info()
+                results["uss"] = memory.uss
+                if hasattr(memory, "pss"):
+                    results["pss"] = memory.pss
+            except (psutil.AccessDenied, AttributeError):
+                memory = None
+        if memory is None:
+            memory = process.memory_info()
+        results["rss"] = memory.rss
+        cpu_times = process.cpu_times()
+        results["cpu_time"] = cpu_times.user + cpu_times.system
+        results["threads"] = process.num_threads()
+        try:
+            results["fds"] = process.num_fds()
+        except (psutil.AccessDenied, AttributeError):
+            pass
+        try:
+            io = process.io_counters()
+            results["read_bytes"] = io.read_bytes
+            results["write_bytes"] = io.write_bytes
+        except (psutil.AccessDenied, AttributeError):
+            pass
+        try:
+            ctx_switches = process.num_ctx_switches()
+            results["ctx_switches_voluntary"] = ctx_switches.voluntary
+            results["ctx_switches_involuntary"] = ctx_switches.involuntary
+        except (psutil.AccessDenied, AttributeError):
+            pass
+    return results
+
+
+class ProcessTreeCollector:
+    """Tracks the resources of a process and its children, e.g. data loader workers.
+
+    The `psutil.Process` handles are cached between queries,
+    only the new children are attached and the exited ones are released.
+    The tree is reported as `process_{metric}` series, e.g. `process_rss`,
+    the root process as `process_main_{metric}` series, and each child
+    as `process_child_{slot}_{metric}` series. A child takes the lowest slot
+    released by an exited child, e.g. the workers respawned at each epoch
+    reuse the same series, and the children without a slot are only
+    reported by the tree's series.
+
+    Args:
+        pid: int, optional, the root process, defaults to the current process.
+        per_process: bool, optional, to also report the series of each process.
+        prefix: str, optional, the prefix of the series.
+        max_processes: int, optional, the number of children slots.
+        full_memory: bool, optional, to also report the USS and PSS,
+            they are more expensive to read than the RSS.
+    """
+
+    def __init__(
+        self,
+        pid: Optional[int] = None,
+        per_process: bool = True,
+        prefix: str = "process",
+        max_processes: int = DEFAULT_MAX_PROCESSES,
+        full_memory: bool = False,
+    ):
+        if max_processes < 0:
+            raise ValueError(
+                "Process tree received an invalid `max_processes` {}.".format(
+                    max_processes
+                )
+            )
+        self.per_process = per_process
+        self.prefix = prefix
+        self.max_processes = max_processes
+        self.full_memory = full_memory
+        self._root = psutil.Process(pid)
+        self._children = {}  # type: Dict[int, psutil.Process]
+        self._slots = {}  # type: Dict[int, int]
+        self._last_values = {}  # type: Dict[int, Dict]
+        # The counters of the exited children
+        self._exited = {k: 0 for k in CUMULATIVE_METRICS}
+
+    @property
+    def pids(self) -> List[int]:
+        return [self._root.pid] + list(self._children)
+
+    def _release(self, pid: int):
+        self._children.pop(pid, None)
+        self._slots.pop(pid, None)
+        last_values = self._last_values.pop(pid, {})
+        for k in CUMULATIVE_METRICS:
+            self._exited[k] += last_values.get(k, 0)
+
+    def _assign_slots(self):
+        used = set(self._slots.values())
+        free = [k for k in range(self.max_processes) if k not in used]
+        for pid in sorted(self._children):
+            if not free:
+                return
+            if pid not in self._slots:
+                self._slots[pid] = free.pop(0)
+
+    def refresh_children(self):
+        """Attaches the new children and releases the exited ones."""
+        try:
+            children = self._root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            children = []
+        current = {}
+        for child in children:
+            cached = self._children.get(child.pid)
+            # A pid reused by another process is a new child
+            current[child.pid] = cached if cached == child else child
+        for pid in list(self._children):
+            if current.get(pid) is not self._children[pid]:
+                self._release(pid)
+        self._children.update(current)
+        self._assign_slots()
+
+    def _get_process_prefix(self, pid: int) -> Optional[str]:
+        if pid == self._root.pid:
+            return "{}_main".format(self.prefix)
+        slot = self._slots.get(pid)
+        if slot is None:
+            return None
+        return "{}_child_{}".format(self.prefix, slot)
+
+    def query(self) -> Dict:
+        """Returns the resources of the tree and, optionally, of each process."""
+        self.refresh_children()
+        results = {}
+        totals = {}
+        processes = [self._root] + list(self._children.values())
+        count = 0
+        for process in processes:
+            try:
+                values = query_process(process, full_memory=self.full_memory)
+            except psutil.NoSuchProcess:
+                self._release(process.pid)
+                continue
+            except psutil.AccessDenied:
+                continue
+            count += 1
+            self._last_values[process.pid] = values
+            prefix = self._get_process_prefix(process.pid)
+            for k, v in values.items():
+                totals[k] = totals.get(k, 0) + v
+                if self.per_process and prefix:
+                    results["{}_{}".format(prefix, k)] = v
+        if not count:
+            return {}
+        for k, v in self._exited.items():
+            if v or k in totals:
+                totals[k] = totals.get(k, 0) + v
+        for k, v in totals.items():
+            results["{}_{}".format(self.prefix, k)] = v
+        results["{}_count".format(self.prefix)] = count
+        return results
+
+    def get_metrics(self) -> List:
+        return metrics_dict_to_list(self.query())
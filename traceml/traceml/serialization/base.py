@@ -14,92 +14,805 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime
 import os
+import threading
+import time
 
-from typing import Dict, List
+from collections import OrderedDict
+from typing import IO, Dict, List, Mapping, Optional, Set, Tuple, Union
 
 from clipped.utils.enums import get_enum_value
 from clipped.utils.paths import check_or_create_path
 
-from traceml.events import LoggedEventSpec
-from traceml.events.schemas import LoggedEventListSpec
+from traceml.artifacts import V1ArtifactKind
+from traceml.events import (
+    LoggedEventSpec,
+    LoggedMetricArraySpec,
+    LoggedMetricSpec,
+    get_shard_name,
+    segments,
+)
+from traceml.events.binary import (
+    BINARY_EXTENSION,
+    BINARY_NULL,
+    HEADER_SIZE,
+    RECORD_SIZE,
+    to_epoch_ns,
+)
+from traceml.events.clock import TimestampFormat, TimestampFormatter
+from traceml.events.index import IndexBuilder, get_index_path
+from traceml.events.schemas import LoggedEventListSpec, V1Events
+from traceml.events.summaries import (
+    SeriesSummary,
+    load_series_summary,
+    write_series_summary,
+)
+from traceml.serialization.downsampling import (
+    BaseDownsampler,
+    PendingPointSpec,
+    get_downsampler,
+    match_downsampling,
+    validate_downsampling,
+)
+from traceml.serialization.scheduling import is_live_series
+from traceml.serialization.stats import LatencyHistogram
+from traceml.serialization.wal import WriteAheadLog
 
 
 class EventWriter:
     EVENTS_BACKEND = "events"
     RESOURCES_BACKEND = "resources"
+    RAW_EVENTS_BACKEND = "events_raw"
+    DEFAULT_MAX_OPEN_FILES = 128
+    CSV_FORMAT = "csv"
+    BINARY_FORMAT = "binary"
+    # Estimated size of a buffered row until a flush measures the series' rows.
+    DEFAULT_ROW_BYTES = 64
 
-    def __init__(self, run_path: str, backend: str):
+    def __init__(
+        self,
+        run_path: str,
+        backend: str,
+        max_open_files: int = DEFAULT_MAX_OPEN_FILES,
+        events_format: str = CSV_FORMAT,
+        downsampling: Optional[Mapping[str, Mapping]] = None,
+        segment_max_bytes: Optional[int] = None,
+        segment_max_rows: Optional[int] = None,
+        segment_compression: str = segments.SegmentCompression.GZIP,
+        rank: Optional[int] = None,
+        wal_path: Optional[str] = None,
+        live_series: Optional[List[str]] = None,
+        timestamp_format: str = TimestampFormat.ISO,
+        index_rows: Optional[int] = None,
+        summaries: bool = False,
+    ):
+        if events_format not in {self.CSV_FORMAT, self.BINARY_FORMAT}:
+            raise ValueError("Unrecognized events format {}".format(events_format))
+        if get_enum_value(timestamp_format) not in TimestampFormat.to_set():
+            raise ValueError(
+                "Unrecognized timestamp format {}".format(timestamp_format)
+            )
+        if index_rows is not None and index_rows <= 0:
+            raise ValueError("`index_rows` should be a positive integer")
+        validate_downsampling(downsampling)
+        segments.validate_compression(segment_compression)
         self._events_backend = backend
+        # The binary format only applies to metric series,
+        # other kinds are always written as csv.
+        self._events_format = events_format
+        # The csv timestamps are formatted at flush time,
+        # epoch nanoseconds are formatted with a per-second prefix cache.
+        self._timestamp_formatter = TimestampFormatter(timestamp_format)
         self._run_path = run_path
+        # Writers of a distributed job are tagged with a rank,
+        # each rank writes its own `{name}.rank{k}` shard of a series.
+        self._rank = rank
         self._files = {}  # type: Dict[str, LoggedEventListSpec]
         self._closed = False
+        # Open handles are kept in an LRU pool, the least recently used handle
+        # is flushed and closed once the pool reaches `max_open_files`.
+        self._max_open_files = max(1, max_open_files)
+        self._handles = OrderedDict()  # type: OrderedDict[str, IO]
+        self._dirty_handles = set()  # type: Set[str]
+        self._handles_hits = 0
+        self._handles_misses = 0
+        self._handles_evictions = 0
+        self._lock = threading.RLock()
+        # Downsampling policies for metric series by name or glob pattern,
+        # the raw points are optionally written to the `events_raw` backend.
+        self._downsampling = downsampling
+        self._downsamplers = {}  # type: Dict[str, Optional[BaseDownsampler]]
+        self._raw_writer = None  # type: Optional[EventWriter]
+        # Series are rotated to sealed segments once the active segment
+        # reaches `segment_max_bytes` or `segment_max_rows` at flush time.
+        self._segment_max_bytes = segment_max_bytes
+        self._segment_max_rows = segment_max_rows
+        self._segment_compression = segment_compression
+        self._segments = {}  # type: Dict[str, Dict]
+        self._manifests = {}  # type: Dict[str, Dict]
+        # A sparse index sidecar with the steps and timestamps ranges
+        # of each block of `index_rows` rows is written next to the event files.
+        self._index_rows = index_rows
+        self._indexes = {}  # type: Dict[str, IndexBuilder]
+        # Running summaries of the series are persisted in a sidecar on each flush,
+        # a resumed series without a valid sidecar is not summarized.
+        self._track_summaries = summaries
+        self._summaries = {}  # type: Dict[str, Optional[SeriesSummary]]
+        self._dirty_summaries = set()  # type: Set[str]
+        # Flushes that write events are timed and their volume is tracked.
+        self._flush_latency = LatencyHistogram()
+        self._flush_events = 0
+        self._flush_bytes = 0
+        self._flush_stats = {
+            "count": 0,
+            "last_events": 0,
+            "last_bytes": 0,
+            "events": 0,
+            "bytes": 0,
+        }
+        # The buffered rows and their estimated size drive the early flushes,
+        # and the oldest buffered event of a live series bounds the flush delay.
+        self._live_series = live_series
+        self._live = {}  # type: Dict[str, bool]
+        self._live_since = None  # type: Optional[float]
+        self._buffered_rows = 0
+        self._buffered_bytes = 0
+        self._row_bytes = {}  # type: Dict[str, int]
+        # Events are committed to a write-ahead log until they are flushed,
+        # a log left by a previous process is replayed first.
+        # The event files and their new directory entries are synced to disk
+        # before the log is truncated.
+        self._wal = None  # type: Optional[WriteAheadLog]
+        self._sync_files = bool(wal_path)
+        self._unsynced_dirs = set()  # type: Set[str]
+        if wal_path:
+            self._wal = WriteAheadLog(wal_path)
+            self._replay_wal()
+
+    @property
+    def buffered_rows(self) -> int:
+        return self._buffered_rows
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._buffered_bytes
+
+    @property
+    def live_since(self) -> Optional[float]:
+        """Time of the oldest buffered event of a live series, if any."""
+        return self._live_since
+
+    def _is_live(self, name: str) -> bool:
+        if not self._live_series:
+            return False
+        if name not in self._live:
+            self._live[name] = is_live_series(self._live_series, name)
+        return self._live[name]
+
+    @property
+    def _rotates(self) -> bool:
+        return bool(self._segment_max_bytes or self._segment_max_rows)
+
+    def _is_binary(self, kind: str) -> bool:
+        return (
+            self._events_format == self.BINARY_FORMAT and kind == V1ArtifactKind.METRIC
+        )
 
     def _get_event_path(self, kind: str, name: str) -> str:
+        ext = BINARY_EXTENSION if self._is_binary(kind) else "plx"
+        name = get_shard_name(name, self._rank)
         if self._events_backend == self.EVENTS_BACKEND:
             return os.path.join(
                 self._run_path,
                 get_enum_value(self._events_backend),
                 kind,
-                "{}.plx".format(name),
+                "{}.{}".format(name, ext),
             )
         if self._events_backend == self.RESOURCES_BACKEND:
             return os.path.join(
                 self._run_path,
                 get_enum_value(self._events_backend),
                 kind,
-                "{}.plx".format(name),
+                "{}.{}".format(name, ext),
+            )
+        if self._events_backend == self.RAW_EVENTS_BACKEND:
+            return os.path.join(
+                self._run_path,
+                get_enum_value(self._events_backend),
+                kind,
+                "{}.{}".format(name, ext),
             )
         raise ValueError(
             "Unrecognized backend {}".format(get_enum_value(self._events_backend))
         )
 
+    def _close_handle(self, event_path: str):
+        handle = self._handles.pop(event_path, None)
+        if handle is not None:
+            if self._sync_files and event_path in self._dirty_handles:
+                handle.flush()
+                os.fsync(handle.fileno())
+            handle.close()
+        self._dirty_handles.discard(event_path)
+
+    def _get_handle(self, event_path: str, is_binary: bool = False) -> IO:
+        handle = self._handles.get(event_path)
+        if handle is not None:
+            self._handles_hits += 1
+            self._handles.move_to_end(event_path)
+            return handle
+
+        self._handles_misses += 1
+        while len(self._handles) >= self._max_open_files:
+            lru_path = next(iter(self._handles))
+            self._close_handle(lru_path)
+            self._handles_evictions += 1
+        mode = "ab" if is_binary else "a"
+        try:
+            handle = open(event_path, mode)
+        except FileNotFoundError:
+            check_or_create_path(event_path, is_dir=False)
+            handle = open(event_path, mode)
+        self._handles[event_path] = handle
+        return handle
+
     def _init_events(self, events_spec: LoggedEventListSpec):
         event_path = self._get_event_path(kind=events_spec.kind, name=events_spec.name)
-        # Check if the file exists otherwise initialize
-        if not os.path.exists(event_path):
-            check_or_create_path(event_path, is_dir=False)
-            with open(event_path, "w") as event_file:
-                event_file.write(events_spec.get_csv_header())
+        is_binary = self._is_binary(events_spec.kind)
+        with self._lock:
+            event_file = self._get_handle(event_path, is_binary=is_binary)
+            # An append handle is positioned at the end of the file,
+            # a new or an empty file requires a header.
+            is_new = event_file.tell() == 0
+            if is_new:
+                if self._sync_files:
+                    self._unsynced_dirs.add(os.path.dirname(event_path))
+                if is_binary:
+                    event_file.write(events_spec.get_binary_header())
+                else:
+                    event_file.write(events_spec.get_csv_header())
+                event_file.flush()
+            if self._track_summaries and event_path not in self._summaries:
+                self._summaries[event_path] = (
+                    SeriesSummary(events_spec.kind)
+                    if is_new and not self._get_manifest(event_path)["segments"]
+                    else load_series_summary(event_path)
+                )
+            if self._index_rows:
+                first_offset = (
+                    HEADER_SIZE
+                    if is_binary
+                    else len(events_spec.get_csv_header().encode("utf-8"))
+                )
+                self._indexes[event_path] = (
+                    IndexBuilder(
+                        event_path, self._index_rows, rows=0, offset=first_offset
+                    )
+                    if is_new
+                    else IndexBuilder.resume(
+                        event_path, self._index_rows, first_offset=first_offset
+                    )
+                )
+            if self._rotates:
+                # An existing active segment is read once to resume its stats
+                self._segments[event_path] = (
+                    {"rows": 0, "step": None, "timestamp": None}
+                    if is_new
+                    else self._get_resumed_segment(event_path)
+                )
 
     def _append_events(self, events_spec: LoggedEventListSpec):
         event_path = self._get_event_path(kind=events_spec.kind, name=events_spec.name)
-        with open(event_path, "a") as event_file:
-            event_file.write(events_spec.get_csv_events())
+        is_binary = self._is_binary(events_spec.kind)
+        with self._lock:
+            event_file = self._get_handle(event_path, is_binary=is_binary)
+            if is_binary:
+                data = events_spec.get_binary_events()
+                encoded = data
+            else:
+                data = events_spec.get_csv_events(self._timestamp_formatter)
+                encoded = data.encode("utf-8")
+            data_bytes = len(encoded)
+            event_file.write(data)
+            summary = self._summaries.get(event_path)
+            if event_path in self._indexes or summary is not None:
+                steps, timestamps, values = self._get_events_columns(
+                    events_spec.kind, events_spec.events, is_binary
+                )
+                if event_path in self._indexes:
+                    self._update_index(
+                        event_path, steps, timestamps, encoded, is_binary
+                    )
+                if summary is not None:
+                    summary.update(steps, timestamps, values)
+                    self._dirty_summaries.add(event_path)
+            rows = events_spec.count_events()
+            self._flush_bytes += data_bytes
+            self._flush_events += rows
+            self._row_bytes["{}.{}".format(events_spec.kind, events_spec.name)] = max(
+                1, data_bytes // max(1, rows)
+            )
+            self._dirty_handles.add(event_path)
+            if self._rotates:
+                self._update_segment(event_path, events_spec.events)
+                if self._should_seal_segment(event_path, event_file):
+                    self._seal_segment(events_spec.kind, events_spec.name)
+                    self._init_events(events_spec)
 
-    def _events_to_files(self, events: List[LoggedEventSpec]):
+    @staticmethod
+    def _update_range(value_range: Optional[List], value) -> List:
+        if value_range is None:
+            return [value, value]
+        return [min(value_range[0], value), max(value_range[1], value)]
+
+    def _update_segment_array(self, segment: Dict, event: LoggedMetricArraySpec):
+        if not event.size:
+            return
+        if event.steps is not None:
+            segment["step"] = self._update_range(
+                segment["step"], int(event.steps.min())
+            )
+            segment["step"] = self._update_range(
+                segment["step"], int(event.steps.max())
+            )
+        segment["timestamp"] = self._update_range(
+            segment["timestamp"], int(event.timestamps.min())
+        )
+        segment["timestamp"] = self._update_range(
+            segment["timestamp"], int(event.timestamps.max())
+        )
+
+    def _update_segment(self, event_path: str, events: List):
+        segment = self._segments[event_path]
+        for e in events:
+            if isinstance(e, LoggedMetricArraySpec):
+                segment["rows"] += e.size
+                self._update_segment_array(segment, e)
+                continue
+            segment["rows"] += 1
+            if e.step is not None:
+                segment["step"] = self._update_range(segment["step"], e.step)
+            timestamp = to_epoch_ns(e.timestamp)
+            if timestamp != BINARY_NULL:
+                segment["timestamp"] = self._update_range(
+                    segment["timestamp"], timestamp
+                )
+
+    def _get_events_columns(self, kind: str, events: List, is_binary: bool):
+        """Returns the events' steps, timestamps, and metric values as arrays.
+
+        The missing steps and timestamps are `BINARY_NULL`, and the timestamps
+        have the precision they are written with.
+        """
+        import numpy as np
+
+        is_metric = kind == V1ArtifactKind.METRIC
+        if not any(isinstance(e, LoggedMetricArraySpec) for e in events):
+            steps = np.array(
+                [BINARY_NULL if e.step is None else e.step for e in events],
+                dtype=np.int64,
+            )
+            timestamps = np.array(
+                [to_epoch_ns(e.timestamp) for e in events], dtype=np.int64
+            )
+            values = (
+                np.array(
+                    [np.nan if e.metric is None else e.metric for e in events],
+                    dtype=float,
+                )
+                if is_metric
+                else None
+            )
+        else:
+            steps, timestamps, values = [], [], []
+            for e in events:
+                if isinstance(e, LoggedMetricArraySpec):
+                    steps.append(
+                        e.steps
+                        if e.steps is not None
+                        else np.full(e.size, BINARY_NULL, dtype=np.int64)
+                    )
+                    timestamps.append(e.timestamps)
+                    values.append(e.values)
+                    continue
+                steps.append([BINARY_NULL if e.step is None else e.step])
+                timestamps.append([to_epoch_ns(e.timestamp)])
+                values.append([np.nan if e.metric is None else e.metric])
+            steps = np.concatenate(steps).astype(np.int64)
+            timestamps = np.concatenate(timestamps).astype(np.int64)
+            values = np.concatenate(values).astype(float) if is_metric else None
+        if (
+            not is_binary
+            and self._timestamp_formatter.timestamp_format == TimestampFormat.ISO
+        ):
+            # The iso timestamps are written with a microseconds precision
+            timestamps = np.where(
+                timestamps == BINARY_NULL, BINARY_NULL, timestamps // 1000 * 1000
+            )
+        return steps, timestamps, values
+
+    def _update_index(
+        self, event_path: str, steps, timestamps, data: bytes, is_binary: bool
+    ):
+        import numpy as np
+
+        indexer = self._indexes[event_path]
+        if is_binary:
+            offsets = indexer.offset + np.arange(len(steps)) * RECORD_SIZE
+        else:
+            # Each csv row starts with a new line
+            offsets = indexer.offset + np.flatnonzero(
+                np.frombuffer(data, dtype=np.uint8) == ord("\n")
+            )
+        if len(offsets) != len(steps):
+            # The rows can't be located, the index stops at its last block
+            self._indexes.pop(event_path)
+            return
+        indexer.add(steps, timestamps, offsets, end=indexer.offset + len(data))
+
+    def _close_index(self, event_path: str):
+        indexer = self._indexes.pop(event_path, None)
+        if indexer is not None:
+            indexer.close()
+
+    def _should_seal_segment(self, event_path: str, event_file: IO) -> bool:
+        if self._segment_max_bytes and event_file.tell() >= self._segment_max_bytes:
+            return True
+        rows = self._segments[event_path]["rows"]
+        return bool(self._segment_max_rows and rows >= self._segment_max_rows)
+
+    def _get_manifest(self, event_path: str) -> Dict:
+        if event_path not in self._manifests:
+            self._manifests[event_path] = segments.read_manifest(
+                event_path
+            ) or segments.get_new_manifest(event_path)
+        return self._manifests[event_path]
+
+    @staticmethod
+    def _ns_to_iso(value: int) -> str:
+        return datetime.datetime.fromtimestamp(
+            value / 1_000_000_000, tz=datetime.timezone.utc
+        ).isoformat()
+
+    @staticmethod
+    def _get_resumed_segment(event_path: str) -> Dict:
+        df = V1Events.read_segment(event_path)
+        step = df.step.dropna()
+        timestamp = df.timestamp.dropna()
+        return {
+            "rows": len(df),
+            "step": [int(step.min()), int(step.max())] if len(step) else None,
+            "timestamp": [to_epoch_ns(timestamp.min()), to_epoch_ns(timestamp.max())]
+            if len(timestamp)
+            else None,
+        }
+
+    def _seal_segment(self, kind: str, name: str):
+        """Moves the active segment to a new sealed segment and updates the manifest."""
+        event_path = self._get_event_path(kind=kind, name=name)
+        self._close_handle(event_path)
+        segment = self._segments.pop(event_path)
+        if not segment["rows"]:
+            return
+
+        manifest = self._get_manifest(event_path)
+        index = len(manifest["segments"])
+        segment_path = segments.get_segment_path(event_path, index)
+        os.replace(event_path, segment_path)
+        self._close_index(event_path)
+        index_path = get_index_path(event_path)
+        if os.path.exists(index_path):
+            os.replace(index_path, get_index_path(segment_path))
+        size = os.path.getsize(segment_path)
+        if (
+            get_enum_value(self._segment_compression)
+            != segments.SegmentCompression.NONE
+        ):
+            compressed_path = segments.get_segment_path(
+                event_path, index, self._segment_compression
+            )
+            segments.compress_file(
+                segment_path, compressed_path, self._segment_compression
+            )
+            segment_path = compressed_path
+        step = segment["step"]
+        timestamp = segment["timestamp"]
+        manifest["segments"].append(
+            {
+                "path": os.path.basename(segment_path),
+                "rows": segment["rows"],
+                "bytes": size,
+                "step": {"min": step[0], "max": step[1]} if step else None,
+                "timestamp": {
+                    "min": self._ns_to_iso(timestamp[0]),
+                    "max": self._ns_to_iso(timestamp[1]),
+                }
+                if timestamp
+                else None,
+            }
+        )
+        segments.write_manifest(event_path, manifest)
+
+    def _seal_segments(self):
+        for file_name, events_spec in self._files.items():
+            event_path = self._get_event_path(
+                kind=events_spec.kind, name=events_spec.name
+            )
+            if event_path in self._segments:
+                self._seal_segment(events_spec.kind, events_spec.name)
+
+    def _write_summaries(self):
+        for event_path in self._dirty_summaries:
+            summary = self._summaries.get(event_path)
+            if summary is not None:
+                write_series_summary(
+                    event_path, summary, manifest=self._get_manifest(event_path)
+                )
+        self._dirty_summaries.clear()
+
+    def _flush_handles(self):
+        for event_path in self._dirty_handles:
+            handle = self._handles.get(event_path)
+            if handle is not None:
+                handle.flush()
+                if self._sync_files:
+                    os.fsync(handle.fileno())
+        self._dirty_handles.clear()
+        for dirname in self._unsynced_dirs:
+            segments.fsync_path(dirname)
+        self._unsynced_dirs.clear()
+
+    def _close_handles(self):
+        for event_path in list(self._handles.keys()):
+            self._close_handle(event_path)
+
+    def _get_downsampler(self, kind: str, name: str) -> Optional[BaseDownsampler]:
+        if not self._downsampling or kind != V1ArtifactKind.METRIC:
+            return None
+        if name not in self._downsamplers:
+            config = match_downsampling(self._downsampling, name)
+            downsampler = get_downsampler(name, config) if config is not None else None
+            if downsampler is not None:
+                # The points held by the downsampler are logged again
+                # once the write-ahead log is truncated
+                downsampler.track_pending = self._sync_files
+            self._downsamplers[name] = downsampler
+        return self._downsamplers[name]
+
+    def _get_raw_writer(self) -> "EventWriter":
+        if self._raw_writer is None:
+            self._raw_writer = EventWriter(
+                self._run_path,
+                backend=self.RAW_EVENTS_BACKEND,
+                max_open_files=self._max_open_files,
+                events_format=self._events_format,
+                segment_max_bytes=self._segment_max_bytes,
+                segment_max_rows=self._segment_max_rows,
+                segment_compression=self._segment_compression,
+                rank=self._rank,
+                timestamp_format=self._timestamp_formatter.timestamp_format,
+                index_rows=self._index_rows,
+            )
+            # The raw points are flushed before the log is truncated as well
+            self._raw_writer._sync_files = self._sync_files
+        return self._raw_writer
+
+    def _add_event_to_file(self, kind: str, name: str, event):
+        # An enum kind, e.g. `V1ArtifactKind.METRIC`, is buffered with its str value
+        kind = get_enum_value(kind)
+        file_name = "{}.{}".format(kind, name)
+        rows = event.size if isinstance(event, LoggedMetricArraySpec) else 1
+        self._buffered_rows += rows
+        self._buffered_bytes += rows * self._row_bytes.get(
+            file_name, self.DEFAULT_ROW_BYTES
+        )
+        if self._live_since is None and self._is_live(name):
+            self._live_since = time.time()
+        if file_name in self._files:
+            self._files[file_name].events.append(event)
+        else:
+            self._files[file_name] = LoggedEventListSpec(
+                kind=kind, name=name, events=[event]
+            )
+            self._init_events(self._files[file_name])
+
+    def _events_to_files(self, events: List[LoggedEventSpec], replay: bool = False):
+        raw_events = []
         for event in events:
-            file_name = "{}.{}".format(event.kind, event.name)
-            if file_name in self._files:
-                self._files[file_name].events.append(event.event)
-            else:
-                self._files[file_name] = LoggedEventListSpec(
-                    kind=event.kind, name=event.name, events=[event.event]
+            downsampler = self._get_downsampler(event.kind, event.name)
+            if downsampler is None:
+                self._add_event_to_file(event.kind, event.name, event.event)
+                continue
+            if downsampler.keep_raw and not isinstance(event, PendingPointSpec):
+                raw_events.append(event)
+            points = (
+                event.iter_metrics()
+                if isinstance(event, LoggedMetricArraySpec)
+                else [event.event]
+            )
+            for point in points:
+                for e in downsampler.add(point):
+                    self._add_event_to_file(event.kind, event.name, e)
+        if raw_events:
+            raw_writer = self._get_raw_writer()
+            if replay:
+                # The raw points are flushed before the downsampled points
+                raw_events = raw_writer._skip_persisted_events(raw_events)
+            raw_writer.write(raw_events)
+
+    def _drain_downsamplers(self):
+        for name, downsampler in self._downsamplers.items():
+            if downsampler is None:
+                continue
+            for e in downsampler.drain():
+                self._add_event_to_file(V1ArtifactKind.METRIC.value, name, e)
+
+    def _get_persisted_row(self, kind: str, name: str) -> Optional[Tuple[int, int]]:
+        """Returns the step and the epoch-ns timestamp of a series' last written row."""
+        import pandas as pd
+
+        event_path = self._get_event_path(kind=kind, name=name)
+        paths = segments.get_segments_paths(event_path)
+        if os.path.exists(event_path):
+            paths.append(event_path)
+        for path in reversed(paths):
+            df = V1Events.read_segment(path)
+            if df.empty:
+                continue
+            step = df.step.iloc[-1]
+            timestamp = df.timestamp.iloc[-1]
+            return (
+                BINARY_NULL if pd.isna(step) else int(step),
+                BINARY_NULL if pd.isna(timestamp) else pd.Timestamp(timestamp).value,
+            )
+        return None
+
+    def _skip_persisted_events(self, events: List) -> List:
+        """Drops the logged events of each series up to its last written row.
+
+        A process stopped during a flush, before the log is truncated,
+        leaves the flushed events in both the event files and the log.
+        """
+        import numpy as np
+
+        series = OrderedDict()
+        for e in events:
+            series.setdefault((get_enum_value(e.kind), e.name), []).append(e.event)
+        skipped = {}
+        for (kind, name), series_events in series.items():
+            row = self._get_persisted_row(kind, name)
+            if row is None:
+                continue
+            steps, timestamps, _ = self._get_events_columns(
+                kind, series_events, self._is_binary(kind)
+            )
+            matches = np.flatnonzero((steps == row[0]) & (timestamps == row[1]))
+            if len(matches):
+                skipped[(kind, name)] = int(matches[-1]) + 1
+        if not skipped:
+            return events
+
+        results = []
+        for e in events:
+            key = (get_enum_value(e.kind), e.name)
+            rows = skipped.get(key)
+            if not rows:
+                results.append(e)
+                continue
+            size = e.size if isinstance(e, LoggedMetricArraySpec) else 1
+            skipped[key] = max(0, rows - size)
+            if size > rows:
+                # Only the tail of a block of metrics was not written
+                results.append(
+                    LoggedMetricArraySpec(
+                        e.name,
+                        e.steps[rows:] if e.steps is not None else None,
+                        e.timestamps[rows:],
+                        e.values[rows:],
+                    )
                 )
-                self._init_events(self._files[file_name])
+        return results
 
-    def write(self, events: List[LoggedEventSpec]):
+    def _get_pending_points(self) -> List[PendingPointSpec]:
+        return [
+            PendingPointSpec(name=name, kind=V1ArtifactKind.METRIC.value, event=e)
+            for name, downsampler in self._downsamplers.items()
+            if downsampler is not None
+            for e in downsampler.pending()
+        ]
+
+    def _replay_wal(self):
+        events = self._skip_persisted_events(WriteAheadLog.read(self._wal.path))
+        with self._lock:
+            if events:
+                self._events_to_files(events, replay=True)
+            # The replayed events are written and the log is truncated
+            self.flush()
+
+    def write(self, events: List[Union[LoggedEventSpec, LoggedMetricSpec]]):
         if not events:
             return
-        if isinstance(events, LoggedEventSpec):
+        if isinstance(
+            events, (LoggedEventSpec, LoggedMetricSpec, LoggedMetricArraySpec)
+        ):
             events = [events]
-        self._events_to_files(events)
+        with self._lock:
+            if self._wal is not None:
+                self._wal.append(events)
+            self._events_to_files(events)
 
     def flush(self):
-        for file_name in self._files:
-            events_spec = self._files[file_name]
-            if events_spec.events:
-                self._append_events(events_spec)
-            self._files[file_name].empty_events()
+        with self._lock:
+            start = time.perf_counter()
+            self._flush_events = 0
+            self._flush_bytes = 0
+            for file_name in self._files:
+                events_spec = self._files[file_name]
+                if events_spec.events:
+                    self._append_events(events_spec)
+                self._files[file_name].empty_events()
+            self._buffered_rows = 0
+            self._buffered_bytes = 0
+            self._live_since = None
+            self._flush_handles()
+            self._write_summaries()
+            if self._raw_writer is not None:
+                self._raw_writer.flush()
+            if self._wal is not None:
+                self._wal.truncate()
+                # The downsampled points are not written until their bucket
+                # or window is complete, their raw points are kept in the log
+                self._wal.append(self._get_pending_points())
+            if self._flush_events:
+                self._flush_latency.observe(time.perf_counter() - start)
+                self._flush_stats["count"] += 1
+                self._flush_stats["last_events"] = self._flush_events
+                self._flush_stats["last_bytes"] = self._flush_bytes
+                self._flush_stats["events"] += self._flush_events
+                self._flush_stats["bytes"] += self._flush_bytes
 
     def close(self):
-        self.flush()
-        self._closed = True
+        with self._lock:
+            self._drain_downsamplers()
+            self.flush()
+            if self._rotates:
+                self._seal_segments()
+            for event_path in list(self._indexes):
+                self._close_index(event_path)
+            self._close_handles()
+            # The sealed segments change the files covered by the summaries
+            self._dirty_summaries.update(self._summaries)
+            self._write_summaries()
+            if self._raw_writer is not None:
+                self._raw_writer.close()
+            if self._wal is not None:
+                self._wal.close(remove=True)
+            self._closed = True
 
     @property
     def closed(self):
         return self._closed
 
+    def get_handles_stats(self) -> Dict:
+        requests = self._handles_hits + self._handles_misses
+        return {
+            "open": len(self._handles),
+            "max_open": self._max_open_files,
+            "hits": self._handles_hits,
+            "misses": self._handles_misses,
+            "evictions": self._handles_evictions,
+            "hit_rate": self._handles_hits / requests if requests else None,
+        }
+
+    def get_flush_stats(self) -> Dict:
+        """Returns the flushes' latency histogram, and the events and bytes written."""
+        with self._lock:
+            return dict(self._flush_stats, latency=self._flush_latency.to_dict())
+
+    def get_wal_stats(self) -> Optional[Dict]:
+        return self._wal.get_stats() if self._wal is not None else None
+
 
 class BaseFileWriter:
     """Writes `LoggedEventSpec` to event files.
@@ -127,6 +840,14 @@ class BaseFileWriter:
                 raise TypeError("Expected an LoggedEventSpec, " " but got %s" % type(e))
         self._async_writer.write(events)
 
+    def add_metrics(self, metrics: List[LoggedMetricSpec]):
+        """Enqueues metric records as a single batch.
+
+        Unlike `add_events`, the records are not type-checked one by one,
+        this is the hot path used by `log_metric` and `log_metrics`.
+        """
+        self._async_writer.write(metrics)
+
     def flush(self):
         """Flushes the event files to disk.
 
@@ -142,3 +863,8 @@ class BaseFileWriter:
         Call this method when you do not need the writer anymore.
         """
         self._async_writer.close()
+
+    def get_stats(self) -> Dict:
+        """Returns the writer's statistics, e.g. the queue's high-water mark,
+        the flushes' latency histogram, or the file handles pool hit rate."""
+        return self._async_writer.get_stats()
@@ -0,0 +1,290 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import fnmatch
+
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import Dict, List, Mapping, Optional
+
+from clipped.utils.enums import PEnum, get_enum_value
+
+from traceml.events import LoggedMetricSpec
+from traceml.events.binary import BINARY_NULL, to_epoch_ns
+
+
+class DownsamplingKind(str, PEnum):
+    EVERY_N = "every_n"
+    TIME_BUCKET = "time_bucket"
+    LTTB = "lttb"
+
+
+class BucketAggregation(str, PEnum):
+    MIN = "min"
+    MAX = "max"
+    MEAN = "mean"
+    LAST = "last"
+
+
+class PendingPointSpec(namedtuple("PendingPointSpec", "name kind event")):
+    """A raw point held by a downsampler, logged again once the write-ahead log
+    is truncated, its raw point was already written with `keep_raw`."""
+
+    pass
+
+
+class BaseDownsampler(ABC):
+    """Reduces the points of a single metric series before they are written.
+
+    `add` returns the points to write for an incoming point,
+    `drain` returns the points still held by the downsampler, e.g. on close,
+    and `pending` the raw points they are computed from, kept with `track_pending`.
+    """
+
+    def __init__(self, name: str, keep_raw: bool = False):
+        self.name = name
+        self.keep_raw = keep_raw
+        self.track_pending = False
+
+    @abstractmethod
+    def add(self, event) -> List:
+        pass
+
+    def drain(self) -> List:
+        return []
+
+    def pending(self) -> List:
+        return []
+
+    def _make_point(self, event, metric: Optional[float] = None) -> LoggedMetricSpec:
+        return LoggedMetricSpec(
+            self.name,
+            event.step,
+            event.timestamp,
+            event.metric if metric is None else metric,
+        )
+
+
+class EveryNDownsampler(BaseDownsampler):
+    """Keeps the first point and then every Nth point."""
+
+    def __init__(self, name: str, n: int, keep_raw: bool = False):
+        super().__init__(name=name, keep_raw=keep_raw)
+        if n < 1:
+            raise ValueError("Downsampling `every_n` requires n >= 1.")
+        self.n = n
+        self._count = 0
+
+    def add(self, event) -> List:
+        keep = self._count % self.n == 0
+        self._count += 1
+        return [event] if keep else []
+
+
+class TimeBucketDownsampler(BaseDownsampler):
+    """Aggregates the points falling in the same time bucket of `secs` seconds.
+
+    A bucket is written once a point of a later bucket is received,
+    `min` and `max` keep the step and the timestamp of the selected point,
+    `mean` and `last` use the step and the timestamp of the bucket's last point.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        secs: float,
+        agg: str = BucketAggregation.MEAN,
+        keep_raw: bool = False,
+    ):
+        super().__init__(name=name, keep_raw=keep_raw)
+        if secs <= 0:
+            raise ValueError("Downsampling `time_bucket` requires secs > 0.")
+        if get_enum_value(agg) not in BucketAggregation.to_set():
+            raise ValueError("Unrecognized bucket aggregation {}".format(agg))
+        self.bucket_ns = int(secs * 1_000_000_000)
+        self.agg = BucketAggregation(agg)
+        self._bucket = None
+        self._selected = None
+        self._last = None
+        self._sum = 0.0
+        self._count = 0
+        self._pending = []
+
+    def _get_bucket_point(self):
+        if self.agg == BucketAggregation.MEAN:
+            return self._make_point(self._last, metric=self._sum / self._count)
+        if self.agg == BucketAggregation.LAST:
+            return self._make_point(self._last)
+        return self._make_point(self._selected)
+
+    def _reset(self, bucket: Optional[int]):
+        self._bucket = bucket
+        self._selected = None
+        self._last = None
+        self._sum = 0.0
+        self._count = 0
+        self._pending = []
+
+    def add(self, event) -> List:
+        timestamp = to_epoch_ns(event.timestamp)
+        bucket = None if timestamp == BINARY_NULL else timestamp // self.bucket_ns
+        results = []
+        if self._count and bucket != self._bucket:
+            results.append(self._get_bucket_point())
+            self._reset(bucket)
+        self._bucket = bucket
+        if (
+            self._selected is None
+            or (
+                self.agg == BucketAggregation.MIN
+                and event.metric < self._selected.metric
+            )
+            or (
+                self.agg == BucketAggregation.MAX
+                and event.metric > self._selected.metric
+            )
+        ):
+            self._selected = event
+        self._last = event
+        self._sum += event.metric
+        self._count += 1
+        if self.track_pending:
+            self._pending.append(event)
+        return results
+
+    def drain(self) -> List:
+        if not self._count:
+            return []
+        results = [self._get_bucket_point()]
+        self._reset(None)
+        return results
+
+    def pending(self) -> List:
+        return list(self._pending)
+
+
+def lttb(points: List, threshold: int, get_x, get_y) -> List:
+    """Largest-Triangle-Three-Buckets selection of `threshold` points."""
+    size = len(points)
+    if threshold >= size or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    every = (size - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average point of the next bucket
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, size)
+        avg_range = avg_end - avg_start
+        avg_x = sum(get_x(points[j]) for j in range(avg_start, avg_end)) / avg_range
+        avg_y = sum(get_y(points[j]) for j in range(avg_start, avg_end)) / avg_range
+
+        # Point of the current bucket forming the largest triangle
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        point_ax = get_x(points[a])
+        point_ay = get_y(points[a])
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs(
+                (point_ax - avg_x) * (get_y(points[j]) - point_ay)
+                - (point_ax - get_x(points[j])) * (avg_y - point_ay)
+            )
+            if area > max_area:
+                max_area = area
+                next_a = j
+        sampled.append(points[next_a])
+        a = next_a
+
+    sampled.append(points[-1])
+    return sampled
+
+
+class LTTBDownsampler(BaseDownsampler):
+    """Applies LTTB on a rolling window of `window` points keeping `points` points.
+
+    The x axis is the step, or the timestamp for points logged without a step.
+    """
+
+    def __init__(self, name: str, window: int, points: int, keep_raw: bool = False):
+        super().__init__(name=name, keep_raw=keep_raw)
+        if points < 3 or window <= points:
+            raise ValueError("Downsampling `lttb` requires 3 <= points < window.")
+        self.window = window
+        self.points = points
+        self._buffer = []
+
+    @staticmethod
+    def _get_x(event) -> float:
+        if event.step is not None:
+            return event.step
+        return to_epoch_ns(event.timestamp)
+
+    @staticmethod
+    def _get_y(event) -> float:
+        return event.metric
+
+    def _sample(self) -> List:
+        results = lttb(self._buffer, self.points, self._get_x, self._get_y)
+        self._buffer = []
+        return results
+
+    def add(self, event) -> List:
+        self._buffer.append(event)
+        if len(self._buffer) >= self.window:
+            return self._sample()
+        return []
+
+    def drain(self) -> List:
+        return self._sample() if self._buffer else []
+
+    def pending(self) -> List:
+        return list(self._buffer)
+
+
+def get_downsampler(name: str, config: Mapping) -> BaseDownsampler:
+    config = dict(config)
+    kind = get_enum_value(config.pop("kind", None))
+    if kind == DownsamplingKind.EVERY_N:
+        return EveryNDownsampler(name=name, **config)
+    if kind == DownsamplingKind.TIME_BUCKET:
+        return TimeBucketDownsampler(name=name, **config)
+    if kind == DownsamplingKind.LTTB:
+        return LTTBDownsampler(name=name, **config)
+    raise ValueError("Unrecognized downsampling kind {}".format(kind))
+
+
+def validate_downsampling(downsampling: Optional[Mapping[str, Mapping]]):
+    for pattern, config in (downsampling or {}).items():
+        get_downsampler(pattern, config)
+
+
+def match_downsampling(
+    downsampling: Optional[Mapping[str, Mapping]], name: str
+) -> Optional[Dict]:
+    """Returns the configuration of the first pattern matching the series' name.
+
+    Exact names take precedence over glob patterns.
+    """
+    if not downsampling:
+        return None
+    if name in downsampling:
+        return downsampling[name]
+    for pattern, config in downsampling.items():
+        if fnmatch.fnmatchcase(name, pattern):
+            return config
+    return None
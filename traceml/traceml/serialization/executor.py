@@ -0,0 +1,275 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import queue
+import threading
+import time
+
+from typing import Callable, List, Optional, Set
+
+from traceml.logger import logger
+from traceml.processors.gpu_processor import can_log_gpu_resources, get_gpu_metrics
+from traceml.processors.psutil_processor import (
+    can_log_psutil_resources,
+    get_psutils_metrics,
+)
+from traceml.serialization.scheduling import FlushScheduler
+
+DEFAULT_WORKERS = 2
+MAX_TICK_SECS = 1
+
+
+def get_resources_metrics(
+    log_psutil: bool = True,
+    log_gpu: bool = True,
+    collectors: Optional[List[Callable[[], List]]] = None,
+) -> List:
+    """Samples the cpu, memory, and gpu resources, a failing collector is logged and skipped.
+
+    Args:
+        log_psutil: bool, to sample the host's cpu, memory, and load.
+        log_gpu: bool, to sample the gpus.
+        collectors: List[Callable], optional, additional collectors
+            returning metrics events, e.g. `ProcessTreeCollector.get_metrics`.
+    """
+    data = []
+    if log_psutil:
+        try:
+            data += get_psutils_metrics()
+        except Exception:
+            logger.warning("Failed to collect the psutil resources", exc_info=True)
+    if log_gpu:
+        try:
+            data += get_gpu_metrics()
+        except Exception:
+            logger.warning("Failed to collect the gpu resources", exc_info=True)
+    for collector in collectors or []:
+        try:
+            data += collector()
+        except Exception:
+            logger.warning(
+                "Failed to collect the resources of %s", collector, exc_info=True
+            )
+    return data
+
+
+class SharedWriter:
+    """Processes the queue of an async manager on the shared executor.
+
+    It replaces the manager's own writer thread: the queued batches are written
+    by the executor's workers when notified, and the writer is flushed when
+    its scheduler is due after writing the events returned by `get_flush_events`.
+    The failures are logged and counted in `errors`.
+    """
+
+    def __init__(
+        self,
+        executor: "SharedExecutor",
+        event_queue,
+        event_writer,
+        flush_secs: int,
+        get_flush_events: Optional[Callable[[], List]] = None,
+        scheduler: Optional[FlushScheduler] = None,
+    ):
+        self._executor = executor
+        self._event_queue = event_queue
+        self._event_writer = event_writer
+        self._get_flush_events = get_flush_events
+        self._scheduler = scheduler or FlushScheduler(flush_secs)
+        self._has_pending_data = False
+        self._process_lock = threading.Lock()
+        self._scheduled = threading.Event()
+        self._stopped = False
+        self.errors = 0
+        self._executor.register(self)
+
+    @property
+    def tick_secs(self) -> float:
+        return self._scheduler.tick_secs
+
+    def is_flush_due(self, now: float) -> bool:
+        return self._scheduler.should_flush(now, self._event_writer)
+
+    def notify(self):
+        """Schedules the processing of the queue, once until it's processed."""
+        if not self._scheduled.is_set():
+            self._scheduled.set()
+            self._executor.submit(self)
+
+    def _write_queued(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._event_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            events = []
+            for data in batch:
+                events += data if isinstance(data, list) else [data]
+            if events:
+                self._event_writer.write(events)
+                self._has_pending_data = True
+                self._scheduler.on_data(time.time())
+        finally:
+            for _ in batch:
+                self._event_queue.task_done()
+
+    def process(self):
+        with self._process_lock:
+            self._scheduled.clear()
+            if self._stopped:
+                return
+            self._write_queued()
+            now = time.time()
+            if self.is_flush_due(now):
+                if self._get_flush_events:
+                    flush_events = self._get_flush_events()
+                    if flush_events:
+                        self._event_writer.write(flush_events)
+                        self._has_pending_data = True
+                has_data = self._has_pending_data
+                if has_data:
+                    self._event_writer.flush()
+                    self._has_pending_data = False
+                self._scheduler.on_flush(now, has_data)
+
+    def stop(self):
+        """Writes the queued batches and detaches the writer from the executor."""
+        with self._process_lock:
+            self._write_queued()
+            self._stopped = True
+        self._executor.unregister(self)
+
+
+class SharedExecutor:
+    """Process-wide pool multiplexing the async writers of all runs.
+
+    A fixed number of worker threads write the queued events of all the
+    registered writers, a ticker thread schedules their periodic flushes,
+    and a single resources sampler serves the readings to all resource writers.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        self._tasks = queue.Queue()
+        self._writers = set()  # type: Set[SharedWriter]
+        self._lock = threading.Lock()
+        self._shutdown = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._work, daemon=True) for _ in range(workers)
+        ]
+        self._threads.append(threading.Thread(target=self._tick, daemon=True))
+        self._log_psutil_resources = can_log_psutil_resources()
+        self._log_gpu_resources = can_log_gpu_resources()
+        self._resources = None  # type: Optional[List]
+        self._resources_time = 0
+        self._resources_lock = threading.Lock()
+        self._resources_samples = 0
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._shutdown.set()
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    @property
+    def num_threads(self) -> int:
+        return len(self._threads)
+
+    @property
+    def num_writers(self) -> int:
+        return len(self._writers)
+
+    def register(self, writer: SharedWriter):
+        with self._lock:
+            self._writers.add(writer)
+
+    def unregister(self, writer: SharedWriter):
+        with self._lock:
+            self._writers.discard(writer)
+
+    def submit(self, writer: SharedWriter):
+        self._tasks.put(writer)
+
+    def _work(self):
+        while True:
+            writer = self._tasks.get()
+            if writer is None:
+                return
+            try:
+                writer.process()
+            except Exception:
+                writer.errors += 1
+                logger.warning("Failed to write the queued events", exc_info=True)
+
+    def _tick(self):
+        while not self._shutdown.is_set():
+            with self._lock:
+                writers = list(self._writers)
+            now = time.time()
+            for writer in writers:
+                if writer.is_flush_due(now):
+                    writer.notify()
+            tick = min([w.tick_secs for w in writers] + [MAX_TICK_SECS])
+            self._shutdown.wait(max(tick, 0.01))
+
+    def get_resources_metrics(self, max_age: float) -> List:
+        """Returns the latest resources readings, sampled at most once per `max_age`."""
+        with self._resources_lock:
+            now = time.time()
+            if self._resources is None or now - self._resources_time >= max_age:
+                self._resources = get_resources_metrics(
+                    log_psutil=self._log_psutil_resources,
+                    log_gpu=self._log_gpu_resources,
+                )
+                self._resources_time = now
+                self._resources_samples += 1
+            return list(self._resources)
+
+
+_SHARED_EXECUTOR = None  # type: Optional[SharedExecutor]
+_SHARED_EXECUTOR_REFS = 0
+_SHARED_EXECUTOR_LOCK = threading.Lock()
+
+
+def acquire_shared_executor() -> SharedExecutor:
+    """Returns the process-wide executor, it's started by the first reference."""
+    global _SHARED_EXECUTOR, _SHARED_EXECUTOR_REFS
+
+    with _SHARED_EXECUTOR_LOCK:
+        if _SHARED_EXECUTOR is None:
+            _SHARED_EXECUTOR = SharedExecutor()
+            _SHARED_EXECUTOR.start()
+        _SHARED_EXECUTOR_REFS += 1
+        return _SHARED_EXECUTOR
+
+
+def release_shared_executor():
+    """Releases a reference, the executor is stopped with its last reference."""
+    global _SHARED_EXECUTOR, _SHARED_EXECUTOR_REFS
+
+    with _SHARED_EXECUTOR_LOCK:
+        if _SHARED_EXECUTOR is None:
+            return
+        _SHARED_EXECUTOR_REFS -= 1
+        if _SHARED_EXECUTOR_REFS <= 0:
+            _SHARED_EXECUTOR.stop()
+            _SHARED_EXECUTOR = None
+            _SHARED_EXECUTOR_REFS = 0
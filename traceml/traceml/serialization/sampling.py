@@ -0,0 +1,156 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import math
+import time
+
+from typing import Callable, Dict, List, Optional
+
+from clipped.utils.enums import PEnum
+
+from traceml.processors.events_processors import metrics_dict_to_list
+
+# Upper bound of the samples kept per metric in a window
+MAX_WINDOW_SIZE = 10000
+
+
+class WindowAggregation(str, PEnum):
+    MIN = "min"
+    MAX = "max"
+    MEAN = "mean"
+    P95 = "p95"
+
+
+class RingBuffer:
+    """Fixed size buffer of the latest samples of a metric."""
+
+    def __init__(self, size: int):
+        import numpy as np
+
+        if size < 1:
+            raise ValueError("A ring buffer requires a size >= 1.")
+        self._values = np.empty(size, dtype=np.float64)
+        self._position = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, len(self._values))
+
+    def append(self, value: float):
+        self._values[self._position] = value
+        self._position = (self._position + 1) % len(self._values)
+        self._count += 1
+
+    def values(self):
+        """Returns the samples in the order they were appended."""
+        import numpy as np
+
+        if self._count < len(self._values):
+            return self._values[: self._count].copy()
+        return np.roll(self._values, -self._position)
+
+    def clear(self):
+        self._position = 0
+        self._count = 0
+
+
+class ResourceSampler:
+    """Samples the resources more often than they are written.
+
+    Each metric's samples are kept in a ring buffer until the next flush,
+    the window is then written as the metric's mean, e.g. `cpu`, along with
+    its `{name}_min`, `{name}_max`, and `{name}_p95` aggregates.
+
+    Args:
+        sample_secs: float, how often, in seconds, to sample the resources.
+        flush_secs: float, how often, in seconds, the windows are written,
+            used to size the ring buffers.
+        collect: callable returning the sampled metrics events,
+            e.g. `get_resources_metrics`.
+        deadband: float, optional, a metric is not written when all its aggregates
+            are within `deadband` of the last written window.
+    """
+
+    def __init__(
+        self,
+        sample_secs: float,
+        flush_secs: float,
+        collect: Callable[[], List],
+        deadband: Optional[float] = None,
+    ):
+        if sample_secs <= 0:
+            raise ValueError(
+                "Resources sampling requires `sample_secs` > 0, "
+                "received {}.".format(sample_secs)
+            )
+        if deadband is not None and deadband < 0:
+            raise ValueError(
+                "Resources sampling requires `deadband` >= 0, "
+                "received {}.".format(deadband)
+            )
+        self.sample_secs = sample_secs
+        self.deadband = deadband
+        self.window_size = min(
+            MAX_WINDOW_SIZE, max(1, math.ceil(flush_secs / sample_secs)) + 1
+        )
+        self._collect = collect
+        self._buffers = {}  # type: Dict[str, RingBuffer]
+        self._last_window = {}  # type: Dict[str, List[float]]
+        self.next_sample_time = 0
+
+    def sample(self, now: Optional[float] = None):
+        """Appends a reading of the resources to the current window."""
+        for event in self._collect():
+            metric = event.event.metric
+            if metric is None:
+                continue
+            buffer = self._buffers.get(event.name)
+            if buffer is None:
+                buffer = RingBuffer(self.window_size)
+                self._buffers[event.name] = buffer
+            buffer.append(metric)
+        now = time.time() if now is None else now
+        self.next_sample_time = now + self.sample_secs
+
+    def _is_within_deadband(self, name: str, window: List[float]) -> bool:
+        last_window = self._last_window.get(name)
+        if self.deadband is None or last_window is None:
+            return False
+        return all(abs(v - w) <= self.deadband for v, w in zip(window, last_window))
+
+    def get_window_metrics(self) -> List:
+        """Returns the aggregates of the current window and starts a new window."""
+        import numpy as np
+
+        metrics = {}
+        for name, buffer in self._buffers.items():
+            if not len(buffer):
+                continue
+            values = buffer.values()
+            buffer.clear()
+            window = [
+                float(values.mean()),
+                float(values.min()),
+                float(values.max()),
+                float(np.percentile(values, 95)),
+            ]
+            if self._is_within_deadband(name, window):
+                continue
+            self._last_window[name] = window
+            metrics[name] = window[0]
+            metrics["{}_{}".format(name, WindowAggregation.MIN.value)] = window[1]
+            metrics["{}_{}".format(name, WindowAggregation.MAX.value)] = window[2]
+            metrics["{}_{}".format(name, WindowAggregation.P95.value)] = window[3]
+        return metrics_dict_to_list(metrics)
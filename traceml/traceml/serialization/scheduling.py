@@ -0,0 +1,128 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import fnmatch
+
+from typing import Dict, List, Mapping, Optional, Tuple
+
+FLUSH_POLICY_KEYS = {"max_rows", "max_bytes", "live", "live_secs", "max_idle_secs"}
+
+
+def parse_flush_policy(flush_policy: Optional[Mapping]) -> Tuple[Optional[list], Dict]:
+    """Splits a flush policy in the live series' patterns and the scheduler's options.
+
+    e.g. `{"max_rows": 10000, "max_bytes": 8388608, "live": ["loss"], "live_secs": 1}`
+    """
+    flush_policy = dict(flush_policy or {})
+    unknown = set(flush_policy.keys()) - FLUSH_POLICY_KEYS
+    if unknown:
+        raise ValueError(
+            "Received unrecognized flush policy options: {}".format(sorted(unknown))
+        )
+    live = flush_policy.pop("live", None)
+    if live and not flush_policy.get("live_secs"):
+        raise ValueError("A flush policy with live series requires `live_secs`.")
+    return live, {
+        "max_buffered_rows": flush_policy.get("max_rows"),
+        "max_buffered_bytes": flush_policy.get("max_bytes"),
+        "live_flush_secs": flush_policy.get("live_secs"),
+        "max_idle_secs": flush_policy.get("max_idle_secs"),
+    }
+
+
+def is_live_series(live_series: List[str], name: str) -> bool:
+    """Checks if a series is marked as live by name or glob pattern."""
+    return any(
+        name == pattern or fnmatch.fnmatchcase(name, pattern) for pattern in live_series
+    )
+
+
+class FlushScheduler:
+    """Decides when an async writer flushes its buffered events.
+
+    By default, the writer is flushed every `flush_secs`. The scheduler can also:
+     * flush early once the buffered rows or bytes reach `max_buffered_rows`
+       or `max_buffered_bytes`, which bounds the memory used by bursts.
+     * flush the events of live series at most `live_flush_secs` after they are logged.
+     * back off when idle, the flush interval doubles up to `max_idle_secs`
+       while there is nothing to flush and is reset by new data.
+    """
+
+    def __init__(
+        self,
+        flush_secs: float,
+        max_buffered_rows: Optional[int] = None,
+        max_buffered_bytes: Optional[int] = None,
+        live_flush_secs: Optional[float] = None,
+        max_idle_secs: Optional[float] = None,
+    ):
+        self.flush_secs = flush_secs
+        self.max_buffered_rows = max_buffered_rows
+        self.max_buffered_bytes = max_buffered_bytes
+        self.live_flush_secs = live_flush_secs
+        self.max_idle_secs = max_idle_secs
+        self._interval = flush_secs
+        # The first data will be flushed immediately.
+        self._next_flush_time = 0
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def tick_secs(self) -> float:
+        """Longest delay between two checks that keeps the latency guarantees."""
+        if self.live_flush_secs:
+            return min(self.flush_secs, self.live_flush_secs)
+        return self.flush_secs
+
+    def get_deadline(self, event_writer) -> float:
+        deadline = self._next_flush_time
+        live_since = event_writer.live_since
+        if self.live_flush_secs and live_since is not None:
+            deadline = min(deadline, live_since + self.live_flush_secs)
+        return deadline
+
+    def get_wait(self, now: float, event_writer) -> float:
+        return self.get_deadline(event_writer) - now
+
+    def is_over_threshold(self, event_writer) -> bool:
+        return bool(
+            (
+                self.max_buffered_rows
+                and event_writer.buffered_rows >= self.max_buffered_rows
+            )
+            or (
+                self.max_buffered_bytes
+                and event_writer.buffered_bytes >= self.max_buffered_bytes
+            )
+        )
+
+    def should_flush(self, now: float, event_writer) -> bool:
+        return now > self.get_deadline(event_writer) or self.is_over_threshold(
+            event_writer
+        )
+
+    def on_data(self, now: float):
+        if self._interval > self.flush_secs:
+            self._interval = self.flush_secs
+            self._next_flush_time = min(self._next_flush_time, now + self.flush_secs)
+
+    def on_flush(self, now: float, has_data: bool):
+        if has_data or not self.max_idle_secs:
+            self._interval = self.flush_secs
+        else:
+            self._interval = min(self._interval * 2, self.max_idle_secs)
+        self._next_flush_time = now + self._interval
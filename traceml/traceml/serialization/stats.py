@@ -0,0 +1,82 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import bisect
+import threading
+
+from typing import Dict, Optional, Sequence
+
+# Upper bounds in seconds of the latency buckets, the last bucket is unbounded.
+LATENCY_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class LatencyHistogram:
+    """Fixed buckets histogram of durations in seconds."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self._buckets = tuple(buckets)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self._buckets, value)] += 1
+            self._count += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            buckets = {str(b): c for b, c in zip(self._buckets, self._counts)}
+            buckets["inf"] = self._counts[-1]
+            return {
+                "count": self._count,
+                "sum": self._sum,
+                "mean": self._sum / self._count if self._count else None,
+                "max": self._max,
+                "buckets": buckets,
+            }
+
+
+def get_writer_metrics(stats: Dict[str, Optional[Dict]]) -> Dict[str, float]:
+    """Flattens the writers' statistics to system metrics, e.g. `writer_events_queue_hwm`."""
+    metrics = {}
+    for writer, writer_stats in stats.items():
+        if not writer_stats:
+            continue
+        prefix = "writer_{}".format(writer)
+        queue_stats = writer_stats["queue"]
+        flush_stats = writer_stats["flush"]
+        values = {
+            "queue_size": queue_stats["size"],
+            "queue_hwm": queue_stats["hwm"],
+            "queue_dropped": queue_stats["dropped"],
+            "put_blocking_secs": queue_stats["put"]["sum"],
+            "put_blocking_max_secs": queue_stats["put"]["max"],
+            "flush_count": flush_stats["count"],
+            "flush_latency_mean_secs": flush_stats["latency"]["mean"],
+            "flush_latency_max_secs": flush_stats["latency"]["max"],
+            "flush_events": flush_stats["last_events"],
+            "flush_bytes": flush_stats["last_bytes"],
+            "open_files": writer_stats["handles"]["open"],
+            "errors": writer_stats.get("errors"),
+        }
+        for k, v in values.items():
+            if v is not None:
+                metrics["{}_{}".format(prefix, k)] = v
+    return metrics
@@ -0,0 +1,110 @@
+#!/usr/bin/python
+#
+# Copyright 2018-2023 Polyaxon, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import pickle
+import struct
+import zlib
+
+from typing import Dict, List, Optional
+
+from clipped.utils.paths import check_or_create_path
+
+from traceml.events import get_event_path, get_shard_name, segments
+
+# A record is a pickled batch of events prefixed with its length and crc32,
+# a partially written or a corrupted record ends the log.
+_RECORD_HEADER = struct.Struct("<II")
+
+
+def get_wal_path(run_path: str, rank: Optional[int] = None) -> str:
+    return os.path.join(
+        get_event_path(run_path), "{}.wal".format(get_shard_name("events", rank))
+    )
+
+
+class WriteAheadLog:
+    """Append-only log of the events not yet flushed to the event files.
+
+    Each batch is committed with a single write followed by a fsync,
+    the log is truncated once the batches are flushed to the event files.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = None
+        # A log left by a previous process is truncated once it's replayed
+        self._size = os.path.getsize(path) if os.path.exists(path) else 0
+        self._commits = 0
+        self._bytes = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _open(self):
+        if self._file is None:
+            check_or_create_path(self._path, is_dir=False)
+            is_new = not os.path.exists(self._path)
+            self._file = open(self._path, "ab")
+            if is_new:
+                segments.fsync_path(os.path.dirname(self._path))
+
+    def append(self, events: List):
+        if not events:
+            return
+        payload = pickle.dumps(events, protocol=pickle.HIGHEST_PROTOCOL)
+        record = _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        self._open()
+        self._file.write(record)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._size += len(record)
+        self._commits += 1
+        self._bytes += len(record)
+
+    def truncate(self):
+        if self._size:
+            self._open()
+            self._file.truncate(0)
+            self._size = 0
+
+    def close(self, remove: bool = True):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if remove and os.path.exists(self._path):
+            os.remove(self._path)
+
+    def get_stats(self) -> Dict:
+        return {"commits": self._commits, "bytes": self._bytes}
+
+    @staticmethod
+    def read(path: str) -> List:
+        """Returns the events of the committed records of a log."""
+        events = []
+        if not os.path.exists(path):
+            return events
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_RECORD_HEADER.size)
+                if len(header) < _RECORD_HEADER.size:
+                    break
+                size, crc = _RECORD_HEADER.unpack(header)
+                payload = f.read(size)
+                if len(payload) < size or zlib.crc32(payload) != crc:
+                    break
+                events += pickle.loads(payload)
+        return events
@@ -14,26 +14,94 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import pickle
 import queue
+import tempfile
 import threading
 import time
 
-from typing import List, Union
+from typing import Callable, Dict, List, Optional, Union
 
+from clipped.utils.enums import PEnum, get_enum_value
 from clipped.utils.paths import check_or_create_path
 
-from traceml.events import LoggedEventSpec, get_asset_path, get_event_path
+from traceml.artifacts import V1ArtifactKind
+from traceml.events import (
+    LoggedEventSpec,
+    LoggedMetricArraySpec,
+    V1Event,
+    get_asset_path,
+    get_event_path,
+)
+from traceml.events.clock import AnchoredClock, TimestampFormat
 from traceml.events.paths import get_resource_path
-from traceml.processors.gpu_processor import can_log_gpu_resources, get_gpu_metrics
-from traceml.processors.psutil_processor import (
-    can_log_psutil_resources,
-    get_psutils_metrics,
+from traceml.events.segments import SegmentCompression
+from traceml.processors.cgroup_processor import CgroupCollector
+from traceml.processors.events_processors import metrics_dict_to_list
+from traceml.processors.gpu_processor import can_log_gpu_resources
+from traceml.processors.io_processor import (
+    IORatesCollector,
+    can_log_io_resources,
+    get_io_rates_options,
+)
+from traceml.processors.process_processor import (
+    ProcessTreeCollector,
+    can_log_process_resources,
+    get_process_tree_options,
 )
+from traceml.processors.psutil_processor import can_log_psutil_resources
 from traceml.serialization.base import BaseFileWriter, EventWriter
+from traceml.serialization.executor import (
+    SharedWriter,
+    acquire_shared_executor,
+    get_resources_metrics,
+    release_shared_executor,
+)
+from traceml.serialization.sampling import ResourceSampler
+from traceml.serialization.scheduling import FlushScheduler, parse_flush_policy
+from traceml.serialization.stats import LatencyHistogram, get_writer_metrics
+from traceml.serialization.wal import get_wal_path
+
+
+class BackpressurePolicy(str, PEnum):
+    """Behavior of the async writers when the events queue is full.
+
+    * block: the caller waits until the queue has room (default).
+    * drop_oldest: the oldest queued batch is dropped to make room.
+    * coalesce: only the latest metric point per series is kept between flushes,
+      the blocks of metrics and the other kinds are queued as with `block`.
+    * spill: overflowing batches are spilled to a local file and replayed later.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    SPILL = "spill"
 
 
 class EventFileWriter(BaseFileWriter):
-    def __init__(self, run_path: str, max_queue_size: int = 20, flush_secs: int = 10):
+    def __init__(
+        self,
+        run_path: str,
+        max_queue_size: int = 20,
+        flush_secs: int = 10,
+        max_open_files: int = EventWriter.DEFAULT_MAX_OPEN_FILES,
+        events_format: str = EventWriter.CSV_FORMAT,
+        backpressure: str = BackpressurePolicy.BLOCK,
+        spill_path: Optional[str] = None,
+        downsampling: Optional[Dict[str, Dict]] = None,
+        segment_max_bytes: Optional[int] = None,
+        segment_max_rows: Optional[int] = None,
+        segment_compression: str = SegmentCompression.GZIP,
+        rank: Optional[int] = None,
+        wal: bool = False,
+        shared_executor: bool = False,
+        flush_policy: Optional[Dict] = None,
+        timestamp_format: str = TimestampFormat.ISO,
+        index_rows: Optional[int] = None,
+        summaries: bool = False,
+    ):
         """Creates a `EventFileWriter`.
 
         Args:
@@ -41,21 +109,94 @@ class EventFileWriter(BaseFileWriter):
           max_queue_size: Integer. Size of the queue for pending events and summaries.
           flush_secs: Number. How often, in seconds, to flush the
             pending events and summaries to disk.
+          max_open_files: Integer. Maximum number of event files kept open between flushes.
+          events_format: String. `csv` (default) or `binary`, the binary format
+            writes metric series as fixed-width records, other kinds are always csv.
+          backpressure: String. Policy to apply when the queue is full,
+            one of `block` (default), `drop_oldest`, `coalesce`, or `spill`.
+          spill_path: String. Local file used by the `spill` policy,
+            defaults to a temporary file.
+          downsampling: Dict. Downsampling policies of metric series
+            by name or glob pattern, e.g. `{"loss": {"kind": "every_n", "n": 10}}`,
+            supported kinds are `every_n`, `time_bucket`, and `lttb`,
+            `keep_raw: True` writes the raw points to the `events_raw` directory.
+          segment_max_bytes: Integer. Rotates an event file to a sealed segment
+            `{name}.plx.{n}` once it reaches this size.
+          segment_max_rows: Integer. Rotates an event file to a sealed segment
+            once it reaches this number of rows.
+          segment_compression: String. Compression of the sealed segments,
+            `gzip` (default), `zstd`, or `none`.
+          rank: Integer. Rank of the process in a distributed job,
+            the events are written to `{name}.rank{k}.plx` shards.
+          wal: Boolean. To commit the events to a write-ahead log before buffering them,
+            a log left by a killed process is replayed when the writer is created.
+          shared_executor: Boolean. To process the events on the process-wide executor
+            instead of a dedicated thread, e.g. when a process creates many runs.
+          flush_policy: Dict. Adaptive flush scheduling, `max_rows` and `max_bytes`
+            flush early once the buffered events reach the threshold,
+            `max_idle_secs` backs off the flush interval up to this value when idle,
+            and `live` series by name or glob pattern are flushed
+            at most `live_secs` after they are buffered.
+          timestamp_format: String. Format of the csv timestamps, `iso` (default)
+            or `epoch_ns` to write compact integer epoch nanoseconds.
+          index_rows: Integer. Writes a sparse index sidecar `{name}.plx.index`
+            with the steps and timestamps ranges of each block of `index_rows` rows,
+            used to read a steps or time window without parsing the whole file.
+          summaries: Boolean. To keep running summaries of the series, persisted
+            in a `{name}.plx.summary.json` sidecar on each flush.
         """
         super().__init__(run_path=run_path)
 
+        live_series, scheduler_options = parse_flush_policy(flush_policy)
         check_or_create_path(get_event_path(run_path), is_dir=True)
         check_or_create_path(get_asset_path(run_path), is_dir=True)
 
-        self._async_writer = EventAsyncManager(
-            EventWriter(self._run_path, backend=EventWriter.EVENTS_BACKEND),
+        manager_class = (
+            SharedEventAsyncManager if shared_executor else EventAsyncManager
+        )
+        self._async_writer = manager_class(
+            EventWriter(
+                self._run_path,
+                backend=EventWriter.EVENTS_BACKEND,
+                max_open_files=max_open_files,
+                events_format=events_format,
+                downsampling=downsampling,
+                segment_max_bytes=segment_max_bytes,
+                segment_max_rows=segment_max_rows,
+                segment_compression=segment_compression,
+                rank=rank,
+                wal_path=get_wal_path(run_path, rank) if wal else None,
+                live_series=live_series,
+                timestamp_format=timestamp_format,
+                index_rows=index_rows,
+                summaries=summaries,
+            ),
             max_queue_size,
             flush_secs,
+            backpressure=backpressure,
+            spill_path=spill_path,
+            scheduler=FlushScheduler(flush_secs, **scheduler_options),
         )
 
 
 class ResourceFileWriter(BaseFileWriter):
-    def __init__(self, run_path: str, max_queue_size: int = 20, flush_secs: int = 10):
+    def __init__(
+        self,
+        run_path: str,
+        max_queue_size: int = 20,
+        flush_secs: int = 10,
+        max_open_files: int = EventWriter.DEFAULT_MAX_OPEN_FILES,
+        rank: Optional[int] = None,
+        get_writer_stats: Optional[Callable[[], Dict]] = None,
+        shared_executor: bool = False,
+        summaries: bool = False,
+        sample_secs: Optional[float] = None,
+        sample_deadband: Optional[float] = None,
+        process_tree: Optional[Union[bool, Dict]] = None,
+        cgroup: bool = False,
+        io_rates: Optional[Union[bool, Dict]] = None,
+        event_clock: Optional[AnchoredClock] = None,
+    ):
         """Creates a `ResourceFileWriter`.
 
         Args:
@@ -63,22 +204,120 @@ class ResourceFileWriter(BaseFileWriter):
           max_queue_size: Integer. Size of the queue for pending events and summaries.
           flush_secs: Number. How often, in seconds, to flush the
             pending events and summaries to disk.
+          max_open_files: Integer. Maximum number of event files kept open between flushes.
+          rank: Integer. Rank of the process in a distributed job,
+            the resources are written to `{name}.rank{k}.plx` shards.
+          get_writer_stats: A callable returning the writers' statistics by writer,
+            emitted as system metrics, e.g. `writer_events_queue_hwm`, at each flush.
+          shared_executor: Boolean. To process the resources on the process-wide executor,
+            the resources are then sampled once for all the runs of the process.
+          summaries: Boolean. To keep running summaries of the series, persisted
+            in a `{name}.plx.summary.json` sidecar on each flush.
+          sample_secs: Number. How often, in seconds, to sample the resources
+            between flushes, e.g. 0.1, each flush then writes the window's mean
+            and its `{name}_min`, `{name}_max`, and `{name}_p95` aggregates.
+            The resources are sampled once per flush by default.
+          sample_deadband: Number. Skips writing a sampled metric when all its
+            aggregates are within this value of the last written window.
+          process_tree: Boolean or dict. To also write the resources used by the current
+            process and its children, e.g. data loader workers, as `process_{metric}`
+            series for the tree, `process_main_{metric}` for the current process,
+            and `process_child_{slot}_{metric}` for each child, a dict sets
+            the collector's options, i.e. `per_process`, `max_processes`,
+            and `full_memory` to also read the USS and PSS.
+          cgroup: Boolean. To also write the container's resources read from
+            the cgroup v1 or v2 filesystem, e.g. `cgroup_memory_percent`
+            of the container's memory limit, when it's available.
+          io_rates: Boolean or dict. To also write the disk and network throughput,
+            e.g. `disk_read_bytes_per_sec`, `disk_busy_percent`, and
+            `net_rx_bytes_per_sec`, a dict sets the collector's options,
+            i.e. `disks`, `interfaces`, `max_devices`, and `per_device`.
+          event_clock: AnchoredClock. Clock of the run, the resources written
+            by a flush are timestamped with it, defaults to the process clock.
         """
         super().__init__(run_path=run_path)
 
+        if sample_secs and shared_executor:
+            raise ValueError(
+                "Resources sampling with `sample_secs` is not supported "
+                "with the shared executor."
+            )
+        process_tree = get_process_tree_options(process_tree)
+        io_rates = get_io_rates_options(io_rates)
         check_or_create_path(get_resource_path(run_path), is_dir=True)
 
-        self._async_writer = ResourceAsyncManager(
-            EventWriter(self._run_path, backend=EventWriter.RESOURCES_BACKEND),
-            max_queue_size,
-            flush_secs,
+        collectors = []
+        if process_tree is not None and can_log_process_resources():
+            collectors.append(ProcessTreeCollector(**process_tree).get_metrics)
+        if cgroup:
+            cgroup_collector = CgroupCollector()
+            if cgroup_collector.is_available:
+                collectors.append(cgroup_collector.get_metrics)
+        if io_rates is not None and can_log_io_resources():
+            collectors.append(IORatesCollector(**io_rates).get_metrics)
+        event_writer = EventWriter(
+            self._run_path,
+            backend=EventWriter.RESOURCES_BACKEND,
+            max_open_files=max_open_files,
+            rank=rank,
+            summaries=summaries,
         )
+        if shared_executor:
+            self._async_writer = SharedResourceAsyncManager(
+                event_writer,
+                max_queue_size,
+                flush_secs,
+                get_writer_stats=get_writer_stats,
+                collectors=collectors,
+                event_clock=event_clock,
+            )
+        else:
+            self._async_writer = ResourceAsyncManager(
+                event_writer,
+                max_queue_size,
+                flush_secs,
+                get_writer_stats=get_writer_stats,
+                sample_secs=sample_secs,
+                sample_deadband=sample_deadband,
+                collectors=collectors,
+                event_clock=event_clock,
+            )
+
+
+def stamp_events(events: List, event_clock: Optional[AnchoredClock] = None) -> List:
+    """Returns the resources metrics timestamped with the time of the flush."""
+    if event_clock is None or not events:
+        return events
+    timestamp = event_clock.now()
+    return [
+        LoggedEventSpec(
+            name=e.name,
+            kind=e.kind,
+            event=V1Event.make(timestamp=timestamp, metric=e.event.metric),
+        )
+        for e in events
+    ]
+
+
+def get_writer_stats_metrics(get_writer_stats: Optional[Callable[[], Dict]]) -> List:
+    if not get_writer_stats:
+        return []
+    try:
+        return metrics_dict_to_list(get_writer_metrics(get_writer_stats()))
+    except Exception:
+        return []
 
 
 class BaseAsyncManager:
     """Base manager for writing events to files by name by event kind."""
 
-    def __init__(self, event_writer: EventWriter, max_queue_size: int = 20):
+    def __init__(
+        self,
+        event_writer: EventWriter,
+        max_queue_size: int = 20,
+        backpressure: str = BackpressurePolicy.BLOCK,
+        spill_path: Optional[str] = None,
+    ):
         """Writes events json spec to files asynchronously. An instance of this class
         holds a queue to keep the incoming data temporarily. Data passed to the
         `write` function will be put to the queue and the function returns
@@ -90,19 +329,149 @@ class BaseAsyncManager:
             max_queue_size: Integer. Size of the queue for pending bytestrings.
             flush_secs: Number. How often, in seconds, to flush the
                 pending bytestrings to disk.
+            backpressure: String. Policy to apply when the queue is full.
+            spill_path: String. Local file used by the `spill` policy.
         """
+        if get_enum_value(backpressure) not in BackpressurePolicy.to_set():
+            raise ValueError("Unrecognized backpressure policy {}".format(backpressure))
         self._event_writer = event_writer
         self._closed = False
         self._event_queue = queue.Queue(max_queue_size)
         self._lock = threading.Lock()
         self._worker = None
+        self._backpressure = BackpressurePolicy(backpressure)
+        self._coalesced_events = {}  # type: Dict
+        self._spill_path = spill_path
+        self._spill_file = None
+        self._spill_lock = threading.Lock()
+        self._dropped_count = 0
+        self._coalesced_count = 0
+        self._spilled_count = 0
+        self._queue_hwm = 0
+        self._put_latency = LatencyHistogram()
+
+    @staticmethod
+    def _count_events(data: Union[LoggedEventSpec, List[LoggedEventSpec]]) -> int:
+        return len(data) if isinstance(data, list) else 1
+
+    def _put_drop_oldest(self, data):
+        try:
+            self._event_queue.put_nowait(data)
+            return
+        except queue.Full:
+            pass
+        try:
+            dropped = self._event_queue.get_nowait()
+            self._event_queue.task_done()
+            self._dropped_count += self._count_events(dropped)
+        except queue.Empty:
+            pass
+        try:
+            self._event_queue.put_nowait(data)
+        except queue.Full:
+            self._dropped_count += self._count_events(data)
+
+    def _put_block(self, data):
+        start = time.perf_counter()
+        self._event_queue.put(data)
+        self._put_latency.observe(time.perf_counter() - start)
+
+    def _put_coalesce(self, data):
+        # Only the scalar metric points are coalesced,
+        # the blocks of metrics and the other kinds are queued.
+        events = data if isinstance(data, list) else [data]
+        queued = []
+        for event in events:
+            key = (get_enum_value(event.kind), event.name)
+            if key[0] != V1ArtifactKind.METRIC or isinstance(
+                event, LoggedMetricArraySpec
+            ):
+                # The series' pending point is written first
+                pending = self._coalesced_events.pop(key, None)
+                if pending is not None:
+                    queued.append(pending)
+                queued.append(event)
+                continue
+            if key in self._coalesced_events:
+                self._coalesced_count += 1
+            self._coalesced_events[key] = event
+        if queued:
+            self._put_block(queued)
+
+    def _spill(self, data):
+        with self._spill_lock:
+            if self._spill_file is None:
+                if not self._spill_path:
+                    fd, self._spill_path = tempfile.mkstemp(prefix="traceml-spill-")
+                    os.close(fd)
+                self._spill_file = open(self._spill_path, "ab")
+            pickle.dump(data, self._spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._spill_file.flush()
+            self._spilled_count += self._count_events(data)
+
+    def _put_spill(self, data):
+        # Once events are spilled, the next ones are spilled as well
+        # until the spill file is replayed to keep the events ordered.
+        if self._spill_file is None:
+            try:
+                self._event_queue.put_nowait(data)
+                return
+            except queue.Full:
+                pass
+        self._spill(data)
+
+    def _replay_spill(self) -> List:
+        with self._spill_lock:
+            # Batches queued before the spill started must be written first.
+            if self._spill_file is None or self._event_queue.unfinished_tasks:
+                return []
+            self._spill_file.close()
+            self._spill_file = None
+            events = []
+            with open(self._spill_path, "rb") as spill_file:
+                while True:
+                    try:
+                        data = pickle.load(spill_file)
+                    except EOFError:
+                        break
+                    events += data if isinstance(data, list) else [data]
+            # Truncate the spill file
+            open(self._spill_path, "wb").close()
+            return events
+
+    def _remove_spill(self):
+        with self._spill_lock:
+            if self._spill_file is not None:
+                self._spill_file.close()
+                self._spill_file = None
+            if self._spill_path and os.path.exists(self._spill_path):
+                os.remove(self._spill_path)
+
+    def _get_deferred_events(self) -> List:
+        """Returns the events held outside of the queue by the backpressure policy."""
+        if self._backpressure == BackpressurePolicy.COALESCE:
+            with self._lock:
+                events = list(self._coalesced_events.values())
+                self._coalesced_events = {}
+            return events
+        if self._backpressure == BackpressurePolicy.SPILL:
+            return self._replay_spill()
+        return []
 
     def write(self, event: Union[LoggedEventSpec, List[LoggedEventSpec]]):
         """Enqueue the given event to be written asynchronously."""
         with self._lock:
             if self._closed:
                 raise IOError("Writer is closed")
-            self._event_queue.put(event)
+            if self._backpressure == BackpressurePolicy.DROP_OLDEST:
+                self._put_drop_oldest(event)
+            elif self._backpressure == BackpressurePolicy.COALESCE:
+                self._put_coalesce(event)
+            elif self._backpressure == BackpressurePolicy.SPILL:
+                self._put_spill(event)
+            else:
+                self._put_block(event)
+            self._queue_hwm = max(self._queue_hwm, self._event_queue.qsize())
 
     def flush(self):
         """Write all the enqueued events before this flush call to disk.
@@ -113,7 +482,8 @@ class BaseAsyncManager:
             if self._closed:
                 raise IOError("Writer is closed")
             self._event_queue.join()
-            self._event_writer.flush()
+        self._event_writer.write(self._get_deferred_events())
+        self._event_writer.flush()
 
     def close(self):
         """Closes the underlying writer, flushing any pending writes first."""
@@ -122,19 +492,54 @@ class BaseAsyncManager:
                 if not self._closed:
                     self._closed = True
                     self._worker.stop()
-                    self._event_writer.flush()
-                    self._event_writer.close()
+            self._event_writer.write(self._get_deferred_events())
+            self._event_writer.flush()
+            self._event_writer.close()
+            self._remove_spill()
+
+    def get_stats(self) -> Dict:
+        return {
+            "handles": self._event_writer.get_handles_stats(),
+            "queue": {
+                "backpressure": self._backpressure.value,
+                "size": self._event_queue.qsize(),
+                "max_size": self._event_queue.maxsize,
+                "hwm": self._queue_hwm,
+                "put": self._put_latency.to_dict(),
+                "dropped": self._dropped_count,
+                "coalesced": self._coalesced_count,
+                "spilled": self._spilled_count,
+            },
+            "flush": self._event_writer.get_flush_stats(),
+            "wal": self._event_writer.get_wal_stats(),
+            "errors": self._worker.errors if self._worker else 0,
+        }
 
 
 class EventAsyncManager(BaseAsyncManager):
     """Writes events to files by name by event kind."""
 
     def __init__(
-        self, event_writer: EventWriter, max_queue_size: int = 20, flush_secs: int = 10
+        self,
+        event_writer: EventWriter,
+        max_queue_size: int = 20,
+        flush_secs: int = 10,
+        backpressure: str = BackpressurePolicy.BLOCK,
+        spill_path: Optional[str] = None,
+        scheduler: Optional[FlushScheduler] = None,
     ):
-        super().__init__(event_writer=event_writer, max_queue_size=max_queue_size)
+        super().__init__(
+            event_writer=event_writer,
+            max_queue_size=max_queue_size,
+            backpressure=backpressure,
+            spill_path=spill_path,
+        )
         self._worker = EventWriterThread(
-            self._event_queue, self._event_writer, flush_secs
+            self._event_queue,
+            self._event_writer,
+            flush_secs,
+            get_deferred_events=self._get_deferred_events,
+            scheduler=scheduler,
         )
         self._worker.start()
 
@@ -142,7 +547,14 @@ class EventAsyncManager(BaseAsyncManager):
 class EventWriterThread(threading.Thread):
     """Thread that processes asynchronous writes for EventWriter."""
 
-    def __init__(self, event_queue, event_writer: EventWriter, flush_secs: int):
+    def __init__(
+        self,
+        event_queue,
+        event_writer: EventWriter,
+        flush_secs: int,
+        get_deferred_events: Optional[Callable[[], List]] = None,
+        scheduler: Optional[FlushScheduler] = None,
+    ):
         """Creates an EventWriterThread.
 
         Args:
@@ -150,21 +562,38 @@ class EventWriterThread(threading.Thread):
           event_writer: An instance of EventWriter.
           flush_secs: How often, in seconds, to flush the
             pending file to disk.
+          get_deferred_events: A callable returning the events held
+            outside of the queue, e.g. coalesced or spilled events.
+          scheduler: A FlushScheduler, defaults to flushing every `flush_secs`.
         """
         threading.Thread.__init__(self)
         self.daemon = True
         self._event_queue = event_queue
         self._event_writer = event_writer
         self._flush_secs = flush_secs
+        self._get_deferred_events = get_deferred_events
+        self._scheduler = scheduler or FlushScheduler(flush_secs)
         # The first data will be flushed immediately.
         self._next_flush_time = 0
         self._has_pending_data = False
         self._shutdown_signal = object()
+        self.errors = 0
 
     def stop(self):
         self._event_queue.put(self._shutdown_signal)
         self.join()
 
+    def _get_batch_events(self, batch: List) -> List:
+        events = []
+        for data in batch:
+            if data is self._shutdown_signal:
+                continue
+            if isinstance(data, list):
+                events.extend(data)
+            else:
+                events.append(data)
+        return events
+
     def run(self):
         # Wait for the queue until data appears, or until the next
         # time to flush the writer.
@@ -172,46 +601,75 @@ class EventWriterThread(threading.Thread):
         # If not, an empty queue exception will be raised and invoke writer flush.
         while True:
             now = time.time()
-            queue_wait_duration = self._next_flush_time - now
-            data = None
+            queue_wait_duration = self._scheduler.get_wait(now, self._event_writer)
+            batch = []
             try:
                 if queue_wait_duration > 0:
-                    data = self._event_queue.get(True, queue_wait_duration)
+                    batch.append(self._event_queue.get(True, queue_wait_duration))
                 else:
-                    data = self._event_queue.get(False)
-
-                if data is self._shutdown_signal:
+                    batch.append(self._event_queue.get(False))
+                # The batches already queued are written together,
+                # i.e. with a single write-ahead log commit.
+                while batch[-1] is not self._shutdown_signal:
+                    try:
+                        batch.append(self._event_queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                events = self._get_batch_events(batch)
+                if events:
+                    self._event_writer.write(events)
+                    self._has_pending_data = True
+                    self._scheduler.on_data(now)
+                if batch[-1] is self._shutdown_signal:
                     return
-                self._event_writer.write(data)
-                self._has_pending_data = True
             except queue.Empty:
                 pass
             finally:
-                if data:
+                for _ in batch:
                     self._event_queue.task_done()
 
             now = time.time()
-            if now > self._next_flush_time:
-                if self._has_pending_data:
+            if self._scheduler.should_flush(now, self._event_writer):
+                if self._get_deferred_events:
+                    deferred_events = self._get_deferred_events()
+                    if deferred_events:
+                        self._event_writer.write(deferred_events)
+                        self._has_pending_data = True
+                has_data = self._has_pending_data
+                if has_data:
                     # Small optimization - if there are no pending data,
                     # there's no need to flush.
                     self._event_writer.flush()
                     self._has_pending_data = False
-                # Do it again in flush_secs.
-                self._next_flush_time = now + self._flush_secs
+                # Do it again in flush_secs, or later when idle.
+                self._scheduler.on_flush(now, has_data)
 
 
 class ResourceAsyncManager(BaseAsyncManager):
     """Writes resource events to files by name by event kind."""
 
     def __init__(
-        self, event_writer: EventWriter, max_queue_size: int = 20, flush_secs: int = 10
+        self,
+        event_writer: EventWriter,
+        max_queue_size: int = 20,
+        flush_secs: int = 10,
+        get_writer_stats: Optional[Callable[[], Dict]] = None,
+        sample_secs: Optional[float] = None,
+        sample_deadband: Optional[float] = None,
+        collectors: Optional[List[Callable[[], List]]] = None,
+        event_clock: Optional[AnchoredClock] = None,
     ):
         super().__init__(event_writer=event_writer, max_queue_size=max_queue_size)
         self._worker = ResourceWriterThread(
             self._event_queue,
             self._event_writer,
             flush_secs,
+            get_writer_stats=get_writer_stats,
+            sample_secs=sample_secs,
+            sample_deadband=sample_deadband,
+            collectors=collectors,
+            event_clock=event_clock,
         )
         self._worker.start()
 
@@ -219,18 +677,51 @@ class ResourceAsyncManager(BaseAsyncManager):
 class ResourceWriterThread(EventWriterThread):
     """Thread that processes periodic resources (cpu, gpu, memory) writes for EventWriter."""
 
-    def __init__(self, event_queue, event_writer: EventWriter, flush_secs: int):
+    def __init__(
+        self,
+        event_queue,
+        event_writer: EventWriter,
+        flush_secs: int,
+        get_writer_stats: Optional[Callable[[], Dict]] = None,
+        sample_secs: Optional[float] = None,
+        sample_deadband: Optional[float] = None,
+        collectors: Optional[List[Callable[[], List]]] = None,
+        event_clock: Optional[AnchoredClock] = None,
+    ):
         super().__init__(
             event_queue=event_queue, event_writer=event_writer, flush_secs=flush_secs
         )
+        self._event_clock = event_clock
         self._log_psutil_resources = can_log_psutil_resources()
         self._log_gpu_resources = can_log_gpu_resources()
+        self._get_writer_stats = get_writer_stats
+        self._collectors = collectors
+        self._sampler = None  # type: Optional[ResourceSampler]
+        if sample_secs:
+            self._sampler = ResourceSampler(
+                sample_secs=sample_secs,
+                flush_secs=flush_secs,
+                collect=self._get_resources_metrics,
+                deadband=sample_deadband,
+            )
+
+    def _get_resources_metrics(self) -> List:
+        return get_resources_metrics(
+            log_psutil=self._log_psutil_resources,
+            log_gpu=self._log_gpu_resources,
+            collectors=self._collectors,
+        )
+
+    def _get_next_wake_time(self) -> float:
+        if self._sampler is None:
+            return self._next_flush_time
+        return min(self._next_flush_time, self._sampler.next_sample_time)
 
     def run(self):
-        # Wait for flush time to invoke the writer.
+        # Wait for the next sample or flush time to invoke the writer.
         while True:
             now = time.time()
-            queue_wait_duration = self._next_flush_time - now
+            queue_wait_duration = self._get_next_wake_time() - now
             data = None
             try:
                 if queue_wait_duration > 0:
@@ -249,18 +740,107 @@ class ResourceWriterThread(EventWriterThread):
                     self._event_queue.task_done()
 
             now = time.time()
+            if self._sampler is not None and (
+                now >= self._sampler.next_sample_time or now > self._next_flush_time
+            ):
+                self._sampler.sample(now)
             if now > self._next_flush_time:
-                data = []
-                if self._log_psutil_resources:
-                    try:
-                        data += get_psutils_metrics()
-                    except Exception:
-                        pass
-                try:
-                    data += get_gpu_metrics()
-                except Exception:
-                    pass
+                if self._sampler is not None:
+                    data = self._sampler.get_window_metrics()
+                else:
+                    data = self._get_resources_metrics()
+                data += get_writer_stats_metrics(self._get_writer_stats)
+                data = stamp_events(data, self._event_clock)
                 if data:
                     self._event_writer.write(data)
                     self._event_writer.flush()
                 self._next_flush_time = now + self._flush_secs
+
+
+class SharedEventAsyncManager(BaseAsyncManager):
+    """Writes events to files by name by event kind on the process-wide executor."""
+
+    def __init__(
+        self,
+        event_writer: EventWriter,
+        max_queue_size: int = 20,
+        flush_secs: int = 10,
+        backpressure: str = BackpressurePolicy.BLOCK,
+        spill_path: Optional[str] = None,
+        scheduler: Optional[FlushScheduler] = None,
+    ):
+        super().__init__(
+            event_writer=event_writer,
+            max_queue_size=max_queue_size,
+            backpressure=backpressure,
+            spill_path=spill_path,
+        )
+        self._worker = SharedWriter(
+            acquire_shared_executor(),
+            self._event_queue,
+            self._event_writer,
+            flush_secs,
+            get_flush_events=self._get_deferred_events,
+            scheduler=scheduler,
+        )
+
+    def write(self, event: Union[LoggedEventSpec, List[LoggedEventSpec]]):
+        super().write(event)
+        self._worker.notify()
+
+    def close(self):
+        if not self._closed:
+            super().close()
+            release_shared_executor()
+
+
+class SharedResourceAsyncManager(BaseAsyncManager):
+    """Writes resource events on the process-wide executor.
+
+    The resources are sampled once per `flush_secs` by the executor
+    and the readings are shared by all the resource writers of the process.
+    """
+
+    def __init__(
+        self,
+        event_writer: EventWriter,
+        max_queue_size: int = 20,
+        flush_secs: int = 10,
+        get_writer_stats: Optional[Callable[[], Dict]] = None,
+        collectors: Optional[List[Callable[[], List]]] = None,
+        event_clock: Optional[AnchoredClock] = None,
+    ):
+        super().__init__(event_writer=event_writer, max_queue_size=max_queue_size)
+        self._executor = acquire_shared_executor()
+        self._flush_secs = flush_secs
+        self._get_writer_stats = get_writer_stats
+        self._collectors = collectors
+        self._event_clock = event_clock
+        self._worker = SharedWriter(
+            self._executor,
+            self._event_queue,
+            self._event_writer,
+            flush_secs,
+            get_flush_events=self._get_resources_events,
+        )
+        self._worker.notify()
+
+    def _get_resources_events(self) -> List:
+        # The collectors of a writer are not shared with the other writers
+        return stamp_events(
+            self._executor.get_resources_metrics(self._flush_secs)
+            + get_resources_metrics(
+                log_psutil=False, log_gpu=False, collectors=self._collectors
+            )
+            + get_writer_stats_metrics(self._get_writer_stats),
+            self._event_clock,
+        )
+
+    def write(self, event: Union[LoggedEventSpec, List[LoggedEventSpec]]):
+        super().write(event)
+        self._worker.notify()
+
+    def close(self):
+        if not self._closed:
+            super().close()
+            release_shared_executor()
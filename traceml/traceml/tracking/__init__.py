@@ -41,6 +41,22 @@ def init(
     name: Optional[str] = None,
     description: Optional[str] = None,
     tags: Optional[List[str]] = None,
+    events_backpressure: Optional[str] = None,
+    events_downsampling: Optional[Dict[str, Dict]] = None,
+    events_segments: Optional[Dict] = None,
+    events_rank: Optional[int] = None,
+    events_wal: bool = False,
+    track_writer_stats: bool = False,
+    shared_executor: bool = False,
+    events_flush_policy: Optional[Dict] = None,
+    events_timestamp_format: Optional[str] = None,
+    events_index_rows: Optional[int] = None,
+    events_summaries: bool = False,
+    resources_sample_secs: Optional[float] = None,
+    resources_sample_deadband: Optional[float] = None,
+    resources_process_tree: Optional[Union[bool, Dict]] = None,
+    resources_cgroup: bool = False,
+    resources_io_rates: Optional[Union[bool, Dict]] = None,
 ) -> Optional[Run]:
     """Tracking module is similar to the tracking client without the need to create a run instance.
 
@@ -99,6 +115,62 @@ def init(
             tags: str or List[str], optional,
                  When `is_new` or `is_offline` is set to true, a new instance is created and
                  you can initialize that new run with tags.
+            events_backpressure: str, optional,
+                 policy to apply when the events queue is full:
+                 `block` (default), `drop_oldest`, `coalesce`, or `spill`.
+            events_downsampling: Dict, optional,
+                 downsampling policies of metric series by name or glob pattern,
+                 e.g. `{"loss": {"kind": "every_n", "n": 10}}`,
+                 supported kinds are `every_n`, `time_bucket`, and `lttb`.
+            events_segments: Dict, optional,
+                 rotates the event files to compressed segments,
+                 e.g. `{"max_bytes": 10485760, "max_rows": 100000, "compression": "gzip"}`.
+            events_rank: int, optional,
+                 rank of the process in a distributed job, each rank writes its events and resources
+                 to `{name}.rank{k}.plx` shards that are merged by step and timestamp on read.
+            events_wal: bool, optional,
+                 to commit the events to a write-ahead log until they are flushed,
+                 the log is replayed by the next run started with the same artifacts path.
+            track_writer_stats: bool, optional, default False,
+                 to emit the writers' statistics, e.g. queue high-water mark or flush latency,
+                 as system metrics `writer_events_*` and `writer_resources_*`.
+            shared_executor: bool, optional, default False,
+                 to process the events and resources on a process-wide executor instead of
+                 dedicated threads, e.g. when a notebook or a sweep creates many runs in one process.
+            events_flush_policy: Dict, optional,
+                 adaptive flush scheduling of the events, e.g.
+                 `{"max_rows": 10000, "max_bytes": 8388608, "max_idle_secs": 60,
+                 "live": ["loss"], "live_secs": 1}` flushes early once the buffered events
+                 reach a threshold, backs off when idle, and flushes the `live` series
+                 at most `live_secs` after they are buffered.
+            events_timestamp_format: str, optional,
+                 format of the timestamps in the csv event files, `iso` (default),
+                 or `epoch_ns` to write compact integer epoch nanoseconds, readers accept both.
+            events_index_rows: int, optional,
+                 writes a sparse index sidecar next to each event file every `events_index_rows`
+                 rows, e.g. 1000, to read a steps or time window without parsing the whole file.
+            events_summaries: bool, optional, default False,
+                 to keep running summaries of the event series while they are written,
+                 the summaries are then synced at the end of the run without reading the series,
+                 only the values of the metric series larger than 256 rows are read for their percentiles.
+            resources_sample_secs: float, optional,
+                 samples the resources every `resources_sample_secs`, e.g. 0.1, instead of once per flush,
+                 each flush writes the window's mean and its `_min`, `_max`, and `_p95` aggregates.
+            resources_sample_deadband: float, optional,
+                 skips writing a sampled resource when all its aggregates are within this value
+                 of the last written window.
+            resources_process_tree: Union[bool, Dict], optional,
+                 to also track the resources of the current process and its children, e.g. data loader
+                 workers: RSS, cpu time, threads, open fds, I/O bytes, and context switches,
+                 a dict sets the `per_process`, `max_processes`, and `full_memory` options,
+                 e.g. `{"full_memory": True}` to also track the USS and PSS.
+            resources_cgroup: bool, optional, default False,
+                 to also track the container's memory usage and limit, memory pressure, cpu quota
+                 and throttling, and I/O from the cgroup v1 or v2 filesystem, e.g. on Kubernetes.
+            resources_io_rates: Union[bool, Dict], optional,
+                 to also track the disk read/write throughput, IOPS, and busy percent, and the network
+                 rx/tx throughput, a dict sets the `disks`, `interfaces`, `max_devices`,
+                 and `per_device` options, e.g. `{"disks": ["nvme*"], "interfaces": ["eth0"]}`.
 
         Raises:
             PolyaxonClientException: If no owner and/or project are passed and Polyaxon cannot
@@ -123,6 +195,22 @@ def init(
         name=name,
         description=description,
         tags=tags,
+        events_backpressure=events_backpressure,
+        events_downsampling=events_downsampling,
+        events_segments=events_segments,
+        events_rank=events_rank,
+        events_wal=events_wal,
+        track_writer_stats=track_writer_stats,
+        shared_executor=shared_executor,
+        events_flush_policy=events_flush_policy,
+        events_timestamp_format=events_timestamp_format,
+        events_index_rows=events_index_rows,
+        events_summaries=events_summaries,
+        resources_sample_secs=resources_sample_secs,
+        resources_sample_deadband=resources_sample_deadband,
+        resources_process_tree=resources_process_tree,
+        resources_cgroup=resources_cgroup,
+        resources_io_rates=resources_io_rates,
     )
     return TRACKING_RUN
 
@@ -234,6 +322,14 @@ def set_run_process_sidecar():
 set_run_process_sidecar.__doc__ = Run.set_run_process_sidecar.__doc__
 
 
+def get_writer_stats():
+    global TRACKING_RUN
+    return TRACKING_RUN.get_writer_stats()
+
+
+get_writer_stats.__doc__ = Run.get_writer_stats.__doc__
+
+
 def log_metric(
     name: str,
     value: float,
@@ -262,6 +358,24 @@ def log_metrics(
 log_metrics.__doc__ = Run.log_metrics.__doc__
 
 
+def log_metric_array(name: str, values, steps=None, timestamps=None):
+    global TRACKING_RUN
+    TRACKING_RUN.log_metric_array(
+        name=name, values=values, steps=steps, timestamps=timestamps
+    )
+
+
+log_metric_array.__doc__ = Run.log_metric_array.__doc__
+
+
+def log_metric_arrays(steps=None, timestamps=None, **metrics):
+    global TRACKING_RUN
+    TRACKING_RUN.log_metric_arrays(steps=steps, timestamps=timestamps, **metrics)
+
+
+log_metric_arrays.__doc__ = Run.log_metric_arrays.__doc__
+
+
 def log_roc_auc_curve(
     name: str,
     fpr,
@@ -1131,8 +1245,11 @@ __all__ = [
     "set_run_event_logger",
     "set_run_resource_logger",
     "set_run_process_sidecar",
+    "get_writer_stats",
     "log_metric",
     "log_metrics",
+    "log_metric_array",
+    "log_metric_arrays",
     "log_roc_auc_curve",
     "log_sklearn_roc_auc_curve",
     "log_pr_curve",
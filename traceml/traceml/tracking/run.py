@@ -21,8 +21,9 @@ import tempfile
 import time
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
+from clipped.utils.dates import file_modified_since
 from clipped.utils.env import get_run_env
 from clipped.utils.hashing import hash_value
 from clipped.utils.json import orjson_dumps
@@ -30,6 +31,7 @@ from clipped.utils.paths import (
     check_or_create_path,
     copy_file_or_dir_path,
     get_base_filename,
+    get_files_in_path_context,
     get_path_extension,
 )
 
@@ -48,12 +50,25 @@ from polyaxon.env_vars.getters import (
 from polyaxon.lifecycle import LifeCycle, V1ProjectFeature, V1Statuses
 from polyaxon.sidecar.processor import SidecarThread
 from polyaxon.utils.fqn_utils import to_fqn_name
-from traceml.artifacts import V1ArtifactKind
-from traceml.events import LoggedEventSpec, V1Event, get_asset_path
+from traceml.artifacts import V1ArtifactKind, V1RunArtifact
+from traceml.events import (
+    LoggedEventSpec,
+    LoggedMetricArraySpec,
+    LoggedMetricSpec,
+    V1Event,
+    V1Events,
+    get_asset_path,
+    segments,
+)
+from traceml.events.clock import AnchoredClock
+from traceml.events.summaries import load_series_summary
 from traceml.logger import logger
 from traceml.logging import V1Log, V1Logs
 from traceml.processors import events_processors
+from traceml.processors.io_processor import get_io_rates_options
 from traceml.processors.logs_processor import end_log_processor, start_log_processor
+from traceml.processors.process_processor import get_process_tree_options
+from traceml.serialization.scheduling import parse_flush_policy
 from traceml.serialization.writer import EventFileWriter, ResourceFileWriter
 
 
@@ -116,6 +131,62 @@ class Run(RunClient):
         tags: str or List[str], optional,
              When `is_new` or `is_offline` is set to true, a new instance is created and
              you can initialize that new run with tags.
+        events_backpressure: str, optional,
+             policy to apply when the events queue is full:
+             `block` (default), `drop_oldest`, `coalesce`, or `spill`.
+        events_downsampling: Dict, optional,
+             downsampling policies of metric series by name or glob pattern,
+             e.g. `{"loss": {"kind": "every_n", "n": 10}}`,
+             supported kinds are `every_n`, `time_bucket`, and `lttb`.
+        events_segments: Dict, optional,
+             rotates the event files to compressed segments,
+             e.g. `{"max_bytes": 10485760, "max_rows": 100000, "compression": "gzip"}`.
+        events_rank: int, optional,
+             rank of the process in a distributed job, each rank writes its events and resources
+             to `{name}.rank{k}.plx` shards that are merged by step and timestamp on read.
+        events_wal: bool, optional,
+             to commit the events to a write-ahead log until they are flushed,
+             the log is replayed by the next run started with the same artifacts path.
+        track_writer_stats: bool, optional, default False,
+             to emit the writers' statistics, e.g. queue high-water mark or flush latency,
+             as system metrics `writer_events_*` and `writer_resources_*`.
+        shared_executor: bool, optional, default False,
+             to process the events and resources on a process-wide executor instead of
+             dedicated threads, e.g. when a notebook or a sweep creates many runs in one process.
+        events_flush_policy: Dict, optional,
+             adaptive flush scheduling of the events, e.g.
+             `{"max_rows": 10000, "max_bytes": 8388608, "max_idle_secs": 60,
+             "live": ["loss"], "live_secs": 1}` flushes early once the buffered events
+             reach a threshold, backs off when idle, and flushes the `live` series
+             at most `live_secs` after they are buffered.
+        events_timestamp_format: str, optional,
+             format of the timestamps in the csv event files, `iso` (default),
+             or `epoch_ns` to write compact integer epoch nanoseconds, readers accept both.
+        events_index_rows: int, optional,
+             writes a sparse index sidecar next to each event file every `events_index_rows`
+             rows, e.g. 1000, to read a steps or time window without parsing the whole file.
+        events_summaries: bool, optional, default False,
+             to keep running summaries of the event series while they are written,
+             the summaries are then synced at the end of the run without reading the series,
+             only the values of the metric series larger than 256 rows are read for their percentiles.
+        resources_sample_secs: float, optional,
+             samples the resources every `resources_sample_secs`, e.g. 0.1, instead of once per flush,
+             each flush writes the window's mean and its `_min`, `_max`, and `_p95` aggregates.
+        resources_sample_deadband: float, optional,
+             skips writing a sampled resource when all its aggregates are within this value
+             of the last written window.
+        resources_process_tree: Union[bool, Dict], optional,
+             to also track the resources of the current process and its children, e.g. data loader
+             workers: RSS, cpu time, threads, open fds, I/O bytes, and context switches,
+             a dict sets the `per_process`, `max_processes`, and `full_memory` options,
+             e.g. `{"full_memory": True}` to also track the USS and PSS.
+        resources_cgroup: bool, optional, default False,
+             to also track the container's memory usage and limit, memory pressure, cpu quota
+             and throttling, and I/O from the cgroup v1 or v2 filesystem, e.g. on Kubernetes.
+        resources_io_rates: Union[bool, Dict], optional,
+             to also track the disk read/write throughput, IOPS, and busy percent, and the network
+             rx/tx throughput, a dict sets the `disks`, `interfaces`, `max_devices`,
+             and `per_device` options, e.g. `{"disks": ["nvme*"], "interfaces": ["eth0"]}`.
 
     Raises:
         PolyaxonClientException: If no owner and/or project are passed and Polyaxon cannot
@@ -143,6 +214,22 @@ class Run(RunClient):
         description: Optional[str] = None,
         tags: Optional[List[str]] = None,
         auto_create: bool = True,
+        events_backpressure: Optional[str] = None,
+        events_downsampling: Optional[Dict[str, Dict]] = None,
+        events_segments: Optional[Dict] = None,
+        events_rank: Optional[int] = None,
+        events_wal: bool = False,
+        track_writer_stats: bool = False,
+        shared_executor: bool = False,
+        events_flush_policy: Optional[Dict] = None,
+        events_timestamp_format: Optional[str] = None,
+        events_index_rows: Optional[int] = None,
+        events_summaries: bool = False,
+        resources_sample_secs: Optional[float] = None,
+        resources_sample_deadband: Optional[float] = None,
+        resources_process_tree: Optional[Union[bool, Dict]] = None,
+        resources_cgroup: bool = False,
+        resources_io_rates: Optional[Union[bool, Dict]] = None,
     ):
         super().__init__(
             owner=owner,
@@ -161,6 +248,58 @@ class Run(RunClient):
         self._sidecar = None
         self._exit_handler = None
         self._store_path = None
+        self._metric_names = {}  # type: Dict[str, str]
+        self._event_logger_options = {}  # type: Dict
+        if events_backpressure:
+            self._event_logger_options["backpressure"] = events_backpressure
+        if events_downsampling:
+            self._event_logger_options["downsampling"] = events_downsampling
+        if events_segments:
+            self._event_logger_options.update(
+                self._get_segments_options(events_segments)
+            )
+        self._resource_logger_options = {}  # type: Dict
+        if events_rank is not None:
+            self._event_logger_options["rank"] = events_rank
+            self._resource_logger_options["rank"] = events_rank
+        if events_wal:
+            self._event_logger_options["wal"] = events_wal
+        if track_writer_stats:
+            self._resource_logger_options["get_writer_stats"] = self.get_writer_stats
+        if shared_executor:
+            self._event_logger_options["shared_executor"] = shared_executor
+            self._resource_logger_options["shared_executor"] = shared_executor
+        if events_flush_policy:
+            # Validates the policy before the writer is created
+            parse_flush_policy(events_flush_policy)
+            self._event_logger_options["flush_policy"] = events_flush_policy
+        if events_timestamp_format:
+            self._event_logger_options["timestamp_format"] = events_timestamp_format
+        if events_index_rows:
+            self._event_logger_options["index_rows"] = events_index_rows
+        if events_summaries:
+            self._event_logger_options["summaries"] = events_summaries
+            self._resource_logger_options["summaries"] = events_summaries
+        if resources_sample_secs:
+            if shared_executor:
+                raise ValueError(
+                    "`resources_sample_secs` is not supported with `shared_executor`."
+                )
+            self._resource_logger_options["sample_secs"] = resources_sample_secs
+        if resources_sample_deadband is not None:
+            self._resource_logger_options["sample_deadband"] = resources_sample_deadband
+        if resources_process_tree:
+            # Validates the options before the writer is created
+            get_process_tree_options(resources_process_tree)
+            self._resource_logger_options["process_tree"] = resources_process_tree
+        if resources_cgroup:
+            self._resource_logger_options["cgroup"] = resources_cgroup
+        if resources_io_rates:
+            # Validates the options before the writer is created
+            get_io_rates_options(resources_io_rates)
+            self._resource_logger_options["io_rates"] = resources_io_rates
+        # The events and resources timestamps are taken from a clock anchored once per run
+        self._clock = AnchoredClock()
 
         is_new = is_new or (
             self._run_uuid is None and not settings.CLIENT_CONFIG.is_managed
@@ -242,6 +381,22 @@ class Run(RunClient):
                 "the event logger was not configured properly".format(len(events))
             )
 
+    def _add_metrics(self, metrics: List[LoggedMetricSpec]):
+        if self._event_logger:
+            self._event_logger.add_metrics(metrics)
+        else:
+            logger.warning(
+                "Could not log metrics {}, "
+                "the event logger was not configured properly".format(len(metrics))
+            )
+
+    def _get_metric_name(self, name: str) -> str:
+        metric_name = self._metric_names.get(name)
+        if metric_name is None:
+            metric_name = to_fqn_name(name)
+            self._metric_names[name] = metric_name
+        return metric_name
+
     def _persist_logs_history(self):
         if self._logs_history.logs and len(self._logs_history.logs) > 0:
             logs_path = os.path.join(
@@ -435,6 +590,16 @@ class Run(RunClient):
         self._artifacts_path = _artifacts_path
         self._outputs_path = _outputs_path
 
+    @staticmethod
+    def _get_segments_options(events_segments: Dict) -> Dict:
+        keys = {"max_bytes", "max_rows", "compression"}
+        unknown = set(events_segments.keys()) - keys
+        if unknown:
+            raise ValueError(
+                "Received unrecognized segments options: {}".format(sorted(unknown))
+            )
+        return {"segment_{}".format(k): v for k, v in events_segments.items()}
+
     @client_handler(check_no_op=True)
     def set_run_event_logger(self):
         """Sets an event logger.
@@ -443,7 +608,9 @@ class Run(RunClient):
         > Be careful, this method is called automatically. Polyaxon has some processes
         > to automatically sync your run's artifacts and outputs.
         """
-        self._event_logger = EventFileWriter(run_path=self._artifacts_path)
+        self._event_logger = EventFileWriter(
+            run_path=self._artifacts_path, **self._event_logger_options
+        )
 
     @client_handler(check_no_op=True)
     def set_run_resource_logger(self):
@@ -453,7 +620,30 @@ class Run(RunClient):
         > Be careful, this method is called automatically. Polyaxon has some processes
         > to automatically sync your run's artifacts and outputs.
         """
-        self._resource_logger = ResourceFileWriter(run_path=self._artifacts_path)
+        self._resource_logger = ResourceFileWriter(
+            run_path=self._artifacts_path,
+            event_clock=self._clock,
+            **self._resource_logger_options,
+        )
+
+    @client_handler(check_no_op=True)
+    def get_writer_stats(self) -> Dict[str, Optional[Dict]]:
+        """Returns the statistics of the events and resources writers.
+
+        The statistics include the queue size and high-water mark, the `put()` blocking
+        time, the flushes' latency histogram, the events and bytes written per flush,
+        and the number of open files, they can be used to detect logging-induced slowdowns.
+
+        Returns:
+            Dict, the statistics by writer `events` and `resources`,
+            a writer that is not configured has no statistics.
+        """
+        return {
+            "events": self._event_logger.get_stats() if self._event_logger else None,
+            "resources": self._resource_logger.get_stats()
+            if self._resource_logger
+            else None,
+        }
 
     @client_handler(check_no_op=True)
     def set_run_process_sidecar(self):
@@ -498,23 +688,24 @@ class Run(RunClient):
             step: int, optional
             timestamp: datetime, optional
         """
-        name = to_fqn_name(name)
+        name = self._get_metric_name(name)
         self._log_has_metrics()
 
-        events = []
         event_value = events_processors.metric(value)
         if event_value == UNKNOWN:
             return
-        events.append(
-            LoggedEventSpec(
-                name=name,
-                kind=V1ArtifactKind.METRIC,
-                event=V1Event.make(timestamp=timestamp, step=step, metric=event_value),
-            )
+        self._add_metrics(
+            [
+                LoggedMetricSpec.make(
+                    name=name,
+                    metric=event_value,
+                    step=step,
+                    timestamp=timestamp,
+                    event_clock=self._clock,
+                )
+            ]
         )
-        if events:
-            self._add_events(events)
-            self._results[name] = event_value
+        self._results[name] = event_value
 
     @client_handler(check_no_op=True, can_log_events=True)
     def log_metrics(
@@ -541,22 +732,117 @@ class Run(RunClient):
         self._log_has_metrics()
 
         events = []
+        event_timestamp = None
         for metric in metrics:
-            metric_name = to_fqn_name(metric)
+            metric_name = self._get_metric_name(metric)
             event_value = events_processors.metric(metrics[metric])
             if event_value == UNKNOWN:
                 continue
+            event = LoggedMetricSpec.make(
+                name=metric_name,
+                metric=event_value,
+                step=step,
+                timestamp=event_timestamp or timestamp,
+                event_clock=self._clock,
+            )
+            # All metrics of the same call share the same timestamp
+            event_timestamp = event.timestamp
+            events.append(event)
+        if events:
+            self._add_metrics(events)
+
+    @client_handler(check_no_op=True, can_log_events=True)
+    def log_metric_array(
+        self,
+        name: str,
+        values,
+        steps=None,
+        timestamps=None,
+    ):
+        """Logs an array of metric datapoints at once.
+
+        ```python
+        >>> log_metric_array(name="loss", values=losses, steps=np.arange(len(losses)))
+        ```
+
+        The arrays are validated and formatted in vectorized passes
+        and handed to the writer as a single block,
+        e.g. to log a validation sweep or to import the history of a metric.
+        Logging 1M values takes a few milliseconds and writing them takes
+        well under a second with the `binary` events format. The csv format
+        writes each value as its shortest repr, which takes about 1s per 1M values
+        on the writer's thread.
+
+        Args:
+            name: str, metric name
+            values: List[float] or numpy.array, metric values
+            steps: List[int] or numpy.array, optional
+            timestamps: numpy.array of datetime64, epoch seconds, or datetimes, optional,
+                defaults to the current time for all the values
+        """
+        name = self._get_metric_name(name)
+        self._log_has_metrics()
+
+        event = LoggedMetricArraySpec.make(
+            name=name,
+            values=values,
+            steps=steps,
+            timestamps=timestamps,
+            event_clock=self._clock,
+        )
+        if not event.size:
+            return
+        self._add_metrics([event])
+        self._results[name] = float(event.values[-1])
+
+    @client_handler(check_no_op=True, can_log_events=True)
+    def log_metric_arrays(
+        self,
+        steps=None,
+        timestamps=None,
+        **metrics,
+    ):
+        """Logs arrays of datapoints of multiple metrics sharing the same steps.
+
+        ```python
+        >>> log_metric_arrays(steps=steps, loss=losses, accuracy=accuracies)
+        ```
+
+        Args:
+            steps: List[int] or numpy.array, optional
+            timestamps: numpy.array of datetime64, epoch seconds, or datetimes, optional,
+                defaults to the current time for all the values
+            metrics: kwargs, key=array of values
+        """
+        self._log_has_metrics()
+
+        values = {k: LoggedMetricArraySpec.get_values(v) for k, v in metrics.items()}
+        sizes = {len(v) for v in values.values()}
+        if len(sizes) > 1:
+            raise ValueError(
+                "The metric arrays should have the same size, received {}".format(
+                    {k: len(v) for k, v in values.items()}
+                )
+            )
+        size = sizes.pop() if sizes else 0
+        if not size:
+            return
+        # The steps and timestamps are validated once for all the metrics
+        steps = LoggedMetricArraySpec.get_steps(steps, size)
+        timestamps = LoggedMetricArraySpec.get_timestamps(
+            timestamps, size, event_clock=self._clock
+        )
+        events = []
+        for metric, metric_values in values.items():
             events.append(
-                LoggedEventSpec(
-                    name=metric_name,
-                    kind=V1ArtifactKind.METRIC,
-                    event=V1Event.make(
-                        timestamp=timestamp, step=step, metric=event_value
-                    ),
+                LoggedMetricArraySpec(
+                    name=self._get_metric_name(metric),
+                    steps=steps,
+                    timestamps=timestamps,
+                    values=metric_values,
                 )
             )
-        if events:
-            self._add_events(events)
+        self._add_metrics(events)
 
     @client_handler(check_no_op=True, can_log_events=True)
     def log_roc_auc_curve(
@@ -592,7 +878,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.CURVE,
-            event=V1Event.make(timestamp=timestamp, step=step, curve=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                curve=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -635,7 +926,12 @@ class Run(RunClient):
             logged_event = LoggedEventSpec(
                 name=chart_name,
                 kind=V1ArtifactKind.CURVE,
-                event=V1Event.make(timestamp=timestamp, step=step, curve=event_value),
+                event=V1Event.make(
+                    timestamp=timestamp,
+                    step=step,
+                    curve=event_value,
+                    event_clock=self._clock,
+                ),
             )
             self._add_event(logged_event)
 
@@ -684,7 +980,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.CURVE,
-            event=V1Event.make(timestamp=timestamp, step=step, curve=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                curve=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -727,7 +1028,12 @@ class Run(RunClient):
             logged_event = LoggedEventSpec(
                 name=chart_name,
                 kind=V1ArtifactKind.CURVE,
-                event=V1Event.make(timestamp=timestamp, step=step, curve=event_value),
+                event=V1Event.make(
+                    timestamp=timestamp,
+                    step=step,
+                    curve=event_value,
+                    event_clock=self._clock,
+                ),
             )
             self._add_event(logged_event)
 
@@ -777,7 +1083,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.CURVE,
-            event=V1Event.make(timestamp=timestamp, step=step, curve=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                curve=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -834,7 +1145,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.CONFUSION,
-            event=V1Event.make(timestamp=timestamp, step=step, confusion=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                confusion=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -914,7 +1230,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.IMAGE,
-            event=V1Event.make(timestamp=timestamp, step=step, image=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                image=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -973,7 +1294,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.IMAGE,
-            event=V1Event.make(timestamp=timestamp, step=step, image=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                image=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1093,7 +1419,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.VIDEO,
-            event=V1Event.make(timestamp=timestamp, step=step, video=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                video=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1163,7 +1494,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.AUDIO,
-            event=V1Event.make(timestamp=timestamp, step=step, audio=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                audio=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1193,7 +1529,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.TEXT,
-            event=V1Event.make(timestamp=timestamp, step=step, text=text),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                text=text,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1223,7 +1564,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.HTML,
-            event=V1Event.make(timestamp=timestamp, step=step, html=html),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                html=html,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1261,7 +1607,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.HISTOGRAM,
-            event=V1Event.make(timestamp=timestamp, step=step, histogram=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                histogram=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1307,7 +1658,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.HISTOGRAM,
-            event=V1Event.make(timestamp=timestamp, step=step, histogram=event_value),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                histogram=event_value,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1378,7 +1734,12 @@ class Run(RunClient):
             logged_event = LoggedEventSpec(
                 name=name,
                 kind=V1ArtifactKind.MODEL,
-                event=V1Event.make(timestamp=timestamp, step=step, model=model),
+                event=V1Event.make(
+                    timestamp=timestamp,
+                    step=step,
+                    model=model,
+                    event_clock=self._clock,
+                ),
             )
             self._add_event(logged_event)
         else:
@@ -1462,7 +1823,12 @@ class Run(RunClient):
             logged_event = LoggedEventSpec(
                 name=name,
                 kind=kind,
-                event=V1Event.make(timestamp=timestamp, step=step, artifact=artifact),
+                event=V1Event.make(
+                    timestamp=timestamp,
+                    step=step,
+                    artifact=artifact,
+                    event_clock=self._clock,
+                ),
             )
             self._add_event(logged_event)
         else:
@@ -1529,7 +1895,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.DATAFRAME,
-            event=V1Event.make(timestamp=timestamp, step=step, dataframe=df),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                dataframe=df,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1556,7 +1927,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.CHART,
-            event=V1Event.make(timestamp=timestamp, step=step, chart=chart),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                chart=chart,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1583,7 +1959,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.CHART,
-            event=V1Event.make(timestamp=timestamp, step=step, chart=chart),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                chart=chart,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1610,7 +1991,12 @@ class Run(RunClient):
         logged_event = LoggedEventSpec(
             name=name,
             kind=V1ArtifactKind.CHART,
-            event=V1Event.make(timestamp=timestamp, step=step, chart=chart),
+            event=V1Event.make(
+                timestamp=timestamp,
+                step=step,
+                chart=chart,
+                event_clock=self._clock,
+            ),
         )
         self._add_event(logged_event)
 
@@ -1642,7 +2028,12 @@ class Run(RunClient):
             logged_event = LoggedEventSpec(
                 name=self._sanitize_filename(name),
                 kind=V1ArtifactKind.CHART,
-                event=V1Event.make(timestamp=timestamp, step=step, chart=chart),
+                event=V1Event.make(
+                    timestamp=timestamp,
+                    step=step,
+                    chart=chart,
+                    event_clock=self._clock,
+                ),
             )
             self._add_event(logged_event)
 
@@ -1706,6 +2097,61 @@ class Run(RunClient):
         if self._is_offline:
             self.persist_run(path=self._artifacts_path)
 
+    def _collect_events_summaries(
+        self,
+        events_path: str,
+        events_kind: str,
+        last_check: Optional[datetime],
+        is_system_resource: bool = False,
+    ) -> Tuple[List, Dict]:
+        current_events_path = os.path.join(events_path, events_kind)
+
+        summaries = []
+        last_values = {}
+        connection_name = get_artifacts_store_name()
+        with get_files_in_path_context(current_events_path) as files:  # type: List[str]
+            # Rotated series are read once from their manifest and segments
+            for event_name, event_path, event_files in segments.get_events_files(files):
+                if last_check and not any(
+                    file_modified_since(filepath=f, last_time=last_check)
+                    for f in event_files
+                ):
+                    continue
+
+                # The running summary kept by the writer is used if it covers
+                # the series, otherwise it's computed over a stream of bounded chunks
+                series_summary = load_series_summary(event_path)
+                if series_summary is not None:
+                    values = None
+                    if series_summary.requires_values:
+                        # The percentiles of a large series are computed exactly
+                        values = V1Events.read(
+                            kind=events_kind, name=event_name, data=event_path
+                        ).df[events_kind]
+                    summary = series_summary.get_summary(values)
+                else:
+                    summary = V1Events.read_summary(
+                        kind=events_kind, name=event_name, path=event_path
+                    )
+                if summary is None:
+                    continue
+
+                # Get only the relpath from run uuid
+                event_rel_path = self._sanitize_filepath(filepath=event_path)
+                run_artifact = V1RunArtifact.construct(
+                    name=event_name,
+                    kind=V1ArtifactKind.SYSTEM if is_system_resource else events_kind,
+                    connection=connection_name,
+                    summary=summary,
+                    path=event_rel_path,
+                    is_input=False,
+                )
+                summaries.append(run_artifact)
+                if events_kind == V1ArtifactKind.METRIC:
+                    last_values[event_name] = summary[V1ArtifactKind.METRIC]["last"]
+
+        return summaries, last_values
+
     def _wait(self, sync_artifacts: bool = False):
         if self._event_logger:
             self._event_logger.close()
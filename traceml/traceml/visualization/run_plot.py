@@ -13,7 +13,6 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import pandas as pd
 
 from typing import Dict, List, Optional, Set, Union
 
@@ -21,6 +20,7 @@ from polyaxon.client import RunClient
 from polyaxon.client.decorators import client_handler
 from traceml.artifacts import V1ArtifactKind
 from traceml.events import V1Events
+from traceml.events.loader import get_tidy_df, get_wide_df, read_events_series
 
 
 class RunPlot(RunClient):
@@ -57,27 +57,18 @@ class RunPlot(RunClient):
             self.metric_names.add(e["name"])
         return self.metrics
 
+    def _get_dfs(self, max_points: Optional[int] = None) -> Dict:
+        return read_events_series(
+            [self.metrics[m] for m in self.metric_names], max_points=max_points
+        )
+
     @client_handler(check_no_op=True)
-    def get_tidy_df(self):
-        dfs = []
-        for m in self.metric_names:
-            data = self.metrics[m]
-            df = V1Events.read(**data).df
-            df["name"] = m
-            dfs.append(df)
-        return pd.concat(dfs)
+    def get_tidy_df(self, max_points: Optional[int] = None):
+        return get_tidy_df(self._get_dfs(max_points))
 
     @client_handler(check_no_op=True)
-    def get_wide_df(self):
-        dfs = []
-        for m in self.metric_names:
-            data = self.metrics[m]
-            df = V1Events.read(**data).df
-            df[m] = df.metric
-            df = df[["step", "timestamp", m]]
-            dfs.append(df)
-
-        return pd.concat(dfs, axis=1)
+    def get_wide_df(self, max_points: Optional[int] = None):
+        return get_wide_df(self._get_dfs(max_points))
 
     @client_handler(check_no_op=True)
     def bar(